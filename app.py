@@ -1,88 +1,329 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_file
+from flask import Flask, Request, render_template, request, redirect, url_for, session, flash, jsonify, send_from_directory
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import NotFound
+from werkzeug.security import generate_password_hash, check_password_hash
 import sqlite3
 import os
 import sys
 import logging
-from datetime import datetime
-import uuid
+import logging.handlers
+import atexit
+import queue
+from datetime import datetime, timezone, timedelta
+import secrets
+import hashlib
 import shutil
+import tempfile
 import time
-
-from models.model_manager import ModelManager
-from models.classifier import classify_text
+import threading
+from contextlib import contextmanager, suppress
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import importlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from db_pool import DATABASE_PATH, get_conn
+from jobs import JobQueue, process_alive
+from models.batching import BatchingWorker
+from models.classifier import classify_texts
 from models.summarizer import summarize_text
-from models.ocr_processor import ocr_processor
-from models.ner_processor import ner_processor
+
+logger = logging.getLogger(__name__)
+
+# LOG_LEVEL=DEBUG shows the per-request details; LOG_FILE adds a rotating log file
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FILE = os.environ.get('LOG_FILE')
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+def configure_logging():
+    """Write log records from a background thread so request threads never block on log I/O"""
+    root = logging.getLogger()
+    if root.handlers:  # already configured (e.g. by gunicorn)
+        return
+    handlers = [logging.StreamHandler()]
+    if LOG_FILE:
+        handlers.append(logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=10 << 20, backupCount=5, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL)
+
+configure_logging()
 
 # Suppress verbose outputs and warnings
 os.environ['TOKENIZERS_PARALLELISM'] = 'false'
 os.environ['TRANSFORMERS_VERBOSITY'] = 'error'
+# Growable CUDA segments instead of fixed blocks: OCR batches of varying image sizes reuse
+# memory without fragmenting it, so the cache rarely has to be emptied (read at torch import)
+os.environ.setdefault('PYTORCH_CUDA_ALLOC_CONF', 'expandable_segments:True')
 
 # Suppress specific warnings
 import warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
 warnings.filterwarnings("ignore", category=UserWarning)
 
-# Redirect llama-cpp verbose output to devnull during model loading
-class SuppressOutput:
-    def __enter__(self):
-        self._original_stdout = sys.stdout
-        self._original_stderr = sys.stderr
-        sys.stdout = open(os.devnull, 'w')
-        sys.stderr = open(os.devnull, 'w')
-        return self
+# Redirect llama-cpp verbose output to devnull during model loading.
+# llama.cpp writes straight to file descriptors 1/2, so swapping sys.stdout
+# alone is not enough: the descriptors themselves are pointed at devnull.
+_DEVNULL = open(os.devnull, 'w')
+_suppress_lock = threading.Lock()
+_suppress_depth = 0
+_saved_fds = None
+
+@contextmanager
+def suppress_output():
+    global _suppress_depth, _saved_fds
+    with _suppress_lock:
+        if _suppress_depth == 0:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            _saved_fds = (os.dup(1), os.dup(2))
+            os.dup2(_DEVNULL.fileno(), 1)
+            os.dup2(_DEVNULL.fileno(), 2)
+        _suppress_depth += 1
+    old_stdout, old_stderr = sys.stdout, sys.stderr
+    sys.stdout = sys.stderr = _DEVNULL
+    try:
+        yield
+    finally:
+        sys.stdout, sys.stderr = old_stdout, old_stderr
+        with _suppress_lock:
+            _suppress_depth -= 1
+            if _suppress_depth == 0:
+                for fd, saved in zip((1, 2), _saved_fds):
+                    os.dup2(saved, fd)
+                    os.close(saved)
+                _saved_fds = None
+
+class LazyModelProxy:
+    """
+    Stands in for a heavy model object (torch / transformers / llama-cpp) and
+    only imports and builds it on first attribute access, so the web app can
+    serve login pages and static files before the ML stack has been imported.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._target = None
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    self._target = self._factory()
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+# Global model manager instance (singleton) and the processors it shares
+model_manager = LazyModelProxy(lambda: importlib.import_module('models.model_manager').ModelManager())
+ocr_processor = LazyModelProxy(lambda: importlib.import_module('models.ocr_processor').ocr_processor)
+ner_processor = LazyModelProxy(lambda: importlib.import_module('models.ner_processor').ner_processor)
+
+# Under a WSGI server the models load on first use; OCR_PRELOAD=1 loads the OCR model (and imports
+# the ML stack) in the background at startup instead. `python app.py` loads every model up front.
+if os.environ.get('OCR_PRELOAD') == '1' and __name__ != '__main__':
+    threading.Thread(target=lambda: ocr_processor.load_model(), name='ocr-preload', daemon=True).start()
+
+def _classifier_bucket(text):
+    """Token length rounded up to 32 so similar-length texts share a batch"""
+    token_count = len(model_manager.classifier.tokenizer(text, truncation=True)['input_ids'])
+    return -(-token_count // 32) * 32
+
+# Concurrent classification requests are grouped into one pipeline call
+classification_batcher = BatchingWorker(
+    lambda texts: classify_texts(model_manager.classifier, texts),
+    bucket_key=_classifier_bucket,
+    name='classification-batcher'
+)
+
+# llama.cpp cannot batch prompts and is not thread-safe: one request at a time
+summarization_worker = BatchingWorker(
+    lambda texts: [summarize_text(model_manager.summarizer, text) for text in texts],
+    max_batch_size=1,
+    name='summarization-worker'
+)
+
+
+TURKISH_TZ = timezone(timedelta(hours=3))
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        sys.stdout.close()
-        sys.stderr.close()
-        sys.stdout = self._original_stdout
-        sys.stderr = self._original_stderr
+def get_turkish_time():
+    """Get current time in Turkish timezone (UTC+3)"""
+    return datetime.now(TURKISH_TZ)
 
-# Global model manager instance (singleton)
-model_manager = ModelManager()
+DB_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
 
+def get_utc_timestamp(moment=None):
+    """UTC time (now, or the given aware datetime) in SQLite's CURRENT_TIMESTAMP format (what the database stores)"""
+    if moment is None:
+        moment = datetime.now(timezone.utc)
+    return moment.astimezone(timezone.utc).strftime(DB_TIMESTAMP_FORMAT)
 
 
-def get_turkish_time():
-    """Get current time in Turkish timezone (UTC+3)"""
-    from datetime import timezone, timedelta
-    turkish_tz = timezone(timedelta(hours=3))
-    return datetime.now(turkish_tz)
+# Fraction of GPU memory the caching allocator may reserve before we hand it back
+CUDA_CACHE_RELEASE_THRESHOLD = 0.9
 
+def clear_memory_after_ocr(force=False):
+    """Release cached GPU memory after Obje ve Karakter Tanıma, only under memory pressure.
 
-def clear_memory_after_ocr():
-    """Clear memory after Obje ve Karakter Tanıma operations to reduce RAM usage"""
+    empty_cache() is expensive and the caching allocator reuses the same blocks on
+    the next request, so it only runs when reserved memory crosses the threshold,
+    or with force=True after a failed (e.g. out-of-memory) job.
+    """
     try:
-        # Clear Obje ve Karakter Tanıma processor memory
-        if hasattr(ocr_processor, '_clear_memory'):
-            ocr_processor._clear_memory()
+        import torch
+        if not torch.cuda.is_available():
+            return
         
-        # Force garbage collection
-        import gc
-        gc.collect()
+        if not force:
+            total_memory = torch.cuda.get_device_properties(0).total_memory
+            if torch.cuda.memory_reserved() / total_memory <= CUDA_CACHE_RELEASE_THRESHOLD:
+                return
         
-        # Clear GPU memory if available
-        try:
-            import torch
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-        except:
-            pass
+        torch.cuda.empty_cache()
             
     except Exception as e:
-        print(f"Memory cleanup error: {e}")
+        logger.warning("Memory cleanup error: %s", e)
+
+
+SECRET_KEY_FILE = 'secret_key'
+
+def load_secret_key():
+    """
+    Session signing key shared by every worker and kept across restarts:
+    SECRET_KEY from the environment, otherwise a key generated once and
+    stored next to the database.
+    """
+    key = os.environ.get('SECRET_KEY')
+    if key:
+        return key
+    if not os.path.exists(SECRET_KEY_FILE):
+        # Write to a private temp file, then link it into place: link() fails if
+        # another worker won the race, so every process ends up with the same key
+        tmp_path = f"{SECRET_KEY_FILE}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_hex(32))
+        try:
+            os.link(tmp_path, SECRET_KEY_FILE)
+            logger.warning("SECRET_KEY is not set; generated a session key in %s. Set SECRET_KEY in production.",
+                           SECRET_KEY_FILE)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+    with open(SECRET_KEY_FILE) as f:
+        return f.read().strip()
 
 
 app = Flask(__name__)
-app.secret_key = os.urandom(24)  # More secure random secret key
+app.secret_key = load_secret_key()
 app.config['SESSION_PERMANENT'] = False
-app.config['SESSION_TYPE'] = 'filesystem'
+# Behind nginx/Apache, let the proxy stream uploads (X-Sendfile) instead of Python
+app.use_x_sendfile = os.environ.get('USE_X_SENDFILE') == '1'
+
+class ORJSONProvider(DefaultJSONProvider):
+    """jsonify()/request.get_json() backed by orjson (falls back to the stdlib for custom options)"""
+    option = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Pretty-printed debug output still goes through the stdlib encoder
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.option | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+# orjson is optional: without it Flask's default provider is used
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+
+@app.template_filter('turkish_time')
+def turkish_time_filter(value):
+    """Render a stored UTC timestamp in Turkish time (UTC+3)"""
+    if not value:
+        return ''
+    try:
+        return (datetime.strptime(value, DB_TIMESTAMP_FORMAT) + timedelta(hours=3)).strftime(DB_TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        return value
+
+# Per-user tables that are listed newest-first by upload_date
+USER_HISTORY_TABLES = (
+    'pdf_files', 'classification_pdfs', 'ocr_pdfs', 'ocr_images', 'ner_pdfs',
+    'summary_texts', 'classification_texts', 'ner_texts',
+    'summary_results', 'classification_results', 'ocr_results', 'ner_results',
+)
+
+# Bump when _create_schema changes so existing databases are migrated
+SCHEMA_VERSION = 7
+# Seconds a booting worker waits for another worker's migration to finish
+SCHEMA_LOCK_TIMEOUT = 60
 
 # Database initialization
 def init_db():
-    conn = sqlite3.connect('database.db')
+    conn = sqlite3.connect(DATABASE_PATH, timeout=SCHEMA_LOCK_TIMEOUT)
     cursor = conn.cursor()
-    
+
+    # Schema already up to date (e.g. another worker booted first)
+    current_version = cursor.execute('PRAGMA user_version').fetchone()[0]
+    if current_version >= SCHEMA_VERSION:
+        conn.close()
+        return
+
+    # Run all DDL in one transaction: one fsync instead of one per statement
+    try:
+        # Take the write lock up front, then re-check: a worker that migrated while we
+        # waited has already moved the data, and migrating again would shift it twice
+        cursor.execute('BEGIN IMMEDIATE')
+        current_version = cursor.execute('PRAGMA user_version').fetchone()[0]
+        if current_version >= SCHEMA_VERSION:
+            conn.rollback()
+            conn.close()
+            return
+        _create_schema(cursor)
+        _migrate_schema(cursor, current_version)
+        cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        conn.close()
+        raise
+
+    # Refresh planner statistics so the new indexes are picked up
+    conn.execute('ANALYZE')
+    conn.close()
+
+def _migrate_schema(cursor, from_version):
+    """Data migrations that must run exactly once when upgrading an existing database"""
+    if from_version < 3:
+        # Timestamps used to be stored in Turkish time (UTC+3); store UTC from now on
+        for table in USER_HISTORY_TABLES:
+            cursor.execute(f"UPDATE {table} SET upload_date = datetime(upload_date, '-3 hours') WHERE upload_date IS NOT NULL")
+        cursor.execute("UPDATE documents SET created_at = datetime(created_at, '-3 hours') WHERE created_at IS NOT NULL")
+
+def _create_schema(cursor):
     # Create users table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -90,10 +331,21 @@ def init_db():
             username TEXT UNIQUE NOT NULL,
             password TEXT NOT NULL,
             email TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            password_hash TEXT
         )
     ''')
     
+    # Add password_hash column if it doesn't exist and hash legacy plaintext passwords
+    cursor.execute("PRAGMA table_info(users)")
+    columns = [column[1] for column in cursor.fetchall()]
+    if 'password_hash' not in columns:
+        cursor.execute("ALTER TABLE users ADD COLUMN password_hash TEXT")
+    cursor.execute("SELECT id, password FROM users WHERE password_hash IS NULL")
+    for user_id, password in cursor.fetchall():
+        cursor.execute("UPDATE users SET password_hash = ?, password = '' WHERE id = ?",
+                       (generate_password_hash(password), user_id))
+    
     # Create documents table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS documents (
@@ -102,7 +354,7 @@ def init_db():
             title TEXT NOT NULL,
             content TEXT,
             category TEXT,
-            created_at TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
@@ -116,7 +368,7 @@ def init_db():
             file_path TEXT NOT NULL,
             file_size INTEGER,
             file_id TEXT,
-            upload_date TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
@@ -136,7 +388,7 @@ def init_db():
             file_path TEXT NOT NULL,
             file_size INTEGER,
             file_id TEXT,
-            upload_date TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
@@ -155,7 +407,7 @@ def init_db():
             original_filename TEXT NOT NULL,
             file_path TEXT NOT NULL,
             file_size INTEGER,
-            upload_date TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
@@ -168,7 +420,7 @@ def init_db():
             original_filename TEXT NOT NULL,
             file_path TEXT NOT NULL,
             file_size INTEGER,
-            upload_date TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
@@ -181,7 +433,7 @@ def init_db():
             original_filename TEXT NOT NULL,
             file_path TEXT NOT NULL,
             file_size INTEGER,
-            upload_date TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
@@ -194,7 +446,7 @@ def init_db():
             original_filename TEXT NOT NULL,
             file_path TEXT NOT NULL,
             file_size INTEGER,
-            upload_date TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
@@ -205,7 +457,7 @@ def init_db():
             original_filename TEXT NOT NULL,
             file_path TEXT NOT NULL,
             file_size INTEGER,
-            upload_date TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
@@ -216,7 +468,7 @@ def init_db():
             original_filename TEXT NOT NULL,
             file_path TEXT NOT NULL,
             file_size INTEGER,
-            upload_date TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
@@ -229,7 +481,7 @@ def init_db():
             title TEXT NOT NULL,
             description TEXT,
             work_type TEXT,
-            created_at TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
@@ -245,7 +497,7 @@ def init_db():
             summary_content TEXT,
             parent_input_id INTEGER,
             parent_input_type TEXT,
-            upload_date TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
@@ -262,7 +514,7 @@ def init_db():
             confidence_score TEXT,
             parent_input_id INTEGER,
             parent_input_type TEXT,
-            upload_date TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
@@ -277,7 +529,7 @@ def init_db():
             file_size INTEGER,
             ocr_text TEXT,
             source_type TEXT,
-            upload_date TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
@@ -293,81 +545,211 @@ def init_db():
             ner_text TEXT,
             entities_json TEXT,
             source_type TEXT,
-            upload_date TIMESTAMP DEFAULT (datetime('now', '+3 hours')),
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+    # Uploaded files waiting to be processed, keyed by the temp_id handed to the client
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS temp_uploads (
+            temp_id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            upload_dir TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            original_filename TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+
+    # Background OCR jobs (see jobs.py); results are kept as JSON for polling clients
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL,
+            http_status INTEGER,
+            result_json TEXT,
+            error TEXT,
+            pid INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
 
+    # OCR text of scanned PDFs and images keyed by file content, so the same file
+    # is not OCR'd again for another feature (OCR, NER, summary, classification)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ocr_cache (
+            user_id INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            text TEXT NOT NULL,
+            method TEXT NOT NULL,
+            page_count INTEGER NOT NULL,
+            ocr_version INTEGER NOT NULL DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, sha256),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
     
-    conn.commit()
-    conn.close()
+    # Add ocr_version column if it doesn't exist (older rows count as version 1)
+    cursor.execute("PRAGMA table_info(ocr_cache)")
+    columns = [column[1] for column in cursor.fetchall()]
+    if 'ocr_version' not in columns:
+        cursor.execute("ALTER TABLE ocr_cache ADD COLUMN ocr_version INTEGER NOT NULL DEFAULT 1")
+
+    # Per-user history indexes: every listing is WHERE user_id = ? ORDER BY date DESC
+    for table in USER_HISTORY_TABLES:
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_{table}_user_date
+            ON {table}(user_id, upload_date DESC)
+        ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_documents_user_date
+        ON documents(user_id, created_at DESC)
+    ''')
+
+def result_filename(prefix, now, source_name=None, strip_extensions=()):
+    """'<prefix> - [<source name> - ]<YYYY-MM-DD HH:MM>.txt' for a saved result"""
+    stamp = now.strftime('%Y-%m-%d %H:%M')
+    if not source_name:
+        return f'{prefix} - {stamp}.txt'
+    if source_name.endswith(strip_extensions):
+        source_name = os.path.splitext(source_name)[0]
+    return f'{prefix} - {source_name} - {stamp}.txt'
+
+def write_text_file(file_path, content):
+    """Write UTF-8 text and return its size in bytes (no extra stat call)"""
+    data = content.encode('utf-8')
+    with open(file_path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+# Copy uploads to disk in 1 MiB chunks (Werkzeug's default is 16 KiB)
+UPLOAD_BUFFER_SIZE = 1 << 20
+# Uploads larger than this are spooled to a file on the same disk as uploads/
+UPLOAD_SPOOL_THRESHOLD = 500 * 1024
+# Each process spools into its own subdirectory, so a worker that boots or restarts
+# only ever clears its own leftovers and never the uploads other workers are streaming
+UPLOAD_SPOOL_ROOT = os.path.join('uploads', '.incoming')
+UPLOAD_SPOOL_DIR = os.path.join(UPLOAD_SPOOL_ROOT, str(os.getpid()))
+# Accepted upload types (compared against the lower-cased extension only)
+IMAGE_UPLOAD_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.tiff'})
+SERVED_FILE_EXTENSIONS = frozenset({'.pdf', '.txt', '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff'})
+OCR_SOURCE_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff')
+
+def split_upload_name(filename):
+    """(name, ext) of a client-supplied file name with any directory part dropped (no ../ traversal)"""
+    return os.path.splitext(filename.replace('\\', '/').rsplit('/', 1)[-1])
+
+def file_extension(filename):
+    """Lower-cased extension of a file name ('' if none)"""
+    return os.path.splitext(filename)[1].lower()
+
+class UploadRequest(Request):
+    """Spools large uploads inside uploads/ (not the system temp dir) so save_upload() can link them"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if total_content_length is not None and total_content_length <= UPLOAD_SPOOL_THRESHOLD:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        # Removed automatically when the request closes its files
+        return tempfile.NamedTemporaryFile('wb+', dir=UPLOAD_SPOOL_DIR)
+
+app.request_class = UploadRequest
+
+def save_upload(file, file_path):
+    """Save an uploaded file; a spooled upload is hard-linked into place instead of copied"""
+    spool_path = getattr(file.stream, 'name', None)
+    if isinstance(spool_path, str):
+        try:
+            file.stream.flush()
+            os.link(spool_path, file_path)
+            return
+        except OSError:
+            # e.g. the filesystem does not support hard links
+            pass
+    file.save(file_path, buffer_size=UPLOAD_BUFFER_SIZE)
+
+# Upload directories (Obje ve Karakter Tanıma / Varlık Tanıma included)
+UPLOAD_SUBDIRS = (
+    'summary_pdfs', 'classification_pdfs', 'ocr_pdfs', 'ocr_images', 'ner_pdfs',
+    'summary_texts', 'classification_texts', 'ner_texts',
+    'summary_results', 'classification_results', 'ocr_results', 'ner_results',
+)
+# Joined once at import; handlers only append the file name
+UPLOAD_DIR = {d: os.path.join('uploads', d) for d in UPLOAD_SUBDIRS}
+UPLOAD_DIRS = tuple(UPLOAD_DIR.values())
 
 # Create upload directories
 def create_upload_dirs():
-    upload_dir = 'uploads'
-    summary_pdf_dir = os.path.join(upload_dir, 'summary_pdfs')
-    classification_pdf_dir = os.path.join(upload_dir, 'classification_pdfs')
-    ocr_pdf_dir = os.path.join(upload_dir, 'ocr_pdfs')  # Obje ve Karakter Tanıma PDF'leri
-    ocr_image_dir = os.path.join(upload_dir, 'ocr_images')  # Obje ve Karakter Tanıma resimleri
-    ner_pdf_dir = os.path.join(upload_dir, 'ner_pdfs')  # Varlık Tanıma PDF'leri
-    summary_text_dir = os.path.join(upload_dir, 'summary_texts')
-    classification_text_dir = os.path.join(upload_dir, 'classification_texts')
-    ner_text_dir = os.path.join(upload_dir, 'ner_texts')  # Varlık Tanıma metinleri
-    summary_results_dir = os.path.join(upload_dir, 'summary_results')
-    classification_results_dir = os.path.join(upload_dir, 'classification_results')
-    ocr_results_dir = os.path.join(upload_dir, 'ocr_results')  # Obje ve Karakter Tanıma sonuçları
-    ner_results_dir = os.path.join(upload_dir, 'ner_results')  # Varlık Tanıma sonuçları
-    
-    if not os.path.exists(upload_dir):
-        os.makedirs(upload_dir)
-    if not os.path.exists(summary_pdf_dir):
-        os.makedirs(summary_pdf_dir)
-    if not os.path.exists(classification_pdf_dir):
-        os.makedirs(classification_pdf_dir)
-    if not os.path.exists(ocr_pdf_dir):
-        os.makedirs(ocr_pdf_dir)
-    if not os.path.exists(ocr_image_dir):
-        os.makedirs(ocr_image_dir)
-    if not os.path.exists(ner_pdf_dir):
-        os.makedirs(ner_pdf_dir)
-    if not os.path.exists(summary_text_dir):
-        os.makedirs(summary_text_dir)
-    if not os.path.exists(classification_text_dir):
-        os.makedirs(classification_text_dir)
-    if not os.path.exists(ner_text_dir):
-        os.makedirs(ner_text_dir)
-    if not os.path.exists(summary_results_dir):
-        os.makedirs(summary_results_dir)
-    if not os.path.exists(classification_results_dir):
-        os.makedirs(classification_results_dir)
-    if not os.path.exists(ocr_results_dir):
-        os.makedirs(ocr_results_dir)
-    if not os.path.exists(ner_results_dir):
-        os.makedirs(ner_results_dir)
+    # makedirs also creates the parent 'uploads' folder
+    for upload_dir in UPLOAD_DIRS:
+        os.makedirs(upload_dir, exist_ok=True)
+    # Spool files left behind by a crashed process are never reused: clear this
+    # process's directory (the pid may be recycled) and those of dead processes
+    os.makedirs(UPLOAD_SPOOL_ROOT, exist_ok=True)
+    for entry in os.listdir(UPLOAD_SPOOL_ROOT):
+        if entry.isdigit() and not process_alive(int(entry)):
+            shutil.rmtree(os.path.join(UPLOAD_SPOOL_ROOT, entry), ignore_errors=True)
+    shutil.rmtree(UPLOAD_SPOOL_DIR, ignore_errors=True)
+    os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
 
 # Initialize database and upload directories on startup
 init_db()
 create_upload_dirs()
 
+SQL_REGISTER_TEMP_UPLOAD = '''
+    INSERT INTO temp_uploads (temp_id, user_id, upload_dir, filename, original_filename)
+    VALUES (?, ?, ?, ?, ?)
+'''
+SQL_FIND_TEMP_UPLOAD = '''
+    SELECT filename, original_filename FROM temp_uploads
+    WHERE temp_id = ? AND user_id = ? AND upload_dir = ?
+'''
+
+def register_temp_upload(temp_id, upload_dir, filename, original_filename):
+    """Remember where an uploaded file was saved so later requests can find it by temp_id"""
+    persist_row(SQL_REGISTER_TEMP_UPLOAD, (temp_id, session['user_id'], upload_dir, filename, original_filename))
+
+def find_temp_upload(temp_id, upload_dir):
+    """(file_path, filename, original_filename, file_size) of the current user's upload, or None"""
+    with get_conn() as conn:
+        row = conn.execute(SQL_FIND_TEMP_UPLOAD, (temp_id, session['user_id'], upload_dir)).fetchone()
+    if row is None:
+        return None
+    file_path = os.path.join(UPLOAD_DIR[upload_dir], row[0])
+    # One stat gives the size and tells whether the file was deleted since it was uploaded
+    try:
+        file_size = os.stat(file_path).st_size
+    except FileNotFoundError:
+        return None
+    return file_path, row[0], row[1], file_size
+
 @app.route('/')
 def index():
     if 'user_id' in session:
         return redirect(url_for('dashboard'))
     return render_template('index.html')
 
+# Auth queries, kept as constants so pooled connections reuse the prepared statements
+SQL_LOGIN_USER = 'SELECT id, username, password_hash FROM users WHERE username = ?'
+SQL_REGISTER_USER = 'INSERT INTO users (username, password, email, password_hash) VALUES (?, ?, ?, ?)'
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         username = request.form['username']
         password = request.form['password']
         
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE username = ? AND password = ?', (username, password))
-        user = cursor.fetchone()
-        conn.close()
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SQL_LOGIN_USER, (username,))
+            user = cursor.fetchone()
         
-        if user:
+        if user and check_password_hash(user[2], password):
             session['user_id'] = user[0]
             session['username'] = user[1]
             return redirect(url_for('dashboard'))
@@ -383,19 +765,17 @@ def register():
         password = request.form['password']
         email = request.form['email']
         
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('INSERT INTO users (username, password, email) VALUES (?, ?, ?)', (username, password, email))
-            conn.commit()
-            print("sorun yok")
-            flash('Kayıt başarılı! Lütfen giriş yapın.', 'success')
-            return redirect(url_for('login'))
-        except sqlite3.IntegrityError:
-            flash('Kullanıcı adı zaten mevcut', 'error')
-        finally:
-            conn.close()
+        with get_conn(write=True) as conn:
+            cursor = conn.cursor()
+            
+            try:
+                # Only the scrypt hash is stored; the legacy password column stays empty
+                cursor.execute(SQL_REGISTER_USER, (username, '', email, generate_password_hash(password)))
+                conn.commit()
+                flash('Kayıt başarılı! Lütfen giriş yapın.', 'success')
+                return redirect(url_for('login'))
+            except sqlite3.IntegrityError:
+                flash('Kullanıcı adı zaten mevcut', 'error')
     
     return render_template('register.html')
 
@@ -404,342 +784,219 @@ def logout():
     session.clear()
     return redirect(url_for('index'))
 
+# Uploaded input files across all upload tables, newest first (?1 = user_id)
+UPLOADED_FILES_SQL = '''
+    SELECT id, user_id, original_filename, file_path, file_size, upload_date, 'summary_pdf' AS file_type
+    FROM pdf_files WHERE user_id = ?1
+    UNION ALL
+    SELECT id, user_id, original_filename, file_path, file_size, upload_date, 'classification_pdf'
+    FROM classification_pdfs WHERE user_id = ?1
+    UNION ALL
+    SELECT id, user_id, original_filename, file_path, file_size, upload_date, 'ocr_pdf'
+    FROM ocr_pdfs WHERE user_id = ?1
+    UNION ALL
+    SELECT id, user_id, original_filename, file_path, file_size, upload_date, 'ocr_image'
+    FROM ocr_images WHERE user_id = ?1
+    UNION ALL
+    SELECT id, user_id, original_filename, file_path, file_size, upload_date, 'ner_pdf'
+    FROM ner_pdfs WHERE user_id = ?1
+    UNION ALL
+    SELECT id, user_id, original_filename, file_path, file_size, upload_date, 'summary_text'
+    FROM summary_texts WHERE user_id = ?1
+    UNION ALL
+    SELECT id, user_id, original_filename, file_path, file_size, upload_date, 'classification_text'
+    FROM classification_texts WHERE user_id = ?1
+    UNION ALL
+    SELECT id, user_id, original_filename, file_path, file_size, upload_date, 'ner_text'
+    FROM ner_texts WHERE user_id = ?1
+    ORDER BY upload_date DESC
+'''
+
+# Dashboard's 3 most recent input files
+DASHBOARD_RECENT_FILES_SQL = UPLOADED_FILES_SQL + '    LIMIT 3\n'
+
+# Dashboard's 3 most recent OUTPUT RESULTS (?1 = user_id)
+DASHBOARD_RECENT_WORKS_SQL = '''
+    SELECT id, user_id, original_filename, 'summary_result' AS work_type, upload_date AS created_at,
+           'Özet Sonucu' AS description, file_path
+    FROM summary_results WHERE user_id = ?1
+    UNION ALL
+    SELECT id, user_id, original_filename, 'classification_result', upload_date,
+           'Sınıflandırma Sonucu', file_path
+    FROM classification_results WHERE user_id = ?1
+    UNION ALL
+    SELECT id, user_id, original_filename, 'ocr_result', upload_date,
+           'Obje ve Karakter Tanıma Sonucu', file_path
+    FROM ocr_results WHERE user_id = ?1
+    UNION ALL
+    SELECT id, user_id, original_filename, 'ner_result', upload_date,
+           'Varlık Tanıma Sonucu', file_path
+    FROM ner_results WHERE user_id = ?1
+    ORDER BY created_at DESC
+    LIMIT 3
+'''
+
+# Short-lived per-user cache of the dashboard template context
+DASHBOARD_CACHE_TTL = 5  # seconds
+DASHBOARD_CACHE_MAX_USERS = 1024
+_dashboard_cache = {}  # user_id -> (expires_at, context)
+_dashboard_cache_lock = threading.Lock()
+
+def _build_dashboard_context(user_id):
+    # dashboard.html only renders the latest files and results, so only those are fetched
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        
+        # Get the 3 most recent output results (summary/classification/OCR/NER)
+        cursor.execute(DASHBOARD_RECENT_WORKS_SQL, (user_id,))
+        recent_works = cursor.fetchall()
+        
+        # Get the 3 most recent uploaded input files
+        # NOTE: summary_results ve classification_results dahil DEĞİL - bunlar recent_files'da değil recent_works'te gösterilecek
+        cursor.execute(DASHBOARD_RECENT_FILES_SQL, (user_id,))
+        recent_files = [(row[6], row) for row in cursor.fetchall()]
+    
+    return dict(recent_files=recent_files, recent_works=recent_works)
+
+def invalidate_dashboard_cache(user_id):
+    with _dashboard_cache_lock:
+        _dashboard_cache.pop(user_id, None)
+
+@app.after_request
+def _invalidate_dashboard_after_write(response):
+    # Every upload/save/delete endpoint is a POST or DELETE
+    if request.method in ('POST', 'DELETE'):
+        user_id = session.get('user_id')
+        if user_id is not None:
+            invalidate_dashboard_cache(user_id)
+    return response
+
 @app.route('/dashboard')
 def dashboard():
-    if 'user_id' not in session:
+    user_id = session.get('user_id')
+    if user_id is None:
         return redirect(url_for('login'))
     
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    # Get summary PDFs (summarization works)
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'summary' as work_type, upload_date as created_at, 
-               'Özetleme işlemi' as description, file_path
-        FROM pdf_files 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    summary_works = cursor.fetchall()
-    
-    # Get classification PDFs (classification works)
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'classification' as work_type, upload_date as created_at,
-               'Sınıflandırma işlemi' as description, file_path
-        FROM classification_pdfs 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    classification_works = cursor.fetchall()
-    
-     # Get Obje ve Karakter Tanıma PDFs (Obje ve Karakter Tanıma works)
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'ocr_pdf' as work_type, upload_date as created_at,
-               'Obje ve Karakter Tanıma işlemi (PDF)' as description, file_path
-        FROM ocr_pdfs 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    ocr_pdf_works = cursor.fetchall()
-    
-    # Get Obje ve Karakter Tanıma images (Obje ve Karakter Tanıma works)
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'ocr_image' as work_type, upload_date as created_at,
-               'Obje ve Karakter Tanıma işlemi (Resim)' as description, file_path
-        FROM ocr_images 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    ocr_image_works = cursor.fetchall()
-    
-    # Get NER PDFs (NER works)
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'ner' as work_type, upload_date as created_at,
-               'NER işlemi' as description, file_path
-        FROM ner_pdfs 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    ner_works = cursor.fetchall()
-    
-    # Get text input works
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'summary_text' as work_type, upload_date as created_at, 
-               'Metin Özetleme' as description, file_path
-        FROM summary_texts 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    summary_text_works = cursor.fetchall()
-    
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'classification_text' as work_type, upload_date as created_at,
-               'Metin Sınıflandırma' as description, file_path
-        FROM classification_texts 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    classification_text_works = cursor.fetchall()
+    now = time.monotonic()
+    with _dashboard_cache_lock:
+        cached = _dashboard_cache.get(user_id)
+    if cached and cached[0] > now:
+        context = cached[1]
+    else:
+        context = _build_dashboard_context(user_id)
+        with _dashboard_cache_lock:
+            if len(_dashboard_cache) >= DASHBOARD_CACHE_MAX_USERS:
+                for key in [k for k, (expires_at, _) in _dashboard_cache.items() if expires_at <= now]:
+                    del _dashboard_cache[key]
+                if len(_dashboard_cache) >= DASHBOARD_CACHE_MAX_USERS:
+                    _dashboard_cache.clear()
+            _dashboard_cache[user_id] = (now + DASHBOARD_CACHE_TTL, context)
     
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'ner_text' as work_type, upload_date as created_at,
-               'Metin Varlık Tanıma İşlemi' as description, file_path
-        FROM ner_texts 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    ner_text_works = cursor.fetchall()
-    
-    # Get summary results
-    cursor.execute('''
-        SELECT sr.id, sr.user_id, sr.original_filename, 'summary_result' as work_type, sr.upload_date as created_at,
-               'Özet Sonucu' as description, sr.file_path
-        FROM summary_results sr
-        WHERE sr.user_id = ? 
-        ORDER BY sr.upload_date DESC
-    ''', (session['user_id'],))
-    summary_result_works = cursor.fetchall()
-    
-    # Get classification results
-    cursor.execute('''
-        SELECT cr.id, cr.user_id, cr.original_filename, 'classification_result' as work_type, cr.upload_date as created_at,
-               'Sınıflandırma Sonucu' as description, cr.file_path
-        FROM classification_results cr
-        WHERE cr.user_id = ? 
-        ORDER BY cr.upload_date DESC
-    ''', (session['user_id'],))
-    classification_result_works = cursor.fetchall()
-    
-    # Get Obje ve Karakter Tanıma results
-    cursor.execute('''
-        SELECT or_table.id, or_table.user_id, or_table.original_filename, 'ocr_result' as work_type, or_table.upload_date as created_at,
-               'Obje ve Karakter Tanıma Sonucu' as description, or_table.file_path
-        FROM ocr_results or_table
-        WHERE or_table.user_id = ? 
-        ORDER BY or_table.upload_date DESC
-    ''', (session['user_id'],))
-    ocr_result_works = cursor.fetchall()
-    
-    # Get Varlık Tanıma results
-    cursor.execute('''
-        SELECT nr.id, nr.user_id, nr.original_filename, 'ner_result' as work_type, nr.upload_date as created_at,
-               'Varlık Tanıma Sonucu' as description, nr.file_path
-        FROM ner_results nr
-        WHERE nr.user_id = ? 
-        ORDER BY nr.upload_date DESC
-    ''', (session['user_id'],))
-    ner_result_works = cursor.fetchall()
-
-    # Combine and sort ONLY OUTPUT RESULTS by date, then take top 3
-    all_works = (summary_result_works + classification_result_works + ocr_result_works + ner_result_works)
-    all_works.sort(key=lambda x: x[4], reverse=True)  # Sort by created_at
-    recent_works = all_works[:3]  # Take only the 3 most recent
-    
-
-
-    # Get documents (exclude only pdf_summary results)
-    cursor.execute('SELECT * FROM documents WHERE user_id = ? AND category != "pdf_summary" ORDER BY created_at DESC', (session['user_id'],))
-    documents = cursor.fetchall()
-    
-    # Get summary PDFs - now get for current user specifically
-    cursor.execute('SELECT * FROM pdf_files WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    summary_pdfs = cursor.fetchall()
-    
-    # Get classification PDFs - now get for current user specifically
-    cursor.execute('SELECT * FROM classification_pdfs WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    classification_pdfs = cursor.fetchall()
-    
-    # Get Obje ve Karakter Tanıma PDFs - now get for current user specifically  
-    cursor.execute('SELECT * FROM ocr_pdfs WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    ocr_pdfs = cursor.fetchall()
-    
-    # Get Obje ve Karakter Tanıma images - now get for current user specifically
-    cursor.execute('SELECT * FROM ocr_images WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    ocr_images = cursor.fetchall()
-    
-    # Get Varlık Tanıma PDFs - now get for current user specifically
-    cursor.execute('SELECT * FROM ner_pdfs WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    ner_pdfs = cursor.fetchall()
-
-    # Get text inputs - now get for current user specifically
-    cursor.execute('SELECT * FROM summary_texts WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    summary_texts = cursor.fetchall()
-    cursor.execute('SELECT * FROM classification_texts WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    classification_texts = cursor.fetchall()
-    cursor.execute('SELECT * FROM ner_texts WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))  # Varlık Tanıma metinleri
-    ner_texts = cursor.fetchall()
-    
-    # Get summary results - now get for current user specifically
-    cursor.execute('SELECT * FROM summary_results WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    summary_results = cursor.fetchall()
-    
-    # Get classification results - now get for current user specifically
-    cursor.execute('SELECT * FROM classification_results WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    classification_results = cursor.fetchall()
-    
-    # Build recent FILES across all types by timestamp (simple and reliable)
-    def ts_value(row, idx):
-        try:
-            raw = row[idx]
-            if raw is None:
-                return ""
-            # Return the string directly for sorting - SQLite timestamps sort correctly as strings
-            return str(raw)
-        except Exception:
-            return ""
-
-    all_files = []
-    for row in summary_pdfs:
-        # upload_date index 5
-        all_files.append((ts_value(row, 5), 'summary_pdf', row))
-    for row in classification_pdfs:
-        all_files.append((ts_value(row, 5), 'classification_pdf', row))
-    for row in ocr_pdfs:
-        # Obje ve Karakter Tanıma PDF'leri
-        all_files.append((ts_value(row, 5), 'ocr_pdf', row))
-    for row in ocr_images:
-        # Obje ve Karakter Tanıma resimleri
-        all_files.append((ts_value(row, 5), 'ocr_image', row))
-    for row in ner_pdfs:
-        # Varlık Tanıma PDF'leri
-        all_files.append((ts_value(row, 5), 'ner_pdf', row))
-    for row in summary_texts:
-        all_files.append((ts_value(row, 5), 'summary_text', row))
-    for row in classification_texts:
-        all_files.append((ts_value(row, 5), 'classification_text', row))
-    for row in ner_texts:
-        # Varlık Tanıma metinleri
-        all_files.append((ts_value(row, 5), 'ner_text', row))
-    # NOTE: summary_results ve classification_results dahil DEĞİL - bunlar recent_files'da değil recent_works'te gösterilecek
-
-    # Sort by timestamp desc and take top 3
-    all_files.sort(key=lambda x: x[0], reverse=True)
-    recent_files = [(t, r) for _, t, r in all_files[:3]]
+    return render_template('dashboard.html', **context)
+
 
-    conn.close()
-    
-    return render_template('dashboard.html', 
-                         documents=documents, 
-                         summary_pdfs=summary_pdfs, 
-                         classification_pdfs=classification_pdfs,
-                         ocr_pdfs=ocr_pdfs,
-                         ocr_images=ocr_images,
-                         ner_pdfs=ner_pdfs,
-                         summary_texts=summary_texts,
-                         classification_texts=classification_texts,
-                         ner_texts=ner_texts,
-                         recent_files=recent_files,
-                         recent_works=recent_works)
 
+UNLINK_MAX_WORKERS = 16
 
+def _unlink_quietly(file_path):
+    try:
+        os.remove(file_path)
+        return True
+    except FileNotFoundError:
+        return False
+    except Exception as e:
+        logger.warning("Error deleting file %s: %s", file_path, e)
+        return False
+
+def remove_files(paths):
+    """Unlink many files in parallel (unlink releases the GIL); returns how many were removed"""
+    if not paths:
+        return 0
+    if len(paths) == 1:
+        return int(_unlink_quietly(paths[0]))
+    with ThreadPoolExecutor(max_workers=min(UNLINK_MAX_WORKERS, len(paths))) as executor:
+        return sum(executor.map(_unlink_quietly, paths))
+
+# Per-user tables that own a file on disk, mapped to their folder under uploads/
+USER_FILE_TABLES = {
+    'pdf_files': 'summary_pdfs',
+    'classification_pdfs': 'classification_pdfs',
+    'ocr_pdfs': 'ocr_pdfs',  # Obje ve Karakter Tanıma PDF'leri
+    'ocr_images': 'ocr_images',  # Obje ve Karakter Tanıma resimleri
+    'ner_pdfs': 'ner_pdfs',  # Varlık Tanıma PDF'leri
+    'summary_texts': 'summary_texts',
+    'classification_texts': 'classification_texts',
+    'ner_texts': 'ner_texts',  # Varlık Tanıma metinleri
+    'summary_results': 'summary_results',
+    'classification_results': 'classification_results',
+    'ocr_results': 'ocr_results',  # Obje ve Karakter Tanıma sonuçları
+    'ner_results': 'ner_results',  # Varlık Tanıma sonuçları
+}
+
+# DELETE ... RETURNING removes a row and hands back its file name in one statement
+SQL_DELETE_USER_FILE = {
+    table: f'DELETE FROM {table} WHERE id = ? AND user_id = ? RETURNING file_path'
+    for table in USER_FILE_TABLES
+}
+
+# (upload_dir, file_path) for every file a user owns
+USER_FILES_SQL = '\nUNION ALL\n'.join(
+    [f"SELECT '{upload_dir}', file_path FROM {table} WHERE user_id = ?1"
+     for table, upload_dir in USER_FILE_TABLES.items()]
+    # Uploads that were never processed only appear in temp_uploads
+    + ['SELECT upload_dir, filename FROM temp_uploads WHERE user_id = ?1']
+)
 
 @app.route('/delete_account', methods=['POST'])
 def delete_account():
-    if 'user_id' not in session:
+    user_id = session.get('user_id')
+    if user_id is None:
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
     try:
-        user_id = session['user_id']
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
+        with get_conn(write=True) as conn:
+            cursor = conn.cursor()
+        
+            # Get user info for logging
+            cursor.execute('SELECT username FROM users WHERE id = ?', (user_id,))
+            user = cursor.fetchone()
+            username = user[0] if user else 'Unknown'
+        
+            logger.info("Account deletion requested - User ID: %s, Username: %s", user_id, username)
+        
+            # Collect this user's files with one indexed query instead of walking the disk
+            cursor.execute(USER_FILES_SQL, (user_id,))
+            # (a set: processed uploads are listed by temp_uploads too)
+            user_files = list({os.path.join(UPLOAD_DIR[upload_dir], filename)
+                               for upload_dir, filename in cursor.fetchall()})
+        
+            # Delete all user data from database: one explicit transaction, one fsync
+            cursor.execute('BEGIN')
+            for table in ('documents', 'temp_uploads', 'jobs', 'ocr_cache') + tuple(USER_FILE_TABLES):
+                cursor.execute(f'DELETE FROM {table} WHERE user_id = ?', (user_id,))
+                logger.debug("Deleted %s records from %s", cursor.rowcount, table)
+        
+            # Finally delete the user
+            cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
+            user_deleted = cursor.rowcount
+        
+            if not user_deleted:
+                conn.rollback()
+                return jsonify({'error': 'Kullanıcı bulunamadı'}), 404
         
-        # Get user info for logging
-        cursor.execute('SELECT username FROM users WHERE id = ?', (user_id,))
-        user = cursor.fetchone()
-        username = user[0] if user else 'Unknown'
-        
-        print(f"=== ACCOUNT DELETION REQUEST ===")
-        print(f"User ID: {user_id}")
-        print(f"Username: {username}")
-        
-        # Delete all user files from uploads directory
-        upload_dirs = [
-            'uploads/summary_pdfs',
-            'uploads/classification_pdfs', 
-            'uploads/ocr_pdfs',  # Obje ve Karakter Tanıma PDF'leri
-            'uploads/ocr_images',  # Obje ve Karakter Tanıma resimleri
-            'uploads/ner_pdfs',  # Varlık Tanıma PDF'leri
-            'uploads/summary_texts',
-            'uploads/classification_texts',
-            'uploads/ner_texts',  # Varlık Tanıma metinleri
-            'uploads/summary_results',
-            'uploads/classification_results',
-            'uploads/ocr_results',  # Obje ve Karakter Tanıma sonuçları
-            'uploads/ner_results'  # Varlık Tanıma sonuçları
-        ]
-        
-        for upload_dir in upload_dirs:
-            if os.path.exists(upload_dir):
-                for filename in os.listdir(upload_dir):
-                    file_path = os.path.join(upload_dir, filename)
-                    try:
-                        # Check if file belongs to this user by checking database
-                        if upload_dir == 'uploads/summary_pdfs':
-                            cursor.execute('SELECT id FROM pdf_files WHERE file_path = ? AND user_id = ?', (filename, user_id))
-                        elif upload_dir == 'uploads/classification_pdfs':
-                            cursor.execute('SELECT id FROM classification_pdfs WHERE file_path = ? AND user_id = ?', (filename, user_id))
-                        elif upload_dir == 'uploads/ocr_pdfs':  # Obje ve Karakter Tanıma PDF'leri
-                            cursor.execute('SELECT id FROM ocr_pdfs WHERE file_path = ? AND user_id = ?', (filename, user_id))
-                        elif upload_dir == 'uploads/ocr_images':  # Obje ve Karakter Tanıma resimleri
-                            cursor.execute('SELECT id FROM ocr_images WHERE file_path = ? AND user_id = ?', (filename, user_id))
-                        elif upload_dir == 'uploads/ner_pdfs':  # Varlık Tanıma PDF'leri
-                            cursor.execute('SELECT id FROM ner_pdfs WHERE file_path = ? AND user_id = ?', (filename, user_id))
-                        elif upload_dir == 'uploads/summary_texts':
-                            cursor.execute('SELECT id FROM summary_texts WHERE file_path = ? AND user_id = ?', (filename, user_id))
-                        elif upload_dir == 'uploads/classification_texts':
-                            cursor.execute('SELECT id FROM classification_texts WHERE file_path = ? AND user_id = ?', (filename, user_id))
-                        elif upload_dir == 'uploads/ner_texts':  # Varlık Tanıma metinleri
-                            cursor.execute('SELECT id FROM ner_texts WHERE file_path = ? AND user_id = ?', (filename, user_id))
-                        elif upload_dir == 'uploads/summary_results':
-                            cursor.execute('SELECT id FROM summary_results WHERE file_path = ? AND user_id = ?', (filename, user_id))
-                        elif upload_dir == 'uploads/classification_results':
-                            cursor.execute('SELECT id FROM classification_results WHERE file_path = ? AND user_id = ?', (filename, user_id))
-                        elif upload_dir == 'uploads/ocr_results':
-                            cursor.execute('SELECT id FROM ocr_results WHERE file_path = ? AND user_id = ?', (filename, user_id))
-                        elif upload_dir == 'uploads/ner_results':
-                            cursor.execute('SELECT id FROM ner_results WHERE file_path = ? AND user_id = ?', (filename, user_id))
-                        
-                        if cursor.fetchone():  # File belongs to this user
-                            os.remove(file_path)
-                            print(f"Deleted file: {file_path}")
-                    except Exception as e:
-                        print(f"Error deleting file {file_path}: {e}")
-        
-        # Delete all user data from database
-        tables_to_clean = [
-            'documents', 'pdf_files', 'classification_pdfs', 'ocr_pdfs', 'ocr_images',
-            'ner_pdfs', 'summary_texts', 'classification_texts', 'ner_texts',
-            'summary_results', 'classification_results', 'ocr_results', 'ner_results'
-        ]
-        
-        for table in tables_to_clean:
-            cursor.execute(f'DELETE FROM {table} WHERE user_id = ?', (user_id,))
-            deleted_count = cursor.rowcount
-            print(f"Deleted {deleted_count} records from {table}")
-        
-        # Finally delete the user
-        cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
-        user_deleted = cursor.rowcount
-        
-        if user_deleted:
             conn.commit()
-            print(f"User {username} (ID: {user_id}) successfully deleted")
-            
-            # Clear session
-            session.clear()
-            
-            conn.close()
-            return jsonify({'success': True, 'message': 'Hesap başarıyla silindi'})
-        else:
-            conn.rollback()
-            conn.close()
-            return jsonify({'error': 'Kullanıcı bulunamadı'}), 404
+        
+        # Remove files only once the rows are gone
+        removed = remove_files(user_files)
+        logger.info("User %s (ID: %s) successfully deleted with %s files", username, user_id, removed)
+        
+        # Clear session
+        session.clear()
+        
+        return jsonify({'success': True, 'message': 'Hesap başarıyla silindi'})
             
     except Exception as e:
-        print(f"Error deleting account: {str(e)}")
-        if 'conn' in locals():
-            conn.rollback()
-            conn.close()
+        logger.error("Error deleting account: %s", e)
         return jsonify({'error': f'Hesap silme hatası: {str(e)}'}), 500
 
 @app.route('/summary')
@@ -760,15 +1017,16 @@ def upload_pdf():
     if file.filename == '':
         return jsonify({'error': 'Dosya seçilmedi'}), 400
     
-    if file and file.filename.lower().endswith('.pdf'):
+    if file and file_extension(file.filename) == '.pdf':
         # Generate unique filename while preserving original name
-        unique_id = str(uuid.uuid4())
-        name, ext = os.path.splitext(file.filename)
+        unique_id = secrets.token_hex(16)
+        name, ext = split_upload_name(file.filename)
         filename = f"{name}_{unique_id}{ext}"
-        file_path = os.path.join('uploads', 'summary_pdfs', filename)
+        file_path = os.path.join(UPLOAD_DIR['summary_pdfs'], filename)
         
         # Save file temporarily (not to database yet)
-        file.save(file_path)
+        save_upload(file, file_path)
+        register_temp_upload(unique_id, 'summary_pdfs', filename, f"{name}.pdf")
         
         return jsonify({
             'success': True,
@@ -793,56 +1051,115 @@ def summarize_text_endpoint():
     if not model_manager.ensure_summarizer_loaded():
         return jsonify({'error': 'Özetleyici model yüklenemedi'}), 500
     
-    result = summarize_text(model_manager.summarizer, text)
+    result = summarization_worker.submit(text).result()
     if result['success']:
         # Save input text as .txt file under uploads/summary_texts
         try:
-            unique_id = str(uuid.uuid4())
+            unique_id = secrets.token_hex(16)
             filename = f"summary_text_{unique_id}.txt"
-            file_path = os.path.join('uploads', 'summary_texts', filename)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(text)
-            file_size = os.path.getsize(file_path)
-
-            conn = sqlite3.connect('database.db')
-            cursor = conn.cursor()
-            # Save summary text file metadata
-            current_time = get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')
-            cursor.execute('''
-                INSERT INTO summary_texts (user_id, original_filename, file_path, file_size, upload_date)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (session['user_id'], 'Metin Girişi (Özetleme).txt', filename, file_size, current_time))
-            # Save summary result to documents
-            cursor.execute('''
-                INSERT INTO documents (user_id, title, content, category)
-                VALUES (?, ?, ?, ?)
-            ''', (session['user_id'], 'Metin Özeti', result['summary'], 'text_summary'))
-            conn.commit()
-            conn.close()
+            file_path = os.path.join(UPLOAD_DIR['summary_texts'], filename)
+            file_size = write_text_file(file_path, text)
+
+            with get_conn(write=True) as conn:
+                cursor = conn.cursor()
+                # Both rows land in one transaction (one fsync)
+                cursor.execute('BEGIN IMMEDIATE')
+                # Save summary text file metadata
+                current_time = get_utc_timestamp()
+                cursor.execute('''
+                    INSERT INTO summary_texts (user_id, original_filename, file_path, file_size, upload_date)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (session['user_id'], 'Metin Girişi (Özetleme).txt', filename, file_size, current_time))
+                # Save summary result to documents
+                cursor.execute('''
+                    INSERT INTO documents (user_id, title, content, category, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (session['user_id'], 'Metin Özeti', result['summary'], 'text_summary', current_time))
+                conn.commit()
         except Exception:
             pass
    
     return jsonify(result)
 
 
+# Result rows from concurrent save requests are written by one background
+# thread that commits them in groups (one transaction per batch)
+PERSIST_MAX_BATCH = 64
+PERSIST_MAX_DELAY = 0.005  # seconds to wait for more rows after the first one
+
+def _insert_rows(rows):
+    """Insert a batch of (sql, params) rows in a single write transaction"""
+    with get_conn(write=True) as conn:
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for sql, params in rows:
+                conn.execute(sql, params)
+            conn.commit()
+            return [None] * len(rows)
+        except sqlite3.Error:
+            conn.rollback()
+        # One bad row must not fail the others: fall back to one commit per row
+        results = []
+        for sql, params in rows:
+            try:
+                conn.execute(sql, params)
+                conn.commit()
+                results.append(None)
+            except sqlite3.Error as e:
+                conn.rollback()
+                results.append(e)
+        return results
+
+persist_batcher = BatchingWorker(
+    _insert_rows,
+    max_batch_size=PERSIST_MAX_BATCH,
+    max_batch_delay=PERSIST_MAX_DELAY,
+    name='db-persist',
+)
+
+def persist_row(sql, params):
+    """Queue one INSERT for the group-commit writer and wait until it is committed"""
+    error = persist_batcher.submit((sql, params)).result()
+    if error is not None:
+        raise error
+
+# Statements used on every save are kept as module constants so the
+# per-connection statement cache can reuse their prepared form.
+# The last-input lookups take the newest row of each table first, so each
+# arm is a single probe of its (user_id, upload_date DESC) index.
+SQL_LAST_SUMMARY_INPUT = '''
+    SELECT * FROM (SELECT original_filename, upload_date FROM summary_texts
+                   WHERE user_id = ?1 ORDER BY upload_date DESC LIMIT 1)
+    UNION ALL
+    SELECT * FROM (SELECT original_filename, upload_date FROM pdf_files
+                   WHERE user_id = ?1 ORDER BY upload_date DESC LIMIT 1)
+    ORDER BY upload_date DESC LIMIT 1
+'''
+SQL_INSERT_SUMMARY_RESULT = '''
+    INSERT INTO summary_results (user_id, original_filename, file_path, file_size, summary_content, upload_date)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
 @app.route('/save_summary_result', methods=['POST'])
 def save_summary_result():
     if 'user_id' not in session:
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
-    print(f"Özet kaydetme isteği alındı - User ID: {session['user_id']}")
+    logger.debug("Özet kaydetme isteği alındı - User ID: %s", session['user_id'])
     data = request.get_json()
-    print(f"Gelen veri: {data}")
+    logger.debug("Gelen veri: %s", data)
     summary = data.get('summary', '')
     original_length = data.get('original_length', '')
     summary_length = data.get('summary_length', '')
     compression_rate = data.get('compression_rate', '')
     
     if not summary.strip():
-        print("Hata: Özet boş!")
+        logger.debug("Hata: Özet boş!")
         return jsonify({'error': 'Özet boş olamaz'}), 400
     
     try:
+        # One timestamp for the report, the output name and the DB row
+        now = get_turkish_time()
         # Create detailed summary content
         detailed_content = f"""ÖZET RAPORU
 {'='*50}
@@ -855,92 +1172,78 @@ Sıkıştırma Oranı: {compression_rate}
 {'-'*20}
 {summary}
 
-Oluşturulma Tarihi: {get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')}
+Oluşturulma Tarihi: {now.strftime('%Y-%m-%d %H:%M:%S')}
 """
         
         # Save summary result as file
-        unique_id = str(uuid.uuid4())
+        unique_id = secrets.token_hex(16)
         filename = f"ozet_sonucu_{unique_id}.txt"
-        file_path = os.path.join('uploads', 'summary_results', filename)
-        
-        print(f"Dosya yolu: {file_path}")
+        file_path = os.path.join(UPLOAD_DIR['summary_results'], filename)
         
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        logger.debug("Dosya yolu: %s", file_path)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(detailed_content)
+        file_size = write_text_file(file_path, detailed_content)
         
-        print(f"Dosya başarıyla kaydedildi: {file_path}")
-        
-        file_size = os.path.getsize(file_path)
-        
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
+        logger.debug("Dosya başarıyla kaydedildi: %s", file_path)
         
         # Find the most recent input file to get its name
-        cursor.execute('''
-            SELECT original_filename, upload_date FROM summary_texts WHERE user_id = ? 
-            UNION ALL
-            SELECT original_filename, upload_date FROM pdf_files WHERE user_id = ?
-            ORDER BY upload_date DESC LIMIT 1
-        ''', (session['user_id'], session['user_id']))
-        last_input = cursor.fetchone()
+        with get_conn() as conn:
+            last_input = conn.execute(SQL_LAST_SUMMARY_INPUT, (session['user_id'],)).fetchone()
         
-        # Create output filename based on input
-        if last_input and last_input[0] != 'Metin Girişi (Özetleme).txt':
-            # For PDF files, use the PDF name
-            input_name = last_input[0]
-            if input_name.endswith('.pdf'):
-                base_name = input_name[:-4]  # Remove .pdf extension
-                output_filename = f'Özet Sonucu - {base_name} - {get_turkish_time().strftime("%Y-%m-%d %H:%M")}.txt'
-            else:
-                output_filename = f'Özet Sonucu - {input_name} - {get_turkish_time().strftime("%Y-%m-%d %H:%M")}.txt'
-        else:
-            # For text input, use the generic name
-            output_filename = f'Özet Sonucu - {get_turkish_time().strftime("%Y-%m-%d %H:%M")}.txt'
+        # Create output filename based on input (text input gets the generic name)
+        input_name = last_input[0] if last_input and last_input[0] != 'Metin Girişi (Özetleme).txt' else None
+        output_filename = result_filename('Özet Sonucu', now, input_name, ('.pdf',))
         
         # Save to database
-        current_time = get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"Veritabanına kaydediliyor - Dosya adı: {output_filename}")
-        cursor.execute('''
-            INSERT INTO summary_results (user_id, original_filename, file_path, file_size, summary_content, upload_date)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (session['user_id'], output_filename, filename, file_size, summary, current_time))
-        conn.commit()
-        conn.close()
+        current_time = get_utc_timestamp(now)
+        logger.debug("Veritabanına kaydediliyor - Dosya adı: %s", output_filename)
+        persist_row(SQL_INSERT_SUMMARY_RESULT, (session['user_id'], output_filename, filename, file_size, summary, current_time))
         
-        print(f"Veritabanına başarıyla kaydedildi!")
+        logger.debug("Veritabanına başarıyla kaydedildi!")
         return jsonify({'success': True, 'message': 'Özet başarıyla kaydedildi'})
         
     except Exception as e:
-        print(f"Hata oluştu: {str(e)}")
+        logger.error("Hata oluştu: %s", e)
         return jsonify({'error': f'Kaydetme hatası: {str(e)}'}), 500
 
 
+SQL_LAST_CLASSIFICATION_INPUT = '''
+    SELECT * FROM (SELECT original_filename, upload_date FROM classification_texts
+                   WHERE user_id = ?1 ORDER BY upload_date DESC LIMIT 1)
+    UNION ALL
+    SELECT * FROM (SELECT original_filename, upload_date FROM classification_pdfs
+                   WHERE user_id = ?1 ORDER BY upload_date DESC LIMIT 1)
+    ORDER BY upload_date DESC LIMIT 1
+'''
+SQL_INSERT_CLASSIFICATION_RESULT = '''
+    INSERT INTO classification_results (user_id, original_filename, file_path, file_size, main_category, confidence_score, upload_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
 @app.route('/save_classification_result', methods=['POST'])
 def save_classification_result():
     if 'user_id' not in session:
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
-    print(f"=== CLASSIFICATION SAVE DEBUG ===")
-    print(f"User ID: {session['user_id']}")
+    logger.debug("Sınıflandırma kaydetme isteği alındı - User ID: %s", session['user_id'])
     data = request.get_json()
-    print(f"Raw request data: {data}")
+    logger.debug("Raw request data: %s", data)
     
     main_category = data.get('main_category', '')
     confidence_score = data.get('confidence_score', '')
     categories_html = data.get('categories_html', '')
     
-    print(f"Parsed main_category: '{main_category}'")
-    print(f"Parsed confidence_score: '{confidence_score}'")
-    print(f"Categories HTML length: {len(categories_html)}")
+    logger.debug("Parsed main_category: '%s'", main_category)
+    logger.debug("Parsed confidence_score: '%s'", confidence_score)
+    logger.debug("Categories HTML length: %s", len(categories_html))
     
     if not main_category.strip():
-        print(f"ERROR: Empty main_category - '{main_category}'")
+        logger.debug("ERROR: Empty main_category - '%s'", main_category)
         return jsonify({'error': 'Sınıflandırma sonucu boş olamaz'}), 400
     
     try:
+        # One timestamp for the report, the output name and the DB row
+        now = get_turkish_time()
         # Create detailed classification content
         detailed_content = f"""SINIFLANDIRMA RAPORU
 {'='*50}
@@ -952,57 +1255,29 @@ DETAYLI KATEGORILER:
 {'-'*20}
 {categories_html}
 
-Oluşturulma Tarihi: {get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')}
+Oluşturulma Tarihi: {now.strftime('%Y-%m-%d %H:%M:%S')}
 """
         
         # Save classification result as file
-        unique_id = str(uuid.uuid4())
+        unique_id = secrets.token_hex(16)
         filename = f"siniflandirma_sonucu_{unique_id}.txt"
-        file_path = os.path.join('uploads', 'classification_results', filename)
-        
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        file_path = os.path.join(UPLOAD_DIR['classification_results'], filename)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(detailed_content)
-        
-        file_size = os.path.getsize(file_path)
-        
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
+        file_size = write_text_file(file_path, detailed_content)
         
         # Find the most recent input file to get its name
-        cursor.execute('''
-            SELECT original_filename, upload_date FROM classification_texts WHERE user_id = ? 
-            UNION ALL
-            SELECT original_filename, upload_date FROM classification_pdfs WHERE user_id = ?
-            ORDER BY upload_date DESC LIMIT 1
-        ''', (session['user_id'], session['user_id']))
-        last_input = cursor.fetchone()
+        with get_conn() as conn:
+            last_input = conn.execute(SQL_LAST_CLASSIFICATION_INPUT, (session['user_id'],)).fetchone()
         
-        # Create output filename based on input
-        if last_input and last_input[0] != 'Metin Girişi (Sınıflandırma).txt':
-            # For PDF files, use the PDF name
-            input_name = last_input[0]
-            if input_name.endswith('.pdf'):
-                base_name = input_name[:-4]  # Remove .pdf extension
-                output_filename = f'Sınıflandırma Sonucu - {base_name} - {get_turkish_time().strftime("%Y-%m-%d %H:%M")}.txt'
-            else:
-                output_filename = f'Sınıflandırma Sonucu - {input_name} - {get_turkish_time().strftime("%Y-%m-%d %H:%M")}.txt'
-        else:
-            # For text input, use the generic name
-            output_filename = f'Sınıflandırma Sonucu - {get_turkish_time().strftime("%Y-%m-%d %H:%M")}.txt'
+        # Create output filename based on input (text input gets the generic name)
+        input_name = last_input[0] if last_input and last_input[0] != 'Metin Girişi (Sınıflandırma).txt' else None
+        output_filename = result_filename('Sınıflandırma Sonucu', now, input_name, ('.pdf',))
         
         # Save to database
-        current_time = get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute('''
-            INSERT INTO classification_results (user_id, original_filename, file_path, file_size, main_category, confidence_score, upload_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (session['user_id'], output_filename, filename, file_size, main_category, confidence_score, current_time))
-        conn.commit()
-        conn.close()
+        current_time = get_utc_timestamp(now)
+        persist_row(SQL_INSERT_CLASSIFICATION_RESULT, (session['user_id'], output_filename, filename, file_size, main_category, confidence_score, current_time))
         
-        print(f"SUCCESS: Classification saved with filename: {output_filename}")
+        logger.debug("SUCCESS: Classification saved with filename: %s", output_filename)
         return jsonify({'success': True, 'message': 'Sınıflandırma sonucu başarıyla kaydedildi'})
         
     except Exception as e:
@@ -1031,200 +1306,73 @@ def ner():
         return redirect(url_for('login'))
     return render_template('ner.html')
 
+# All OUTPUT RESULTS of a user, newest first (?1 = user_id)
+PREVIOUS_WORKS_SQL = '''
+    SELECT id, user_id, original_filename, 'summary_result' AS work_type, upload_date AS created_at,
+           'Özet Sonucu' AS description, file_path
+    FROM summary_results WHERE user_id = ?1
+    UNION ALL
+    SELECT id, user_id, original_filename, 'classification_result', upload_date,
+           'Sınıflandırma Sonucu', file_path
+    FROM classification_results WHERE user_id = ?1
+    UNION ALL
+    SELECT id, user_id, original_filename, 'ocr_result', upload_date,
+           'OCR Sonucu', file_path
+    FROM ocr_results WHERE user_id = ?1
+    UNION ALL
+    SELECT id, user_id, original_filename, 'ner_result', upload_date,
+           'NER Sonucu', file_path
+    FROM ner_results WHERE user_id = ?1
+    ORDER BY created_at DESC
+'''
+
 @app.route('/previous_works')
 def previous_works():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    # Get summary PDFs (summarization works)
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'summary' as work_type, upload_date as created_at, 
-               'Özetleme işlemi' as description, file_path
-        FROM pdf_files 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    summary_works = cursor.fetchall()
-    
-    # Get classification PDFs (classification works)
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'classification' as work_type, upload_date as created_at,
-               'Sınıflandırma işlemi' as description, file_path
-        FROM classification_pdfs 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    classification_works = cursor.fetchall()
-    
-    # Get OCR PDFs (OCR works)
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'ocr_pdf' as work_type, upload_date as created_at,
-               'OCR işlemi (PDF)' as description, file_path
-        FROM ocr_pdfs 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    ocr_pdf_works = cursor.fetchall()
-    
-    # Get OCR images (OCR works)
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'ocr_image' as work_type, upload_date as created_at,
-               'OCR işlemi (Resim)' as description, file_path
-        FROM ocr_images 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    ocr_image_works = cursor.fetchall()
-    
-    # Get NER PDFs (NER works)
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'ner' as work_type, upload_date as created_at,
-               'NER işlemi' as description, file_path
-        FROM ner_pdfs 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    ner_works = cursor.fetchall()
-    
-    # Get text input works
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'summary_text' as work_type, upload_date as created_at, 
-               'Metin Özetleme' as description, file_path
-        FROM summary_texts 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    summary_text_works = cursor.fetchall()
-    
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'classification_text' as work_type, upload_date as created_at,
-               'Metin Sınıflandırma' as description, file_path
-        FROM classification_texts 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    classification_text_works = cursor.fetchall()
-    
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'ner_text' as work_type, upload_date as created_at,
-               'Metin NER İşlemi' as description, file_path
-        FROM ner_texts 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    ner_text_works = cursor.fetchall()
-    
-    # Get summary results
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'summary_result' as work_type, upload_date as created_at,
-               'Özet Sonucu' as description, file_path
-        FROM summary_results 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    summary_result_works = cursor.fetchall()
-    
-    # Get classification results
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'classification_result' as work_type, upload_date as created_at,
-               'Sınıflandırma Sonucu' as description, file_path
-        FROM classification_results 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    classification_result_works = cursor.fetchall()
-    
-    # Get OCR results
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'ocr_result' as work_type, upload_date as created_at,
-               'OCR Sonucu' as description, file_path
-        FROM ocr_results 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    ocr_result_works = cursor.fetchall()
-    
-    # Get NER results
-    cursor.execute('''
-        SELECT id, user_id, original_filename, 'ner_result' as work_type, upload_date as created_at,
-               'NER Sonucu' as description, file_path
-        FROM ner_results 
-        WHERE user_id = ? 
-        ORDER BY upload_date DESC
-    ''', (session['user_id'],))
-    ner_result_works = cursor.fetchall()
-    
-    # Combine and sort ONLY OUTPUT RESULTS by date
-    all_works = (summary_result_works + classification_result_works + ocr_result_works + ner_result_works)
-    all_works.sort(key=lambda x: x[4], reverse=True)  # Sort by created_at
-    
-    conn.close()
+    with get_conn() as conn:
+        # Only output results are listed; input files live under /documents
+        all_works = conn.execute(PREVIOUS_WORKS_SQL, (session['user_id'],)).fetchall()
     
     return render_template('previous_works.html', works=all_works)
 
+# Document rows in the column order documents.html expects (?1 = user_id)
+USER_DOCUMENTS_SQL = '''
+    SELECT id, user_id, title, content, category, created_at
+    FROM documents WHERE user_id = ?1
+    ORDER BY created_at DESC
+'''
+
 @app.route('/documents')
 def documents():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    # Get documents
-    cursor.execute('SELECT * FROM documents WHERE user_id = ? ORDER BY created_at DESC', (session['user_id'],))
-    documents = cursor.fetchall()
-    
-    # Get summary PDFs
-    cursor.execute('SELECT * FROM pdf_files WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    summary_pdfs = cursor.fetchall()
-    
-    # Get classification PDFs
-    cursor.execute('SELECT * FROM classification_pdfs WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    classification_pdfs = cursor.fetchall()
-    
-    # Get OCR PDFs
-    cursor.execute('SELECT * FROM ocr_pdfs WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    ocr_pdfs = cursor.fetchall()
-    
-    # Get OCR images
-    cursor.execute('SELECT * FROM ocr_images WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    ocr_images = cursor.fetchall()
-    
-    # Get NER PDFs
-    cursor.execute('SELECT * FROM ner_pdfs WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    ner_pdfs = cursor.fetchall()
-
-    # Get text inputs
-    cursor.execute('SELECT * FROM summary_texts WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    summary_texts = cursor.fetchall()
-    cursor.execute('SELECT * FROM classification_texts WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    classification_texts = cursor.fetchall()
-    cursor.execute('SELECT * FROM ner_texts WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    ner_texts = cursor.fetchall()
-    
-    # Get summary results
-    cursor.execute('SELECT * FROM summary_results WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    summary_results = cursor.fetchall()
-    
-    # Get classification results
-    cursor.execute('SELECT * FROM classification_results WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    classification_results = cursor.fetchall()
+    user_id = session['user_id']
+    with get_conn() as conn:
+        # Both reads see the same snapshot
+        conn.execute('BEGIN')
+        documents = conn.execute(USER_DOCUMENTS_SQL, (user_id,)).fetchall()
+        # All uploaded input files in one pass, already sorted by timestamp desc
+        all_files = conn.execute(UPLOADED_FILES_SQL, (user_id,)).fetchall()
+        conn.commit()
     
-    conn.close()
+    # Partition by file type for the per-type lists
+    files_by_type = {}
+    for row in all_files:
+        files_by_type.setdefault(row[6], []).append(row)
     
     return render_template('documents.html', 
                          documents=documents, 
-                         summary_pdfs=summary_pdfs, 
-                         classification_pdfs=classification_pdfs,
-                         ocr_pdfs=ocr_pdfs,
-                         ocr_images=ocr_images,
-                         ner_pdfs=ner_pdfs,
-                         summary_texts=summary_texts,
-                         classification_texts=classification_texts,
-                         ner_texts=ner_texts)
+                         summary_pdfs=files_by_type.get('summary_pdf', []), 
+                         classification_pdfs=files_by_type.get('classification_pdf', []),
+                         ocr_pdfs=files_by_type.get('ocr_pdf', []),
+                         ocr_images=files_by_type.get('ocr_image', []),
+                         ner_pdfs=files_by_type.get('ner_pdf', []),
+                         summary_texts=files_by_type.get('summary_text', []),
+                         classification_texts=files_by_type.get('classification_text', []),
+                         ner_texts=files_by_type.get('ner_text', []))
 
 
 @app.route('/my_pdfs')
@@ -1232,11 +1380,10 @@ def my_pdfs():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM pdf_files WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    pdf_files = cursor.fetchall()
-    conn.close()
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM pdf_files WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
+        pdf_files = cursor.fetchall()
     
     return render_template('my_pdfs.html', pdf_files=pdf_files)
 
@@ -1245,11 +1392,10 @@ def my_classification_pdfs():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM classification_pdfs WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
-    classification_pdfs = cursor.fetchall()
-    conn.close()
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM classification_pdfs WHERE user_id = ? ORDER BY upload_date DESC', (session['user_id'],))
+        classification_pdfs = cursor.fetchall()
     
     return render_template('my_classification_pdfs.html', classification_pdfs=classification_pdfs)
 
@@ -1265,15 +1411,16 @@ def upload_classification_pdf():
     if pdf_file.filename == '':
         return jsonify({'success': False, 'error': 'PDF dosyası seçilmedi'})
     
-    if pdf_file and pdf_file.filename.lower().endswith('.pdf'):
+    if pdf_file and file_extension(pdf_file.filename) == '.pdf':
         # Generate unique filename while preserving original name
-        unique_id = str(uuid.uuid4())
-        name, ext = os.path.splitext(pdf_file.filename)
+        unique_id = secrets.token_hex(16)
+        name, ext = split_upload_name(pdf_file.filename)
         filename = f"{name}_{unique_id}{ext}"
-        file_path = os.path.join('uploads', 'classification_pdfs', filename)
+        file_path = os.path.join(UPLOAD_DIR['classification_pdfs'], filename)
         
         # Save file temporarily (not to database yet)
-        pdf_file.save(file_path)
+        save_upload(pdf_file, file_path)
+        register_temp_upload(unique_id, 'classification_pdfs', filename, f"{name}.pdf")
         
         return jsonify({
             'success': True,
@@ -1299,25 +1446,22 @@ def classify_text_endpoint():
     if not model_manager.ensure_classifier_loaded():
         return jsonify({'success': False, 'error': 'Sınıflandırıcı model yüklenemedi'})
     
-    result = classify_text(model_manager.classifier, text)
+    result = classification_batcher.submit(text).result()
     # Save input text to uploads/classification_texts on success
     if result.get('success'):
         try:
-            unique_id = str(uuid.uuid4())
+            unique_id = secrets.token_hex(16)
             filename = f"classification_text_{unique_id}.txt"
-            file_path = os.path.join('uploads', 'classification_texts', filename)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(text)
-            file_size = os.path.getsize(file_path)
-            conn = sqlite3.connect('database.db')
-            cursor = conn.cursor()
-            current_time = get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')
-            cursor.execute('''
-                INSERT INTO classification_texts (user_id, original_filename, file_path, file_size, upload_date)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (session['user_id'], 'Metin Girişi (Sınıflandırma).txt', filename, file_size, current_time))
-            conn.commit()
-            conn.close()
+            file_path = os.path.join(UPLOAD_DIR['classification_texts'], filename)
+            file_size = write_text_file(file_path, text)
+            with get_conn(write=True) as conn:
+                cursor = conn.cursor()
+                current_time = get_utc_timestamp()
+                cursor.execute('''
+                    INSERT INTO classification_texts (user_id, original_filename, file_path, file_size, upload_date)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (session['user_id'], 'Metin Girişi (Sınıflandırma).txt', filename, file_size, current_time))
+                conn.commit()
         except Exception:
             pass
     return jsonify(result)
@@ -1329,27 +1473,47 @@ def delete_pdf(pdf_id):
     if 'user_id' not in session:
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    # Get PDF info
-    cursor.execute('SELECT file_path FROM pdf_files WHERE id = ? AND user_id = ?', (pdf_id, session['user_id']))
-    pdf = cursor.fetchone()
+    with get_conn(write=True) as conn:
+        cursor = conn.cursor()
     
-    if pdf:
-        file_path = os.path.join('uploads', 'summary_pdfs', pdf[0])
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        
-        # Delete from database
-        cursor.execute('DELETE FROM pdf_files WHERE id = ? AND user_id = ?', (pdf_id, session['user_id']))
+        # Delete the row and get its file name in one statement
+        cursor.execute(SQL_DELETE_USER_FILE['pdf_files'], (pdf_id, session['user_id']))
+        pdf = cursor.fetchall()
         conn.commit()
-        conn.close()
-        
-        return jsonify({'success': True})
     
-    conn.close()
-    return jsonify({'error': 'PDF bulunamadı'}), 404
+    if not pdf:
+        return jsonify({'error': 'PDF bulunamadı'}), 404
+    
+    # Unlink once the writer connection is released
+    with suppress(FileNotFoundError):
+        os.remove(os.path.join(UPLOAD_DIR['summary_pdfs'], pdf[0][0]))
+    
+    return jsonify({'success': True})
+
+# Generated .txt files carry a fixed prefix that identifies their folder
+TEXT_PREFIX_TO_UPLOAD_DIR = (
+    ('ozet_sonucu_', 'summary_results'),
+    ('siniflandirma_sonucu_', 'classification_results'),
+    ('ocr_sonucu_', 'ocr_results'),  # Obje ve Karakter Tanıma sonuçları
+    ('ner_sonucu_', 'ner_results'),  # Varlık Tanıma sonuçları
+    ('summary_text_', 'summary_texts'),
+    ('classification_text_', 'classification_texts'),
+    ('ner_text_', 'ner_texts'),  # Varlık Tanıma metinleri
+)
+# Uploaded PDFs keep the user's file name, so only the folder set is known
+PDF_UPLOAD_DIRS = ('summary_pdfs', 'classification_pdfs', 'ocr_pdfs', 'ner_pdfs')
+IMAGE_UPLOAD_DIRS = ('ocr_images',)
+
+def _candidate_upload_dirs(filename, file_ext):
+    """Folders under uploads/ that can hold a file with this name"""
+    if file_ext == '.txt':
+        for prefix, upload_dir in TEXT_PREFIX_TO_UPLOAD_DIR:
+            if filename.startswith(prefix):
+                return (upload_dir,)
+        return ()
+    if file_ext == '.pdf':
+        return PDF_UPLOAD_DIRS
+    return IMAGE_UPLOAD_DIRS
 
 @app.route('/uploads/<path:filename>')
 def serve_upload(filename):
@@ -1358,73 +1522,36 @@ def serve_upload(filename):
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
     # Allow access to PDFs, text files, and common image formats
-    allowed_extensions = { '.pdf', '.txt', '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff' }
-    file_ext = os.path.splitext(filename.lower())[1]
-    if file_ext not in allowed_extensions:
+    file_ext = file_extension(filename)
+    if file_ext not in SERVED_FILE_EXTENSIONS:
         return jsonify({'error': 'Geçersiz dosya türü'}), 400
     
-    # Check if file exists in any relevant upload directory
-    summary_path = os.path.join('uploads', 'summary_pdfs', filename)
-    classification_path = os.path.join('uploads', 'classification_pdfs', filename)
-    ocr_pdf_path = os.path.join('uploads', 'ocr_pdfs', filename)
-    ocr_image_path = os.path.join('uploads', 'ocr_images', filename)
-    ner_pdf_path = os.path.join('uploads', 'ner_pdfs', filename)
-    summary_text_path = os.path.join('uploads', 'summary_texts', filename)
-    classification_text_path = os.path.join('uploads', 'classification_texts', filename)
-    ner_text_path = os.path.join('uploads', 'ner_texts', filename)
-    summary_result_path = os.path.join('uploads', 'summary_results', filename)
-    classification_result_path = os.path.join('uploads', 'classification_results', filename)
-    ocr_result_path = os.path.join('uploads', 'ocr_results', filename)
-    ner_result_path = os.path.join('uploads', 'ner_results', filename)
-    
-    if os.path.exists(summary_path):
-        return send_file(summary_path, as_attachment=False)
-    elif os.path.exists(classification_path):
-        return send_file(classification_path, as_attachment=False)
-    elif os.path.exists(ocr_pdf_path):
-        return send_file(ocr_pdf_path, as_attachment=False)
-    elif os.path.exists(ocr_image_path):
-        return send_file(ocr_image_path, as_attachment=False)
-    elif os.path.exists(ner_pdf_path):
-        return send_file(ner_pdf_path, as_attachment=False)
-    elif os.path.exists(summary_text_path):
-        return send_file(summary_text_path, as_attachment=False)
-    elif os.path.exists(classification_text_path):
-        return send_file(classification_text_path, as_attachment=False)
-    elif os.path.exists(ner_text_path):
-        return send_file(ner_text_path, as_attachment=False)
-    elif os.path.exists(summary_result_path):
-        return send_file(summary_result_path, as_attachment=False)
-    elif os.path.exists(classification_result_path):
-        return send_file(classification_result_path, as_attachment=False)
-    elif os.path.exists(ocr_result_path):
-        return send_file(ocr_result_path, as_attachment=False)
-    elif os.path.exists(ner_result_path):
-        return send_file(ner_result_path, as_attachment=False)
-    else:
-        return jsonify({'error': 'Dosya bulunamadı'}), 404
+    # Go straight to the candidate folder(s) instead of probing all twelve
+    # send_from_directory rejects paths escaping the folder and, with
+    # USE_X_SENDFILE, hands the transfer to the reverse proxy
+    for upload_dir in _candidate_upload_dirs(filename, file_ext):
+        try:
+            return send_from_directory(UPLOAD_DIR[upload_dir], filename, as_attachment=False)
+        except NotFound:
+            continue
+    return jsonify({'error': 'Dosya bulunamadı'}), 404
 
 @app.route('/delete_document/<int:doc_id>', methods=['DELETE'])
 def delete_document(doc_id):
     if 'user_id' not in session:
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    # Get document info
-    cursor.execute('SELECT * FROM documents WHERE id = ? AND user_id = ?', (doc_id, session['user_id']))
-    document = cursor.fetchone()
+    with get_conn(write=True) as conn:
+        cursor = conn.cursor()
     
-    if document:
-        # Delete from database
+        # One DELETE; rowcount says whether the document existed (no need to read its content first)
         cursor.execute('DELETE FROM documents WHERE id = ? AND user_id = ?', (doc_id, session['user_id']))
-        conn.commit()
-        conn.close()
+    
+        if cursor.rowcount:
+            conn.commit()
         
-        return jsonify({'success': True})
+            return jsonify({'success': True})
     
-    conn.close()
     return jsonify({'error': 'Belge bulunamadı'}), 404
 
 @app.route('/delete_classification_pdf/<int:pdf_id>', methods=['DELETE'])
@@ -1432,27 +1559,22 @@ def delete_classification_pdf(pdf_id):
     if 'user_id' not in session:
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    # Get PDF info
-    cursor.execute('SELECT file_path FROM classification_pdfs WHERE id = ? AND user_id = ?', (pdf_id, session['user_id']))
-    pdf = cursor.fetchone()
+    with get_conn(write=True) as conn:
+        cursor = conn.cursor()
     
-    if pdf:
-        file_path = os.path.join('uploads', 'classification_pdfs', pdf[0])
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        
-        # Delete from database
-        cursor.execute('DELETE FROM classification_pdfs WHERE id = ? AND user_id = ?', (pdf_id, session['user_id']))
+        # Delete the row and get its file name in one statement
+        cursor.execute(SQL_DELETE_USER_FILE['classification_pdfs'], (pdf_id, session['user_id']))
+        pdf = cursor.fetchall()
         conn.commit()
-        conn.close()
-        
-        return jsonify({'success': True})
     
-    conn.close()
-    return jsonify({'error': 'PDF bulunamadı'}), 404
+    if not pdf:
+        return jsonify({'error': 'PDF bulunamadı'}), 404
+    
+    # Unlink once the writer connection is released
+    with suppress(FileNotFoundError):
+        os.remove(os.path.join(UPLOAD_DIR['classification_pdfs'], pdf[0][0]))
+    
+    return jsonify({'success': True})
 
 @app.route('/upload_ocr_pdf', methods=['POST'])
 def upload_ocr_pdf():
@@ -1466,15 +1588,16 @@ def upload_ocr_pdf():
     if file.filename == '':
         return jsonify({'error': 'Dosya seçilmedi'}), 400
     
-    if file and file.filename.lower().endswith('.pdf'):
+    if file and file_extension(file.filename) == '.pdf':
         # Generate unique filename while preserving original name
-        unique_id = str(uuid.uuid4())
-        name, ext = os.path.splitext(file.filename)
+        unique_id = secrets.token_hex(16)
+        name, ext = split_upload_name(file.filename)
         filename = f"{name}_{unique_id}{ext}"
-        file_path = os.path.join('uploads', 'ocr_pdfs', filename)
+        file_path = os.path.join(UPLOAD_DIR['ocr_pdfs'], filename)
         
         # Save file temporarily (not to database yet)
-        file.save(file_path)
+        save_upload(file, file_path)
+        register_temp_upload(unique_id, 'ocr_pdfs', filename, f"{name}.pdf")
         
         return jsonify({
             'success': True,
@@ -1498,18 +1621,16 @@ def upload_ocr_image():
         return jsonify({'error': 'Dosya seçilmedi'}), 400
     
     # Check if file is an image
-    allowed_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff'}
-    file_ext = os.path.splitext(file.filename.lower())[1]
-    
-    if file and file_ext in allowed_extensions:
+    if file and file_extension(file.filename) in IMAGE_UPLOAD_EXTENSIONS:
         # Generate unique filename while preserving original name
-        unique_id = str(uuid.uuid4())
-        name, ext = os.path.splitext(file.filename)
+        unique_id = secrets.token_hex(16)
+        name, ext = split_upload_name(file.filename)
         filename = f"{name}_{unique_id}{ext}"
-        file_path = os.path.join('uploads', 'ocr_images', filename)
+        file_path = os.path.join(UPLOAD_DIR['ocr_images'], filename)
         
         # Save file temporarily (not to database yet)
-        file.save(file_path)
+        save_upload(file, file_path)
+        register_temp_upload(unique_id, 'ocr_images', filename, f"{name}{ext}")
         
         return jsonify({
             'success': True,
@@ -1520,6 +1641,95 @@ def upload_ocr_image():
     
     return jsonify({'error': 'Geçersiz dosya türü'}), 400
 
+# Bump when a change to the OCR pipeline (model, rendering, prompt, decoding)
+# changes its output, so texts cached by the old pipeline are OCR'd again
+OCR_CACHE_VERSION = 2
+
+SQL_FIND_OCR_CACHE = f'''
+    SELECT text, method, page_count FROM ocr_cache
+    WHERE user_id = ? AND sha256 = ? AND ocr_version = {OCR_CACHE_VERSION}
+'''
+SQL_STORE_OCR_CACHE = f'''
+    INSERT OR REPLACE INTO ocr_cache (user_id, sha256, text, method, page_count, ocr_version)
+    VALUES (?, ?, ?, ?, ?, {OCR_CACHE_VERSION})
+'''
+
+def file_sha256(file_path):
+    """Hex SHA-256 of a file's contents, or None if it cannot be read"""
+    try:
+        with open(file_path, 'rb') as f:
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+    except OSError:
+        return None
+
+def extract_pdf_texts(user_id, pdf_paths):
+    """
+    ocr_processor.extract_texts_from_pdfs() with a per-user cache of VLM OCR
+    results keyed by file content. Text-based PDFs are cheap to read again and
+    are not cached.
+    """
+    digests = [file_sha256(pdf_path) for pdf_path in pdf_paths]
+    results = [None] * len(pdf_paths)
+    
+    with get_conn() as conn:
+        for index, digest in enumerate(digests):
+            if digest is None:
+                continue
+            row = conn.execute(SQL_FIND_OCR_CACHE, (user_id, digest)).fetchone()
+            if row:
+                results[index] = {'success': True, 'text': row[0], 'method': row[1], 'page_count': row[2], 'error': None}
+    
+    misses = [index for index, result in enumerate(results) if result is None]
+    if misses:
+        for index, result in zip(misses, ocr_processor.extract_texts_from_pdfs([pdf_paths[i] for i in misses])):
+            results[index] = result
+            # Pages that failed are retried next time instead of being cached
+            if (result['success'] and result['method'] != 'text_extraction' and digests[index]
+                    and 'OCR Error:' not in result['text']):
+                persist_row(SQL_STORE_OCR_CACHE, (user_id, digests[index], result['text'], result['method'], result['page_count']))
+    
+    return results
+
+def extract_image_text(user_id, image_path):
+    """ocr_processor.extract_text_from_image() through the same per-user OCR cache"""
+    digest = file_sha256(image_path)
+    if digest is not None:
+        with get_conn() as conn:
+            row = conn.execute(SQL_FIND_OCR_CACHE, (user_id, digest)).fetchone()
+        if row:
+            return {'success': True, 'text': row[0], 'error': None}
+    
+    result = ocr_processor.extract_text_from_image(image_path)
+    if result['success'] and digest and not result['text'].startswith('OCR Error:'):
+        persist_row(SQL_STORE_OCR_CACHE, (user_id, digest, result['text'], 'qwen2_vl_ocr', 1))
+    return result
+
+# OCR-heavy requests (OCR, NER/summary/classification of PDFs) share one
+# concurrency limit; clients sending "Prefer: respond-async" get a job id
+# right away and poll /jobs/<job_id> instead of holding the connection open
+ocr_jobs = JobQueue()
+
+def run_job(kind, work, *args):
+    """Run work(*args) -> (payload, status) now, or as a background job if the client asked for one"""
+    if 'respond-async' in request.headers.get('Prefer', ''):
+        job_id = ocr_jobs.submit(session['user_id'], kind, work, *args)
+        return jsonify({'success': True, 'job_id': job_id, 'status': 'queued'}), 202, {
+            'Location': url_for('job_status', job_id=job_id),
+            'Preference-Applied': 'respond-async',
+        }
+    payload, status = ocr_jobs.run(work, *args)
+    return jsonify(payload), status
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Yetkisiz erişim'}), 401
+    
+    job = ocr_jobs.get(job_id, session['user_id'])
+    if job is None:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    return jsonify(job)
+
 @app.route('/ocr_pdf', methods=['POST'])
 def ocr_pdf():
     if 'user_id' not in session:
@@ -1531,53 +1741,46 @@ def ocr_pdf():
     if not pdf_id:
         return jsonify({'error': 'PDF seçilmedi'}), 400
     
-    # Find the PDF file in the uploads directory
-    upload_dir = os.path.join('uploads', 'ocr_pdfs')
-    pdf_path = None
-    original_filename = None
-    
-    for filename in os.listdir(upload_dir):
-        if pdf_id in filename:
-            pdf_path = os.path.join(upload_dir, filename)
-            # Extract original filename by removing UUID part (last part after last underscore)
-            name_parts = filename.rsplit('_', 1)  # Split from the right, only once
-            original_filename = name_parts[0] + '.pdf' if len(name_parts) > 1 else filename
-            break
-    
-    if not pdf_path:
+    # Look up the uploaded PDF by its temp_id
+    upload = find_temp_upload(pdf_id, 'ocr_pdfs')
+    if not upload:
         return jsonify({'error': 'PDF bulunamadı'}), 404
     
+    return run_job('ocr_pdf', _ocr_pdf_work, session['user_id'], *upload)
+
+def _ocr_pdf_work(user_id, pdf_path, filename, original_filename, file_size):
     # Perform real OCR using our processor
-    result = ocr_processor.extract_text_from_pdf(pdf_path)
+    result = extract_pdf_texts(user_id, [pdf_path])[0]
     
     if result['success']:
         # Save to database
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        current_time = get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute('''
-            INSERT INTO ocr_pdfs (user_id, original_filename, file_path, file_size, upload_date)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (session['user_id'], original_filename, filename, os.path.getsize(pdf_path), current_time))
-        conn.commit()
-        conn.close()
+        with get_conn(write=True) as conn:
+            cursor = conn.cursor()
+            current_time = get_utc_timestamp()
+            cursor.execute('''
+                INSERT INTO ocr_pdfs (user_id, original_filename, file_path, file_size, upload_date)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (user_id, original_filename, filename, file_size, current_time))
+            conn.commit()
         
         # Clear memory after successful OCR
         clear_memory_after_ocr()
         
-        return jsonify({
+        return {
             'success': True,
             'extracted_text': result['text'],
             'filename': original_filename,
             'method': result['method'],
             'page_count': result['page_count'],
             'text_length': len(result['text'])
-        })
+        }, 200
     else:
-        return jsonify({
+        # Failed jobs (typically out of memory) release the cache right away
+        clear_memory_after_ocr(force=True)
+        return {
             'success': False,
             'error': result['error']
-        }), 500
+        }, 500
 
 @app.route('/ocr_image', methods=['POST'])
 def ocr_image():
@@ -1590,124 +1793,114 @@ def ocr_image():
     if not image_id:
         return jsonify({'error': 'Resim seçilmedi'}), 400
     
-    # Find the image file in the uploads directory
-    upload_dir = os.path.join('uploads', 'ocr_images')
-    image_path = None
-    original_filename = None
-    
-    for filename in os.listdir(upload_dir):
-        if image_id in filename:
-            image_path = os.path.join(upload_dir, filename)
-            # Extract original filename by removing UUID part (last part after last underscore)
-            name_parts = filename.rsplit('_', 1)  # Split from the right, only once
-            original_filename = name_parts[0] + os.path.splitext(filename)[1] if len(name_parts) > 1 else filename
-            break
-    
-    if not image_path:
+    # Look up the uploaded image by its temp_id
+    upload = find_temp_upload(image_id, 'ocr_images')
+    if not upload:
         return jsonify({'error': 'Resim bulunamadı'}), 404
     
-    # Perform real OCR using our processor
-    result = ocr_processor.extract_text_from_image(image_path)
+    return run_job('ocr_image', _ocr_image_work, session['user_id'], *upload)
+
+def _ocr_image_work(user_id, image_path, filename, original_filename, file_size):
+    # Perform real OCR using our processor (or reuse the cached text of the same image)
+    result = extract_image_text(user_id, image_path)
     
     if result['success']:
         # Save to database
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        current_time = get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute('''
-            INSERT INTO ocr_images (user_id, original_filename, file_path, file_size, upload_date)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (session['user_id'], original_filename, filename, os.path.getsize(image_path), current_time))
-        conn.commit()
-        conn.close()
+        with get_conn(write=True) as conn:
+            cursor = conn.cursor()
+            current_time = get_utc_timestamp()
+            cursor.execute('''
+                INSERT INTO ocr_images (user_id, original_filename, file_path, file_size, upload_date)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (user_id, original_filename, filename, file_size, current_time))
+            conn.commit()
         
         # Clear memory after successful OCR
         clear_memory_after_ocr()
         
-        return jsonify({
+        return {
             'success': True,
             'extracted_text': result['text'],
             'filename': original_filename,
             'text_length': len(result['text'])
-        })
+        }, 200
     else:
-        return jsonify({
+        # Failed jobs (typically out of memory) release the cache right away
+        clear_memory_after_ocr(force=True)
+        return {
             'success': False,
             'error': result['error']
-        }), 500
+        }, 500
 
 @app.route('/delete_ocr_pdf/<int:pdf_id>', methods=['DELETE'])
 def delete_ocr_pdf(pdf_id):
     if 'user_id' not in session:
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    # Get PDF info
-    cursor.execute('SELECT file_path FROM ocr_pdfs WHERE id = ? AND user_id = ?', (pdf_id, session['user_id']))
-    pdf = cursor.fetchone()
+    with get_conn(write=True) as conn:
+        cursor = conn.cursor()
     
-    if pdf:
-        file_path = os.path.join('uploads', 'ocr_pdfs', pdf[0])
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        
-        # Delete from database
-        cursor.execute('DELETE FROM ocr_pdfs WHERE id = ? AND user_id = ?', (pdf_id, session['user_id']))
+        # Delete the row and get its file name in one statement
+        cursor.execute(SQL_DELETE_USER_FILE['ocr_pdfs'], (pdf_id, session['user_id']))
+        pdf = cursor.fetchall()
         conn.commit()
-        conn.close()
-        
-        return jsonify({'success': True})
     
-    conn.close()
-    return jsonify({'error': 'PDF bulunamadı'}), 404
+    if not pdf:
+        return jsonify({'error': 'PDF bulunamadı'}), 404
+    
+    # Unlink once the writer connection is released
+    with suppress(FileNotFoundError):
+        os.remove(os.path.join(UPLOAD_DIR['ocr_pdfs'], pdf[0][0]))
+    
+    return jsonify({'success': True})
 
 @app.route('/delete_ocr_image/<int:image_id>', methods=['DELETE'])
 def delete_ocr_image(image_id):
     if 'user_id' not in session:
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    # Get image info
-    cursor.execute('SELECT file_path FROM ocr_images WHERE id = ? AND user_id = ?', (image_id, session['user_id']))
-    image = cursor.fetchone()
+    with get_conn(write=True) as conn:
+        cursor = conn.cursor()
     
-    if image:
-        file_path = os.path.join('uploads', 'ocr_images', image[0])
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        
-        # Delete from database
-        cursor.execute('DELETE FROM ocr_images WHERE id = ? AND user_id = ?', (image_id, session['user_id']))
+        # Delete the row and get its file name in one statement
+        cursor.execute(SQL_DELETE_USER_FILE['ocr_images'], (image_id, session['user_id']))
+        image = cursor.fetchall()
         conn.commit()
-        conn.close()
-        
-        return jsonify({'success': True})
     
-    conn.close()
-    return jsonify({'error': 'Resim bulunamadı'}), 404
+    if not image:
+        return jsonify({'error': 'Resim bulunamadı'}), 404
+    
+    # Unlink once the writer connection is released
+    with suppress(FileNotFoundError):
+        os.remove(os.path.join(UPLOAD_DIR['ocr_images'], image[0][0]))
+    
+    return jsonify({'success': True})
+
+SQL_INSERT_OCR_RESULT = '''
+    INSERT INTO ocr_results (user_id, original_filename, file_path, file_size, ocr_text, source_type, upload_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
 
 @app.route('/save_ocr_result', methods=['POST'])
 def save_ocr_result():
     if 'user_id' not in session:
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
-    print(f"OCR kaydetme isteği alındı - User ID: {session['user_id']}")
+    logger.debug("OCR kaydetme isteği alındı - User ID: %s", session['user_id'])
     data = request.get_json()
-    print(f"Gelen veri: {data}")
+    logger.debug("Gelen veri: %s", data)
     
     ocr_text = data.get('ocr_text', '')
     source_type = data.get('source_type', 'unknown')  # 'pdf' or 'image'
     source_filename = data.get('source_filename', '')
     
     if not ocr_text.strip():
-        print("Hata: OCR metni boş!")
+        logger.debug("Hata: OCR metni boş!")
         return jsonify({'error': 'OCR metni boş olamaz'}), 400
     
     try:
+        # One timestamp for the report, the output name and the DB row
+        now = get_turkish_time()
         # Create detailed OCR content
         detailed_content = f"""OCR RAPORU
 {'='*50}
@@ -1720,66 +1913,49 @@ OCR METNİ:
 {'-'*20}
 {ocr_text}
 
-Oluşturulma Tarihi: {get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')}
+Oluşturulma Tarihi: {now.strftime('%Y-%m-%d %H:%M:%S')}
 """
         
         # Save OCR result as file
-        unique_id = str(uuid.uuid4())
+        unique_id = secrets.token_hex(16)
         filename = f"ocr_sonucu_{unique_id}.txt"
-        file_path = os.path.join('uploads', 'ocr_results', filename)
-        
-        print(f"Dosya yolu: {file_path}")
+        file_path = os.path.join(UPLOAD_DIR['ocr_results'], filename)
         
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        logger.debug("Dosya yolu: %s", file_path)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(detailed_content)
+        file_size = write_text_file(file_path, detailed_content)
         
-        print(f"Dosya başarıyla kaydedildi: {file_path}")
-        
-        file_size = os.path.getsize(file_path)
-        
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
+        logger.debug("Dosya başarıyla kaydedildi: %s", file_path)
         
         # Create output filename based on input
-        if source_filename and source_filename != 'Bilinmeyen':
-            if source_filename.endswith(('.pdf', '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff')):
-                base_name = os.path.splitext(source_filename)[0]
-                output_filename = f'OCR Sonucu - {base_name} - {get_turkish_time().strftime("%Y-%m-%d %H:%M")}.txt'
-            else:
-                output_filename = f'OCR Sonucu - {source_filename} - {get_turkish_time().strftime("%Y-%m-%d %H:%M")}.txt'
-        else:
-            output_filename = f'OCR Sonucu - {get_turkish_time().strftime("%Y-%m-%d %H:%M")}.txt'
-        
-
+        source_name = source_filename if source_filename != 'Bilinmeyen' else None
+        output_filename = result_filename('OCR Sonucu', now, source_name, OCR_SOURCE_EXTENSIONS)
         
         # Save to database
-        current_time = get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"Veritabanına kaydediliyor - Dosya adı: {output_filename}")
-        cursor.execute('''
-            INSERT INTO ocr_results (user_id, original_filename, file_path, file_size, ocr_text, source_type, upload_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (session['user_id'], output_filename, filename, file_size, ocr_text, source_type, current_time))
-        conn.commit()
-        conn.close()
+        current_time = get_utc_timestamp(now)
+        logger.debug("Veritabanına kaydediliyor - Dosya adı: %s", output_filename)
+        persist_row(SQL_INSERT_OCR_RESULT, (session['user_id'], output_filename, filename, file_size, ocr_text, source_type, current_time))
         
-        print(f"Veritabanına başarıyla kaydedildi!")
+        logger.debug("Veritabanına başarıyla kaydedildi!")
         return jsonify({'success': True, 'message': 'OCR sonucu başarıyla kaydedildi'})
         
     except Exception as e:
-        print(f"Hata oluştu: {str(e)}")
+        logger.error("Hata oluştu: %s", e)
         return jsonify({'error': f'Kaydetme hatası: {str(e)}'}), 500
 
+SQL_INSERT_NER_RESULT = '''
+    INSERT INTO ner_results (user_id, original_filename, file_path, file_size, ner_text, entities_json, source_type, upload_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
 @app.route('/save_ner_result', methods=['POST'])
 def save_ner_result():
     if 'user_id' not in session:
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
-    print(f"NER kaydetme isteği alındı - User ID: {session['user_id']}")
+    logger.debug("NER kaydetme isteği alındı - User ID: %s", session['user_id'])
     data = request.get_json()
-    print(f"Gelen veri: {data}")
+    logger.debug("Gelen veri: %s", data)
     
     ner_text = data.get('ner_text', '')
     entities = data.get('entities', [])
@@ -1787,10 +1963,12 @@ def save_ner_result():
     source_filename = data.get('source_filename', '')
     
     if not ner_text.strip():
-        print("Hata: NER metni boş!")
+        logger.debug("Hata: NER metni boş!")
         return jsonify({'error': 'NER metni boş olamaz'}), 400
     
     try:
+        # One timestamp for the report, the output name and the DB row
+        now = get_turkish_time()
         # Create detailed NER content
         entities_text = ""
         if entities:
@@ -1814,59 +1992,37 @@ ANALİZ EDİLEN METİN:
 {'-'*20}
 {ner_text}
 
-Oluşturulma Tarihi: {get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')}
+Oluşturulma Tarihi: {now.strftime('%Y-%m-%d %H:%M:%S')}
 """
         
         # Save NER result as file
-        unique_id = str(uuid.uuid4())
+        unique_id = secrets.token_hex(16)
         filename = f"ner_sonucu_{unique_id}.txt"
-        file_path = os.path.join('uploads', 'ner_results', filename)
-        
-        print(f"Dosya yolu: {file_path}")
-        
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        file_path = os.path.join(UPLOAD_DIR['ner_results'], filename)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(detailed_content)
+        logger.debug("Dosya yolu: %s", file_path)
         
-        print(f"Dosya başarıyla kaydedildi: {file_path}")
+        file_size = write_text_file(file_path, detailed_content)
         
-        file_size = os.path.getsize(file_path)
-        
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
+        logger.debug("Dosya başarıyla kaydedildi: %s", file_path)
         
         # Create output filename based on input
-        if source_filename and source_filename != 'Bilinmeyen':
-            if source_filename.endswith('.pdf'):
-                base_name = os.path.splitext(source_filename)[0]
-                output_filename = f'NER Sonucu - {base_name} - {get_turkish_time().strftime("%Y-%m-%d %H:%M")}.txt'
-            else:
-                output_filename = f'NER Sonucu - {source_filename} - {get_turkish_time().strftime("%Y-%m-%d %H:%M")}.txt'
-        else:
-            output_filename = f'NER Sonucu - {get_turkish_time().strftime("%Y-%m-%d %H:%M")}.txt'
-        
-
+        source_name = source_filename if source_filename != 'Bilinmeyen' else None
+        output_filename = result_filename('NER Sonucu', now, source_name, ('.pdf',))
         
         # Save to database
-        current_time = get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"Veritabanına kaydediliyor - Dosya adı: {output_filename}")
+        current_time = get_utc_timestamp(now)
+        logger.debug("Veritabanına kaydediliyor - Dosya adı: %s", output_filename)
         import json
         entities_json = json.dumps(entities, ensure_ascii=False) if entities else '[]'
         
-        cursor.execute('''
-            INSERT INTO ner_results (user_id, original_filename, file_path, file_size, ner_text, entities_json, source_type, upload_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (session['user_id'], output_filename, filename, file_size, ner_text, entities_json, source_type, current_time))
-        conn.commit()
-        conn.close()
+        persist_row(SQL_INSERT_NER_RESULT, (session['user_id'], output_filename, filename, file_size, ner_text, entities_json, source_type, current_time))
         
-        print(f"Veritabanına başarıyla kaydedildi!")
+        logger.debug("Veritabanına başarıyla kaydedildi!")
         return jsonify({'success': True, 'message': 'NER sonucu başarıyla kaydedildi'})
         
     except Exception as e:
-        print(f"Hata oluştu: {str(e)}")
+        logger.error("Hata oluştu: %s", e)
         return jsonify({'error': f'Kaydetme hatası: {str(e)}'}), 500
 
 @app.route('/upload_ner_pdf', methods=['POST'])
@@ -1881,15 +2037,16 @@ def upload_ner_pdf():
     if file.filename == '':
         return jsonify({'error': 'Dosya seçilmedi'}), 400
     
-    if file and file.filename.lower().endswith('.pdf'):
+    if file and file_extension(file.filename) == '.pdf':
         # Generate unique filename while preserving original name
-        unique_id = str(uuid.uuid4())
-        name, ext = os.path.splitext(file.filename)
+        unique_id = secrets.token_hex(16)
+        name, ext = split_upload_name(file.filename)
         filename = f"{name}_{unique_id}{ext}"
-        file_path = os.path.join('uploads', 'ner_pdfs', filename)
+        file_path = os.path.join(UPLOAD_DIR['ner_pdfs'], filename)
         
         # Save file temporarily (not to database yet)
-        file.save(file_path)
+        save_upload(file, file_path)
+        register_temp_upload(unique_id, 'ner_pdfs', filename, f"{name}.pdf")
         
         return jsonify({
             'success': True,
@@ -1911,50 +2068,42 @@ def process_ner_pdf():
     if not pdf_id:
         return jsonify({'error': 'PDF seçilmedi'}), 400
     
-    # Find the PDF file in the uploads directory
-    upload_dir = os.path.join('uploads', 'ner_pdfs')
-    pdf_path = None
-    original_filename = None
-    
-    for filename in os.listdir(upload_dir):
-        if pdf_id in filename:
-            pdf_path = os.path.join(upload_dir, filename)
-            # Extract original filename by removing UUID part (last part after last underscore)
-            name_parts = filename.rsplit('_', 1)  # Split from the right, only once
-            original_filename = name_parts[0] + '.pdf' if len(name_parts) > 1 else filename
-            break
-    
-    if not pdf_path:
+    # Look up the uploaded PDF by its temp_id
+    upload = find_temp_upload(pdf_id, 'ner_pdfs')
+    if not upload:
         return jsonify({'error': 'PDF bulunamadı'}), 404
     
+    return run_job('ner_pdf', _process_ner_pdf_work, session['user_id'], *upload)
+
+def _process_ner_pdf_work(user_id, pdf_path, filename, original_filename, file_size):
     # First extract text using OCR
-    ocr_result = ocr_processor.extract_text_from_pdf(pdf_path)
+    ocr_result = extract_pdf_texts(user_id, [pdf_path])[0]
     
     if not ocr_result['success']:
-        return jsonify({
+        clear_memory_after_ocr(force=True)
+        return {
             'success': False,
             'error': f"Failed to extract text: {ocr_result['error']}"
-        }), 500
+        }, 500
     
     # Then perform NER analysis
     ner_result = ner_processor.analyze_entities(ocr_result['text'])
     
     if ner_result['success']:
         # Save to database
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        current_time = get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute('''
-            INSERT INTO ner_pdfs (user_id, original_filename, file_path, file_size, upload_date)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (session['user_id'], original_filename, filename, os.path.getsize(pdf_path), current_time))
-        conn.commit()
-        conn.close()
+        with get_conn(write=True) as conn:
+            cursor = conn.cursor()
+            current_time = get_utc_timestamp()
+            cursor.execute('''
+                INSERT INTO ner_pdfs (user_id, original_filename, file_path, file_size, upload_date)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (user_id, original_filename, filename, file_size, current_time))
+            conn.commit()
         
         # Clear memory after OCR and NER processing
         clear_memory_after_ocr()
         
-        return jsonify({
+        return {
             'success': True,
             'entities': ner_result['entities'],
             'entity_count': ner_result['entity_count'],
@@ -1962,39 +2111,34 @@ def process_ner_pdf():
             'text_length': len(ocr_result['text']),
             'extraction_method': ocr_result['method'],
             'text': ocr_result['text']
-        })
+        }, 200
     else:
-        return jsonify({
+        return {
             'success': False,
             'error': ner_result['error']
-        }), 500
+        }, 500
 
 @app.route('/delete_ner_pdf/<int:pdf_id>', methods=['DELETE'])
 def delete_ner_pdf(pdf_id):
     if 'user_id' not in session:
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
-    
-    # Get PDF info
-    cursor.execute('SELECT file_path FROM ner_pdfs WHERE id = ? AND user_id = ?', (pdf_id, session['user_id']))
-    pdf = cursor.fetchone()
+    with get_conn(write=True) as conn:
+        cursor = conn.cursor()
     
-    if pdf:
-        file_path = os.path.join('uploads', 'ner_pdfs', pdf[0])
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        
-        # Delete from database
-        cursor.execute('DELETE FROM ner_pdfs WHERE id = ? AND user_id = ?', (pdf_id, session['user_id']))
+        # Delete the row and get its file name in one statement
+        cursor.execute(SQL_DELETE_USER_FILE['ner_pdfs'], (pdf_id, session['user_id']))
+        pdf = cursor.fetchall()
         conn.commit()
-        conn.close()
-        
-        return jsonify({'success': True})
     
-    conn.close()
-    return jsonify({'error': 'PDF bulunamadı'}), 404
+    if not pdf:
+        return jsonify({'error': 'PDF bulunamadı'}), 404
+    
+    # Unlink once the writer connection is released
+    with suppress(FileNotFoundError):
+        os.remove(os.path.join(UPLOAD_DIR['ner_pdfs'], pdf[0][0]))
+    
+    return jsonify({'success': True})
 
 @app.route('/process_ner_text', methods=['POST'])
 def process_ner_text():
@@ -2013,21 +2157,18 @@ def process_ner_text():
     if ner_result['success']:
         # Save input text as .txt file under uploads/ner_texts
         try:
-            unique_id = str(uuid.uuid4())
+            unique_id = secrets.token_hex(16)
             filename = f"ner_text_{unique_id}.txt"
-            file_path = os.path.join('uploads', 'ner_texts', filename)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(text)
-            file_size = os.path.getsize(file_path)
-            conn = sqlite3.connect('database.db')
-            cursor = conn.cursor()
-            current_time = get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')
-            cursor.execute('''
-                INSERT INTO ner_texts (user_id, original_filename, file_path, file_size, upload_date)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (session['user_id'], 'Metin Girişi (NER).txt', filename, file_size, current_time))
-            conn.commit()
-            conn.close()
+            file_path = os.path.join(UPLOAD_DIR['ner_texts'], filename)
+            file_size = write_text_file(file_path, text)
+            with get_conn(write=True) as conn:
+                cursor = conn.cursor()
+                current_time = get_utc_timestamp()
+                cursor.execute('''
+                    INSERT INTO ner_texts (user_id, original_filename, file_path, file_size, upload_date)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (session['user_id'], 'Metin Girişi (NER).txt', filename, file_size, current_time))
+                conn.commit()
         except Exception:
             pass
         return jsonify({
@@ -2055,77 +2196,76 @@ def summarize_pdfs():
     if not pdf_ids:
         return jsonify({'error': 'PDF seçilmedi'}), 400
     
-    # Extract text from all PDFs using OCR
-    all_text = ""
+    # Look up the uploaded PDFs by their temp_ids
+    uploads = [upload for upload in (find_temp_upload(temp_id, 'summary_pdfs') for temp_id in pdf_ids) if upload]
+    
+    return run_job('summarize_pdfs', _summarize_pdfs_work, session['user_id'], uploads)
+
+def _summarize_pdfs_work(user_id, uploads):
+    # Extract text from all PDFs using OCR (joined once at the end)
+    text_parts = []
     pdf_count = 0
     
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
+    saved_files = []
     
-    for temp_id in pdf_ids:
-        # Find the PDF file in the uploads directory
-        upload_dir = os.path.join('uploads', 'summary_pdfs')
-        for filename in os.listdir(upload_dir):
-            if temp_id in filename:
-                file_path = os.path.join(upload_dir, filename)
-                # Extract original filename by removing UUID part (last part after last underscore)
-                name_parts = filename.rsplit('_', 1)  # Split from the right, only once
-                original_filename = name_parts[0] + '.pdf' if len(name_parts) > 1 else filename
-                
-                # Extract text using OCR
-                ocr_result = ocr_processor.extract_text_from_pdf(file_path)
-                
-                if ocr_result['success']:
-                    all_text += f"\n\n--- {original_filename} ---\n"
-                    all_text += ocr_result['text']
-                    pdf_count += 1
-                    
-                    # Save to database
-                    current_time = get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')
-                    cursor.execute('''
-                        INSERT INTO pdf_files (user_id, original_filename, file_path, file_size, upload_date)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (session['user_id'], original_filename, filename, os.path.getsize(file_path), current_time))
-                
-                # Clear memory after each PDF processing
-                clear_memory_after_ocr()
-                break
-    
-    conn.commit()
-    conn.close()
+    # OCR all PDFs in one call so scanned pages from different files share GPU batches
+    ocr_results = extract_pdf_texts(user_id, [upload[0] for upload in uploads]) if uploads else []
     
+    upload_date = get_utc_timestamp()
+    for (file_path, filename, original_filename, file_size), ocr_result in zip(uploads, ocr_results):
+        if ocr_result['success']:
+            text_parts.append(f"\n\n--- {original_filename} ---\n")
+            text_parts.append(ocr_result['text'])
+            pdf_count += 1
+            
+            # Saved to database after all PDFs are processed
+            saved_files.append((user_id, original_filename, filename, file_size, upload_date))
+    
+    # Release GPU cache once for the whole batch if memory is tight (always after a failure)
+    if ocr_results:
+        clear_memory_after_ocr(force=not all(result['success'] for result in ocr_results))
+    
+    # Write all rows at once: the writer connection is never held during OCR
+    if saved_files:
+        with get_conn(write=True) as conn:
+            conn.executemany('''
+                INSERT INTO pdf_files (user_id, original_filename, file_path, file_size, upload_date)
+                VALUES (?, ?, ?, ?, ?)
+            ''', saved_files)
+            conn.commit()
+    
+    all_text = "".join(text_parts)
     if not all_text.strip():
-        return jsonify({'error': 'PDF\'lerden metin çıkarılamadı'}), 400
+        return {'error': 'PDF\'lerden metin çıkarılamadı'}, 400
     
     # Perform summarization
     if not model_manager.ensure_summarizer_loaded():
-        return jsonify({'error': 'Özetleyici model yüklenemedi'}), 500
+        return {'error': 'Özetleyici model yüklenemedi'}, 500
     
-    result = summarize_text(model_manager.summarizer, all_text)
+    result = summarization_worker.submit(all_text).result()
     
     if result['success']:
         # Save summary to database
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO documents (user_id, title, content, category)
-            VALUES (?, ?, ?, ?)
-        ''', (session['user_id'], f'PDF Özeti ({pdf_count} dosya)', result['summary'], 'pdf_summary'))
-        conn.commit()
-        conn.close()
+        with get_conn(write=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO documents (user_id, title, content, category, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (user_id, f'PDF Özeti ({pdf_count} dosya)', result['summary'], 'pdf_summary', get_utc_timestamp()))
+            conn.commit()
         
-        return jsonify({
+        return {
             'success': True,
             'summary': result['summary'],
             'pdf_count': pdf_count,
             'original_length': len(all_text),
             'summary_length': len(result['summary'])
-        })
+        }, 200
     else:
-        return jsonify({
+        return {
             'success': False,
             'error': result['error']
-        }), 500
+        }, 500
 
 # Enhanced classification with OCR support
 @app.route('/classify_pdfs', methods=['POST'])
@@ -2139,91 +2279,68 @@ def classify_pdfs():
     if not pdf_ids:
         return jsonify({'success': False, 'error': 'PDF seçilmedi'})
     
-    # Extract text from all PDFs using OCR
-    all_text = ""
+    # Look up the uploaded PDFs by their temp_ids
+    uploads = [upload for upload in (find_temp_upload(temp_id, 'classification_pdfs') for temp_id in pdf_ids) if upload]
+    
+    return run_job('classify_pdfs', _classify_pdfs_work, session['user_id'], uploads)
+
+def _classify_pdfs_work(user_id, uploads):
+    # Extract text from all PDFs using OCR (joined once at the end)
+    text_parts = []
     pdf_count = 0
     
-    conn = sqlite3.connect('database.db')
-    cursor = conn.cursor()
+    saved_files = []
     
-    for temp_id in pdf_ids:
-        # Find the PDF file in the uploads directory
-        upload_dir = os.path.join('uploads', 'classification_pdfs')
-        for filename in os.listdir(upload_dir):
-            if temp_id in filename:
-                file_path = os.path.join(upload_dir, filename)
-                # Extract original filename by removing UUID part (last part after last underscore)
-                name_parts = filename.rsplit('_', 1)  # Split from the right, only once
-                original_filename = name_parts[0] + '.pdf' if len(name_parts) > 1 else filename
-                
-                # Extract text using OCR
-                ocr_result = ocr_processor.extract_text_from_pdf(file_path)
-                
-                if ocr_result['success']:
-                    all_text += " " + ocr_result['text']
-                    pdf_count += 1
-                    
-                    # Save to database
-                    current_time = get_turkish_time().strftime('%Y-%m-%d %H:%M:%S')
-                    cursor.execute('''
-                        INSERT INTO classification_pdfs (user_id, original_filename, file_path, file_size, upload_date)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (session['user_id'], original_filename, filename, os.path.getsize(file_path), current_time))
-                
-                # Clear memory after each PDF processing
-                clear_memory_after_ocr()
-                break
-    
-    conn.commit()
-    conn.close()
+    # OCR all PDFs in one call so scanned pages from different files share GPU batches
+    ocr_results = extract_pdf_texts(user_id, [upload[0] for upload in uploads]) if uploads else []
     
+    upload_date = get_utc_timestamp()
+    for (file_path, filename, original_filename, file_size), ocr_result in zip(uploads, ocr_results):
+        if ocr_result['success']:
+            text_parts.append(" " + ocr_result['text'])
+            pdf_count += 1
+            
+            # Saved to database after all PDFs are processed
+            saved_files.append((user_id, original_filename, filename, file_size, upload_date))
+    
+    # Release GPU cache once for the whole batch if memory is tight (always after a failure)
+    if ocr_results:
+        clear_memory_after_ocr(force=not all(result['success'] for result in ocr_results))
+    
+    # Write all rows at once: the writer connection is never held during OCR
+    if saved_files:
+        with get_conn(write=True) as conn:
+            conn.executemany('''
+                INSERT INTO classification_pdfs (user_id, original_filename, file_path, file_size, upload_date)
+                VALUES (?, ?, ?, ?, ?)
+            ''', saved_files)
+            conn.commit()
+    
+    all_text = "".join(text_parts)
     if not all_text.strip():
-        return jsonify({'success': False, 'error': 'PDF\'lerden metin çıkarılamadı'})
+        return {'success': False, 'error': 'PDF\'lerden metin çıkarılamadı'}, 200
     
     # Perform classification
     if not model_manager.ensure_classifier_loaded():
-        return jsonify({'success': False, 'error': 'Sınıflandırıcı model yüklenemedi'})
+        return {'success': False, 'error': 'Sınıflandırıcı model yüklenemedi'}, 200
     
-    result = classify_text(model_manager.classifier, all_text)
+    result = classification_batcher.submit(all_text).result()
     
     if result['success']:
-        return jsonify({
+        return {
             'success': True,
             'categories': result['categories'],
             'main_category': result['main_category'],
             'confidence': result['confidence'],
             'pdf_count': pdf_count
-        })
+        }, 200
     else:
-        return jsonify({
+        return {
             'success': False,
             'error': result['error']
-        })
-def load_model_with_progress(model_name, load_function):
-    """Load a single model with progress tracking"""
-    print(f"🔄 Starting to load {model_name}...")
-    start_time = time.time()
-    
-    try:
-        # Suppress verbose output during model loading
-        with SuppressOutput():
-            success = load_function()
-        
-        elapsed_time = time.time() - start_time
-        
-        if success:
-            print(f"✅ {model_name} loaded successfully in {elapsed_time:.2f}s")
-            return True, model_name, elapsed_time
-        else:
-            print(f"❌ Failed to load {model_name}")
-            return False, model_name, elapsed_time
-    except Exception as e:
-        elapsed_time = time.time() - start_time
-        print(f"❌ Error loading {model_name}: {str(e)}")
-        return False, model_name, elapsed_time
-
+        }, 200
 def load_models_on_startup():
-    """Load all models sequentially before starting the server"""
+    """Load all models (in parallel) before starting the server"""
     
     # Check if models are already loaded (to prevent reloading on Flask restart)
     if (hasattr(model_manager, 'classifier') and model_manager.classifier is not None and
@@ -2234,37 +2351,37 @@ def load_models_on_startup():
         return True
     
         print("🚀 Initializing GovAI...")
-    print("📊 Loading all models sequentially...")
+    print("📊 Loading all models in parallel...")
     
-    # Define all models to load in order
-    models_to_load = [
-        ("1. Classifier (XLM-RoBERTa)", model_manager.load_classifier),
-        ("2. Summarizer (LLaMA 3.1 8B)", model_manager.load_summarizer),
-        ("3. NER Processor (Turkish BERT)", model_manager.load_ner_model),
-        ("4. OCR Processor (Qwen2.5-VL)", model_manager.load_ocr_model)
-    ]
+    model_names = {
+        'classifier': "1. Classifier (XLM-RoBERTa)",
+        'summarizer': "2. Summarizer (LLaMA 3.1 8B)",
+        'ner': "3. NER Processor (Turkish BERT)",
+        'ocr': "4. OCR Processor (Qwen2.5-VL)",
+    }
     
     # Track overall progress
     total_start_time = time.time()
+    
+    # The four loaders run concurrently; startup takes as long as the slowest model
+    try:
+        # Suppress verbose output during model loading
+        with suppress_output():
+            results = model_manager.load_all_models()
+    except Exception as e:
+        print(f"❌ Error loading models: {str(e)}")
+        results = {}
+    
     loaded_models = []
     failed_models = []
-    
-    # Load models sequentially
-    for i, (model_name, load_function) in enumerate(models_to_load, 1):
-        print(f"\n{'='*60}")
-        print(f"📥 Loading Model {i}/4: {model_name}")
-        print(f"{'='*60}")
-        
-        success, name, elapsed_time = load_model_with_progress(model_name, load_function)
-        
+    for key, model_name in model_names.items():
+        success, elapsed_time = results.get(key, (False, 0.0))
         if success:
-            loaded_models.append((name, elapsed_time))
+            print(f"✅ {model_name} loaded successfully in {elapsed_time:.2f}s")
+            loaded_models.append((model_name, elapsed_time))
         else:
-            failed_models.append(name)
-        
-        # Show progress
-        progress = (i / 4) * 100
-        print(f"📊 Overall Progress: {progress:.0f}% ({i}/4 models processed)")
+            print(f"❌ Failed to load {model_name}")
+            failed_models.append(model_name)
     
     # Calculate total time
     total_elapsed_time = time.time() - total_start_time
@@ -2292,9 +2409,6 @@ def load_models_on_startup():
     
     if all_models_loaded:
         print("🎉 All 4 models loaded successfully! Ready to start server...")
-        # Mark models as loaded in the manager
-        ModelManager._models_loaded = True
-        
         # Clear memory after loading all models
         print("🧹 Clearing memory after model loading...")
         model_manager.cleanup_models()
@@ -2311,44 +2425,35 @@ def load_models_on_startup():
         return True  # Still start the server, failed models will load lazily
 
 
+RESULT_TABLES = ('summary_results', 'classification_results', 'ocr_results', 'ner_results')
+# Ids per IN (...) list: older SQLite builds allow at most 999 bound parameters (one is user_id)
+SQL_MAX_IN_IDS = 998
+# Work types delete_multiple_results accepts, mapped to their table (others are skipped)
+BATCH_DELETE_TABLES = {'summary_result': 'summary_results', 'classification_result': 'classification_results'}
+
 @app.route('/delete_work_result/<table_name>/<int:work_id>', methods=['DELETE'])
 def delete_work_result(table_name, work_id):
     if 'user_id' not in session:
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
-    if table_name not in ['summary_results', 'classification_results', 'ocr_results', 'ner_results']:
+    if table_name not in RESULT_TABLES:
         return jsonify({'error': 'Geçersiz tablo adı'}), 400
     
     try:
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
-        
-        cursor.execute(f'SELECT file_path FROM {table_name} WHERE id = ? AND user_id = ?', (work_id, session['user_id']))
-        result = cursor.fetchone()
-        
-        if not result:
-            return jsonify({'error': 'Kayıt bulunamadı'}), 404
-        
-        file_path = result[0]
-        cursor.execute(f'DELETE FROM {table_name} WHERE id = ? AND user_id = ?', (work_id, session['user_id']))
+        with get_conn(write=True) as conn:
+            cursor = conn.cursor()
         
-        if cursor.rowcount == 0:
-            return jsonify({'error': 'Silme işlemi başarısız'}), 404
+            cursor.execute(SQL_DELETE_USER_FILE[table_name], (work_id, session['user_id']))
+            result = cursor.fetchall()
         
-        if table_name == 'summary_results':
-            full_file_path = os.path.join('uploads', 'summary_results', file_path)
-        elif table_name == 'classification_results':
-            full_file_path = os.path.join('uploads', 'classification_results', file_path)
-        elif table_name == 'ocr_results':
-            full_file_path = os.path.join('uploads', 'ocr_results', file_path)
-        elif table_name == 'ner_results':
-            full_file_path = os.path.join('uploads', 'ner_results', file_path)
+            if not result:
+                return jsonify({'error': 'Kayıt bulunamadı'}), 404
         
-        if os.path.exists(full_file_path):
-            os.remove(full_file_path)
+            conn.commit()
         
-        conn.commit()
-        conn.close()
+        # Result tables share their upload folder's name; unlink once the writer is released
+        with suppress(FileNotFoundError):
+            os.remove(os.path.join(UPLOAD_DIR[table_name], result[0][0]))
         
         return jsonify({'success': True, 'message': 'Sonuç başarıyla silindi'})
         
@@ -2368,39 +2473,37 @@ def delete_multiple_results():
         return jsonify({'error': 'Silinecek öğe bulunamadı'}), 400
     
     try:
-        conn = sqlite3.connect('database.db')
-        cursor = conn.cursor()
+        with get_conn(write=True) as conn:
+            cursor = conn.cursor()
         
-        deleted_count = 0
-        for work_info in work_ids:
-            work_id = work_info['id']
-            work_type = work_info['type']
-            
-            if work_type not in ['summary_result', 'classification_result']:
-                continue
-                
-            table_name = work_type + 's'
-            
-            cursor.execute(f'SELECT file_path FROM {table_name} WHERE id = ? AND user_id = ?', (work_id, session['user_id']))
-            result = cursor.fetchone()
+            # One DELETE per table (per chunk of ids) instead of one per item
+            ids_by_table = defaultdict(list)
+            for work_info in work_ids:
+                table_name = BATCH_DELETE_TABLES.get(work_info['type'])
+                if table_name is not None:
+                    ids_by_table[table_name].append(work_info['id'])
             
-            if result:
-                file_path = result[0]
-                cursor.execute(f'DELETE FROM {table_name} WHERE id = ? AND user_id = ?', (work_id, session['user_id']))
-                
-                if cursor.rowcount > 0:
-                    deleted_count += 1
-                    
-                    if table_name == 'summary_results':
-                        full_file_path = os.path.join('uploads', 'summary_results', file_path)
-                    elif table_name == 'classification_results':
-                        full_file_path = os.path.join('uploads', 'classification_results', file_path)
-                    
-                    if os.path.exists(full_file_path):
-                        os.remove(full_file_path)
+            deleted_count = 0
+            file_paths = []
+            # One transaction for all tables; IMMEDIATE takes the write lock up front
+            # so another worker process cannot make it fail halfway with SQLITE_BUSY
+            cursor.execute('BEGIN IMMEDIATE')
+            for table_name, ids in ids_by_table.items():
+                for start in range(0, len(ids), SQL_MAX_IN_IDS):
+                    chunk = ids[start:start + SQL_MAX_IN_IDS]
+                    cursor.execute(f'''
+                        DELETE FROM {table_name}
+                        WHERE user_id = ? AND id IN ({','.join('?' * len(chunk))})
+                        RETURNING file_path
+                    ''', (session['user_id'], *chunk))
+                    deleted = cursor.fetchall()
+                    deleted_count += len(deleted)
+                    file_paths.extend(os.path.join(UPLOAD_DIR[table_name], row[0]) for row in deleted)
         
-        conn.commit()
-        conn.close()
+            conn.commit()
+        
+        # Unlink all files at once, after the rows are gone
+        remove_files(file_paths)
         
         return jsonify({'success': True, 'message': f'{deleted_count} öğe başarıyla silindi'})
         
@@ -0,0 +1,106 @@
+# db_pool.py - Pooled SQLite connections (WAL mode)
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DATABASE_PATH = 'database.db'
+READER_POOL_SIZE = 4
+# Prepared statements kept per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Applied once per connection when it is opened
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-64000',
+    # Read pages through a 256 MiB memory map instead of read() syscalls
+    'PRAGMA mmap_size=268435456',
+)
+
+
+class ConnectionPool:
+    """
+    Process-wide SQLite connection pool.
+    Keeps one dedicated writer connection (serialized with a lock, so writers
+    never race each other into SQLITE_BUSY) and a bounded queue of readers
+    that can run concurrently under WAL.
+    """
+
+    def __init__(self, database=DATABASE_PATH, readers=READER_POOL_SIZE):
+        self.database = database
+        self.reader_count = readers
+        self._readers = queue.Queue(maxsize=readers)
+        self._writer = None
+        self._write_lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.database, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _ensure_initialized(self):
+        """Open all connections lazily on first use"""
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            self._writer = self._connect()
+            for _ in range(self.reader_count):
+                self._readers.put(self._connect())
+            self._initialized = True
+
+    @staticmethod
+    def _check_in(conn, optimize=False):
+        # Never hand a half-finished transaction to the next request
+        if conn.in_transaction:
+            conn.rollback()
+        # optimize may run ANALYZE (a write), so only the writer does it;
+        # on a reader it would race the writer and fail with "database is locked"
+        if optimize:
+            conn.execute('PRAGMA optimize')
+
+    @contextmanager
+    def connection(self, write=False):
+        self._ensure_initialized()
+        if write:
+            with self._write_lock:
+                try:
+                    yield self._writer
+                finally:
+                    self._check_in(self._writer, optimize=True)
+        else:
+            conn = self._readers.get()
+            try:
+                yield conn
+            finally:
+                self._check_in(conn)
+                self._readers.put(conn)
+
+    def close_all(self):
+        """Close every pooled connection (e.g. on shutdown)"""
+        with self._init_lock:
+            if not self._initialized:
+                return
+            with self._write_lock:
+                self._writer.close()
+                self._writer = None
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
+            self._initialized = False
+
+
+# Global pool instance
+pool = ConnectionPool()
+
+
+def get_conn(write=False):
+    """Check a connection out of the global pool: `with get_conn() as conn:`"""
+    return pool.connection(write=write)
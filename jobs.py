@@ -0,0 +1,106 @@
+# jobs.py - Background jobs for long-running requests (state kept in SQLite)
+import json
+import logging
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from db_pool import get_conn
+
+logger = logging.getLogger(__name__)
+
+# OCR/VLM work running at the same time (the GPU is shared by all requests)
+JOB_MAX_CONCURRENCY = int(os.environ.get('JOB_MAX_CONCURRENCY', '1'))
+# Finished jobs are kept this long for clients that poll late
+JOB_RETENTION = '-1 day'
+
+SQL_INSERT_JOB = '''
+    INSERT INTO jobs (id, user_id, kind, status, pid)
+    VALUES (?, ?, ?, 'queued', ?)
+'''
+SQL_UPDATE_JOB = '''
+    UPDATE jobs SET status = ?, http_status = ?, result_json = ?, error = ?,
+                    updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+SQL_SELECT_JOB = '''
+    SELECT status, http_status, result_json, error, pid FROM jobs
+    WHERE id = ? AND user_id = ?
+'''
+SQL_PURGE_JOBS = f'''
+    DELETE FROM jobs
+    WHERE status IN ('done', 'failed') AND updated_at < datetime('now', '{JOB_RETENTION}')
+'''
+
+
+def process_alive(pid):
+    """Whether the worker process that owns a job is still running"""
+    try:
+        import psutil
+    except ImportError:
+        return True
+    return psutil.pid_exists(pid)
+
+
+class JobQueue:
+    """
+    Runs long requests (OCR, NER/summary/classification of PDFs) on a small thread pool.
+    work(*args) must return (payload, http_status) and must not touch the Flask
+    request/session. Job state and results are stored in the jobs table, so any
+    worker process can answer a status poll. run() (the synchronous path) and
+    background jobs share one concurrency limit.
+    """
+
+    def __init__(self, max_concurrency=JOB_MAX_CONCURRENCY):
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='job')
+
+    def run(self, work, *args):
+        """Run work in the calling thread once a slot is free"""
+        with self._slots:
+            return work(*args)
+
+    def submit(self, user_id, kind, work, *args):
+        """Queue work in the background and return its job id"""
+        job_id = secrets.token_hex(16)
+        with get_conn(write=True) as conn:
+            conn.execute(SQL_PURGE_JOBS)
+            conn.execute(SQL_INSERT_JOB, (job_id, user_id, kind, os.getpid()))
+            conn.commit()
+        self._executor.submit(self._execute, job_id, work, args)
+        return job_id
+
+    def _update(self, job_id, status, http_status=None, result=None, error=None):
+        result_json = json.dumps(result, ensure_ascii=False) if result is not None else None
+        with get_conn(write=True) as conn:
+            conn.execute(SQL_UPDATE_JOB, (status, http_status, result_json, error, job_id))
+            conn.commit()
+
+    def _execute(self, job_id, work, args):
+        try:
+            with self._slots:
+                self._update(job_id, 'running')
+                payload, http_status = work(*args)
+            self._update(job_id, 'done', http_status, payload)
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            self._update(job_id, 'failed', 500, error=str(e))
+
+    def get(self, job_id, user_id):
+        """Status dict of one of the user's jobs, or None"""
+        with get_conn() as conn:
+            row = conn.execute(SQL_SELECT_JOB, (job_id, user_id)).fetchone()
+        if row is None:
+            return None
+        status, http_status, result_json, error, pid = row
+        # The process running it died (restart/crash): it will never finish
+        if status in ('queued', 'running') and pid != os.getpid() and not process_alive(pid):
+            status, error = 'failed', 'İş yarıda kaldı (sunucu yeniden başlatıldı)'
+        return {
+            'job_id': job_id,
+            'status': status,
+            'http_status': http_status,
+            'result': json.loads(result_json) if result_json else None,
+            'error': error,
+        }
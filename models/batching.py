@@ -0,0 +1,99 @@
+# models/batching.py - Dynamic request batching for model inference
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 8
+MAX_BATCH_DELAY = 0.03  # seconds to wait for more requests after the first one
+
+
+class BatchingWorker:
+    """
+    Collects concurrent inference requests into batches on a background thread.
+    Handlers call submit(item) and block on the returned Future; the worker waits
+    up to max_batch_delay for more items (max_batch_size at most), groups them by
+    bucket_key (e.g. rounded token length, to limit padding) and calls
+    process_batch(items) -> results once per group.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = MAX_BATCH_SIZE,
+                 max_batch_delay: float = MAX_BATCH_DELAY,
+                 bucket_key: Optional[Callable[[Any], Any]] = None,
+                 name: str = 'batching-worker'):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.bucket_key = bucket_key
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Start the worker thread on first use"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def submit(self, item) -> Future:
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _collect(self):
+        """Block for one request, then gather more until the batch is full or the window closes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_batch_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _buckets(self, batch):
+        if self.bucket_key is None:
+            return [batch]
+        buckets = {}
+        for entry in batch:
+            try:
+                key = self.bucket_key(entry[0])
+            except Exception:
+                key = None
+            buckets.setdefault(key, []).append(entry)
+        return list(buckets.values())
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            for group in self._buckets(batch):
+                # Skip requests whose caller already gave up
+                group = [(item, future) for item, future in group if future.set_running_or_notify_cancel()]
+                if not group:
+                    continue
+                try:
+                    results = list(self.process_batch([item for item, _ in group]))
+                    if len(results) != len(group):
+                        raise RuntimeError(f"process_batch returned {len(results)} results "
+                                           f"for {len(group)} items")
+                    for (_, future), result in zip(group, results):
+                        future.set_result(result)
+                except Exception as e:
+                    logger.error(f"{self.name}: batch of {len(group)} failed: {e}")
+                    # Every caller blocks on its future, so none may be left without an outcome
+                    for _, future in group:
+                        if not future.done():
+                            future.set_exception(e)
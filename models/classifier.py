@@ -1,38 +1,61 @@
+# Premise/hypothesis pairs per forward pass when classifying several texts
+PIPELINE_BATCH_SIZE = 32
+
+DEFAULT_CATEGORIES = [
+    "Şikayet dilekçesi",
+    "Bilgi edinme başvurusu",
+    "Sosyal yardım talebi",
+    "İzin ruhsat başvurusu",
+    "Vergi maliye işlemi",
+    "Atama nakil talebi",
+    "Ödeme makbuzu",
+    "Kanun görüş önerisi",
+    "Duyuru"
+]
+
+def _format_result(result):
+    """Convert a zero-shot pipeline output into the response format"""
+    classification_results = []
+    for label, score in zip(result['labels'], result['scores']):
+        classification_results.append({
+            'name': label,
+            'confidence': float(score)
+        })
+    
+    return {
+        'success': True,
+        'categories': classification_results,
+        'main_category': classification_results[0]['name'],
+        'confidence': classification_results[0]['confidence']
+    }
+
 def classify_text(classifier_pipeline, text, categories=None):
     """Classify text using XLM-RoBERTa"""
     
     if categories is None:
-        categories = [
-            "Şikayet dilekçesi",
-            "Bilgi edinme başvurusu",
-            "Sosyal yardım talebi",
-            "İzin ruhsat başvurusu",
-            "Vergi maliye işlemi",
-            "Atama nakil talebi",
-            "Ödeme makbuzu",
-            "Kanun görüş önerisi",
-            "Duyuru"
-        ]
+        categories = DEFAULT_CATEGORIES
     
     try:
-        result = classifier_pipeline(text, categories)
-        
-        # Format results
-        classification_results = []
-        for label, score in zip(result['labels'], result['scores']):
-            classification_results.append({
-                'name': label,
-                'confidence': float(score)
-            })
-        
-        return {
-            'success': True,
-            'categories': classification_results,
-            'main_category': classification_results[0]['name'],
-            'confidence': classification_results[0]['confidence']
-        }
+        # All premise/hypothesis pairs of the text in one forward pass
+        result = classifier_pipeline(text, categories, batch_size=len(categories))
+        return _format_result(result)
     except Exception as e:
         return {
             'success': False,
             'error': str(e)
-        }
\ No newline at end of file
+        }
+
+def classify_texts(classifier_pipeline, texts, categories=None):
+    """Classify several texts with one batched pipeline call"""
+    
+    if categories is None:
+        categories = DEFAULT_CATEGORIES
+    
+    try:
+        results = classifier_pipeline(list(texts), categories, batch_size=PIPELINE_BATCH_SIZE)
+        # The pipeline unwraps single-item lists
+        if isinstance(results, dict):
+            results = [results]
+        return [_format_result(result) for result in results]
+    except Exception as e:
+        return [{'success': False, 'error': str(e)} for _ in texts]
@@ -1,9 +1,13 @@
 # models/model_manager.py - Updated version
+import gc
 import torch
-from transformers import pipeline
+from transformers import pipeline, ZeroShotClassificationPipeline
 from llama_cpp import Llama
 import os
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from .ocr_processor import ocr_processor
 from .ner_processor import ner_processor
 from huggingface_hub import hf_hub_download
@@ -11,6 +15,70 @@ from huggingface_hub import hf_hub_download
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Zero-shot NLI model for document classification; CLASSIFIER_MODEL can point to a
+# smaller multilingual one (e.g. MoritzLaurer/mDeBERTa-v3-base-xnli-multilingual-nli-2mil7)
+DEFAULT_CLASSIFIER_MODEL = "joeddav/xlm-roberta-large-xnli"
+# Prompt evaluation batch size of the llama.cpp summarizer
+SUMMARIZER_N_BATCH = 512
+# cleanup_models releases the CUDA caching allocator's free blocks above this size
+CUDA_CACHE_RELEASE_BYTES = 512 * 1024 * 1024
+
+
+def _timed_load(load):
+    """(load() result, seconds it took)"""
+    start = time.perf_counter()
+    return load(), time.perf_counter() - start
+
+
+def _physical_cpu_count():
+    """Physical core count (llama.cpp threads scale badly onto SMT siblings)"""
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+    except ImportError:
+        cores = None
+    return cores or os.cpu_count() or 1
+
+class LabelCachingZeroShotPipeline(ZeroShotClassificationPipeline):
+    """
+    Zero-shot pipeline that tokenizes the input text once and reuses the token ids
+    of the hypotheses ("This example is <label>."), which are the same on every call.
+    The stock pipeline tokenizes the text again together with every candidate label.
+    """
+
+    def _hypothesis_ids(self, hypothesis):
+        cache = self.__dict__.setdefault('_hypothesis_cache', {})
+        ids = cache.get(hypothesis)
+        if ids is None:
+            ids = cache[hypothesis] = self.tokenizer(hypothesis, add_special_tokens=False)['input_ids']
+        return ids
+
+    def preprocess(self, inputs, candidate_labels=None, hypothesis_template="This example is {}."):
+        sequence_pairs, sequences = self._args_parser(inputs, candidate_labels, hypothesis_template)
+        premise_ids = self.tokenizer(sequences[0], add_special_tokens=False)['input_ids']
+        room = self.tokenizer.model_max_length - self.tokenizer.num_special_tokens_to_add(pair=True)
+
+        for i, (candidate_label, (_, hypothesis)) in enumerate(zip(candidate_labels, sequence_pairs)):
+            hypothesis_ids = self._hypothesis_ids(hypothesis)
+            # Same as truncation='only_first': the text is cut, never the hypothesis
+            text_ids = premise_ids[:max(room - len(hypothesis_ids), 0)]
+            input_ids = self.tokenizer.build_inputs_with_special_tokens(text_ids, hypothesis_ids)
+            model_input = {
+                'input_ids': torch.tensor([input_ids]),
+                'attention_mask': torch.ones((1, len(input_ids)), dtype=torch.long),
+            }
+            if 'token_type_ids' in self.tokenizer.model_input_names:
+                model_input['token_type_ids'] = torch.tensor(
+                    [self.tokenizer.create_token_type_ids_from_sequences(text_ids, hypothesis_ids)]
+                )
+
+            yield {
+                "candidate_label": candidate_label,
+                "sequence": sequences[0],
+                "is_last": i == len(candidate_labels) - 1,
+                **model_input,
+            }
+
 class ModelManager:
     _instance = None
     _models_loaded = False
@@ -27,6 +95,7 @@ class ModelManager:
             self.ocr_processor = ocr_processor
             self.ner_processor = ner_processor
             self.device = self._get_device()
+            self._load_lock = threading.Lock()
             self.initialized = True
         
     def _get_device(self):
@@ -37,19 +106,29 @@ class ModelManager:
         else:
             return "cpu"
     
-    def load_classifier(self):
-        """Load XLM-RoBERTa classifier for CPU/GPU"""
+    def load_classifier(self, model_name=None):
+        """Load the zero-shot classifier (XLM-RoBERTa by default) for CPU/GPU"""
         if self.classifier is not None:
             logger.info("Classifier already loaded, skipping...")
             return True
             
         try:
-            logger.info("Loading classifier model...")
+            model_name = model_name or os.environ.get("CLASSIFIER_MODEL", DEFAULT_CLASSIFIER_MODEL)
+            logger.info(f"Loading classifier model {model_name}...")
             self.classifier = pipeline(
                 "zero-shot-classification",
-                model="joeddav/xlm-roberta-large-xnli",
-                device=0 if self.device == "cuda" else -1
+                model=model_name,
+                pipeline_class=LabelCachingZeroShotPipeline,
+                device=0 if self.device == "cuda" else -1,
+                # Half precision on GPU: half the memory traffic, Tensor Core matmuls
+                torch_dtype=torch.float16 if self.device == "cuda" else None
             )
+            if self.device != "cuda" and os.environ.get("CLASSIFIER_INT8", "1") == "1":
+                # Pipeline runs on CPU here: dynamic INT8 Linear layers (VNNI/oneDNN GEMMs)
+                self.classifier.model = torch.quantization.quantize_dynamic(
+                    self.classifier.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                logger.info("Classifier quantized to dynamic INT8 for CPU inference")
             logger.info("Classifier loaded successfully")
             return True
         except Exception as e:
@@ -73,13 +152,21 @@ class ModelManager:
             # Configure based on available resources
             if self.device == "cuda":
                 gpu_layers = 35  # Adjust based on VRAM
+            elif self.device == "mps":
+                gpu_layers = -1  # Metal build: unified memory, offload every layer
             else:
-                gpu_layers = 35  # Adjust based on VRAM
+                gpu_layers = 0  # CPU only: nothing to offload to
                 
             self.summarizer = Llama(
                 model_path=model_path,
                 n_ctx=8192,  # Context length - increased for better capacity
                 n_gpu_layers=gpu_layers,
+                n_threads=_physical_cpu_count(),
+                n_threads_batch=os.cpu_count(),
+                n_batch=SUMMARIZER_N_BATCH,
+                use_mmap=True,
+                use_mlock=True,  # Keep the weights resident; llama.cpp only warns if the limit is too low
+                offload_kqv=True,
                 verbose=False # Set back to False
             )
             logger.info("Summarizer loaded successfully")
@@ -118,35 +205,44 @@ class ModelManager:
             return False
 
     def load_all_models(self):
-        """Load all models - only once per application lifecycle"""
+        """
+        Load all models - only once per application lifecycle.
+        Returns {model: (loaded, seconds)} for 'classifier', 'summarizer', 'ner' and 'ocr'.
+        """
+        loaders = {
+            'classifier': self.load_classifier,
+            'summarizer': self.load_summarizer,
+            'ner': self.load_ner_model,
+            'ocr': self.load_ocr_model,
+        }
         if ModelManager._models_loaded:
             logger.info("Models already loaded, skipping initialization...")
-            return True
+            return {name: (True, 0.0) for name in loaders}
             
         logger.info(f"Using device: {self.device}")
         
-        classifier_ok = self.load_classifier()
-        summarizer_ok = self.load_summarizer()
-        ner_ok = self.load_ner_model()
-        ocr_ok = self.load_ocr_model()
+        # The loaders are independent (downloads, disk reads, device init), so they overlap
+        with ThreadPoolExecutor(max_workers=len(loaders), thread_name_prefix='model-load') as executor:
+            futures = {name: executor.submit(_timed_load, load) for name, load in loaders.items()}
+            results = {name: future.result() for name, future in futures.items()}
         
         logger.info(f"Model loading status:")
-        logger.info(f"  Classifier: {'✓' if classifier_ok else '✗'}")
-        logger.info(f"  Summarizer: {'✓' if summarizer_ok else '✗'}")
-        logger.info(f"  NER: {'✓' if ner_ok else '✗'}")
-        logger.info(f"  OCR: {'✓' if ocr_ok else '✗'}")
+        for name, (loaded, elapsed) in results.items():
+            logger.info(f"  {name}: {'✓' if loaded else '✗'} ({elapsed:.2f}s)")
         
         # Mark models as loaded if all successful
-        if classifier_ok and summarizer_ok and ner_ok and ocr_ok:
+        if all(loaded for loaded, _ in results.values()):
             ModelManager._models_loaded = True
             logger.info("All models loaded successfully and cached!")
         
-        return classifier_ok and summarizer_ok and ner_ok and ocr_ok
+        return results
 
     def cleanup_models(self):
         """Free cached GPU/accelerator memory where possible."""
         try:
-            if torch.cuda.is_available():
+            # empty_cache() synchronizes the device; only worth it when there is cache to hand back
+            if (torch.cuda.is_available() and
+                    torch.cuda.memory_reserved() - torch.cuda.memory_allocated() > CUDA_CACHE_RELEASE_BYTES):
                 torch.cuda.empty_cache()
             
             # Clear OCR model memory if loaded
@@ -154,24 +250,30 @@ class ModelManager:
                 self.ocr_processor._clear_memory()
                 
             # Force garbage collection
-            import gc
             gc.collect()
             
         except Exception:
             pass
     
     def ensure_classifier_loaded(self):
-        """Ensure classifier is loaded before use"""
-        if self.classifier is None:
-            logger.info("Lazy loading classifier model...")
-            return self.load_classifier()
+        """Ensure classifier is loaded before use (lock-free once it is)"""
+        if self.classifier is not None:
+            return True
+        with self._load_lock:
+            # Another request may have loaded it while this one waited
+            if self.classifier is None:
+                logger.info("Lazy loading classifier model...")
+                return self.load_classifier()
         return True
     
     def ensure_summarizer_loaded(self):
-        """Ensure summarizer is loaded before use"""
-        if self.summarizer is None:
-            logger.info("Lazy loading summarizer model...")
-            return self.load_summarizer()
+        """Ensure summarizer is loaded before use (lock-free once it is)"""
+        if self.summarizer is not None:
+            return True
+        with self._load_lock:
+            if self.summarizer is None:
+                logger.info("Lazy loading summarizer model...")
+                return self.load_summarizer()
         return True
     
     def get_text_from_file(self, file_path):
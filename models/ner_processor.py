@@ -2,7 +2,8 @@
 import json
 import logging
 import re
-from typing import List, Dict, Union
+import threading
+from typing import List, Dict, Tuple, Union
 from huggingface_hub import hf_hub_download
 import os
 import torch
@@ -13,10 +14,79 @@ from transformers import (
     XLMRobertaPreTrainedModel, XLMRobertaModel
 )
 import string
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
 
 logger = logging.getLogger(__name__)
 TR_PUNCT = set(string.punctuation) | {"’","“","”","…","–","—","«","»","‹","›"}
 
+# Uzun metinler (çok sayfalı PDF'ler) kesilmek yerine örtüşen pencerelere bölünür
+NER_MAX_LENGTH = 320
+NER_WINDOW_STRIDE = 32  # ardışık pencerelerin ortak token sayısı (sınırdaki varlıklar bölünmesin)
+NER_BATCH_SIZE = 8      # tek forward'da işlenen pencere sayısı
+# CUDA'da pencereler bu uzunluklara pad'lenir: her kova için tamponlar bir kez ayrılır
+# ve derlenmiş encoder (CUDA graph) az sayıda sabit şekil görür
+NER_LENGTH_BUCKETS = (32, 64, 128, NER_MAX_LENGTH)
+# CPU'da encoder (roberta + classifier) INT8 ONNX Runtime ile çalışır; CRF decode PyTorch'ta kalır
+NER_ONNX = os.environ.get("NER_ONNX", "1") == "1"
+NER_ONNX_DIR = "onnx"   # model_dir altında, export edilen graph'ların yeri
+# ONNX kullanılmadığında (GPU) encoder torch.compile ile derlenir; derleme çıktıları diskte önbelleklenir
+NER_COMPILE = os.environ.get("NER_COMPILE", "1") == "1"
+os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", os.path.abspath(".torchinductor_cache"))
+
+# Her istekte kullanılan regex'ler bir kez derlenir
+_WHITESPACE_RE = re.compile(r'\s+')
+_DISALLOWED_CHARS_RE = re.compile(r'[^\w\s\.,!?;:()\-\"\'@+%_]+')
+_APOSTROPHE_TRIM_RE = re.compile(r"^(.*)\'([A-Za-zçğıöşüÇĞİÖŞÜ]+)$")
+_DATE_RES = [re.compile(p, re.IGNORECASE) for p in (
+    r'\b\d{1,2}[./]\d{1,2}[./]\d{4}\b',
+    r'\b\d{4}[./]\d{1,2}[./]\d{1,2}\b',
+    r'\b\d{1,2}\s+(Ocak|Şubat|Mart|Nisan|Mayıs|Haziran|Temmuz|Ağustos|Eylül|Ekim|Kasım|Aralık)\s+\d{4}\b'
+)]
+_MONEY_RES = [re.compile(p, re.IGNORECASE) for p in (
+    r'\b\d{1,3}(?:[.\s]\d{3})(?:[.,]\d+)?\s(?:TL|lira|EUR|USD|₺|\$|€)\b',
+    r'\b(?:TL|lira|EUR|USD|₺|\$|€)\s*\d+(?:[.,]\d+)?\b'
+)]
+_EMAIL_RE = re.compile(
+    r'''(?<![\w\.\-\+])
+        [A-Za-z0-9._%+\-]+
+        @
+        [A-Za-z0-9.\-]+
+        \.[A-Za-z]{2,}(?:\.[A-Za-z]{2,})*
+    ''', re.VERBOSE
+)
+_PHONE_RE = re.compile(r'\b0\d{3}\s?\d{3}\s?\d{2}\s?\d{2}\b')
+# Ön filtreler: tarih/para/telefon kalıplarının hepsi rakam ister; para ayrıca bir birim ister
+_DIGIT_RE = re.compile(r'\d')
+_MONEY_HINT_RE = re.compile(r'TL|lira|EUR|USD|₺|\$|€', re.IGNORECASE)
+# "sayılı" / "madde(si)" / "md." — text[a:b].lower() içinde aramakla aynı sonuç, kopya üretmeden
+# (IGNORECASE kullanılmaz: o, "I"/"i"yi de "ı" sayardı)
+_LAW_CONTEXT_RE = re.compile(r'[sS][aA][yY]ı[lL]ı|[mM][aA][dD][dD][eE]|[mM][dD]\.')
+_APOS_INSERT_RE = re.compile(r"(?<=[^\W_])(?=')")  # harf/rakam ile apostrof arası
+
+
+@dataclass(slots=True)
+class Entity:
+    """Post-process boyunca yerinde güncellenen varlık; API sınırında dict'e çevrilir."""
+    text: str
+    type: str
+    start: int
+    end: int
+    source: str = 'model'
+    confidence: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        d = {'text': self.text, 'type': self.type, 'start': self.start, 'end': self.end, 'source': self.source}
+        if self.confidence is not None:
+            d['confidence'] = self.confidence
+        return d
+
 
 APOS = {"’": "'", "‘": "'", "ʼ": "'"}
 
@@ -34,17 +104,15 @@ def _spacey_apostrophe_variant(s: str) -> tuple[str, list[int]]:
     s = _norm_apostrophes(s)
     out = []
     t2o = []
-    i = 0
-    while i < len(s):
-        ch = s[i]
-        out.append(ch); t2o.append(i)
-        if ch.isalpha() or ch.isdigit():
-            # bir sonraki char apostrof mu?
-            if i+1 < len(s) and s[i+1] == "'":
-                # BOŞLUK EKLE
-                out.append(" ")
-                t2o.append(i)  # yeni boşluğu mevcut harfe hizala (yakın komşu)
-        i += 1
+    prev = 0
+    # harf/rakamdan hemen sonra gelen her apostrofun önüne BOŞLUK EKLE
+    for m in _APOS_INSERT_RE.finditer(s):
+        pos = m.start()
+        out.append(s[prev:pos]); t2o.extend(range(prev, pos))
+        out.append(" ")
+        t2o.append(pos - 1)  # yeni boşluğu mevcut harfe hizala (yakın komşu)
+        prev = pos
+    out.append(s[prev:]); t2o.extend(range(prev, len(s)))
     return "".join(out), t2o
 
 def _identity_variant(s: str) -> tuple[str, list[int]]:
@@ -52,6 +120,93 @@ def _identity_variant(s: str) -> tuple[str, list[int]]:
     return s2, list(range(len(s2)))
 
 
+class _EmissionsModule(nn.Module):
+    """ONNX export'u için yalnızca roberta + classifier (CRF'siz, emission üreten kısım)"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.roberta = model.roberta
+        self.classifier = model.classifier
+
+    def forward(self, input_ids, attention_mask):
+        hidden = self.roberta(input_ids, attention_mask=attention_mask).last_hidden_state
+        return self.classifier(hidden)  # dropout eval'de etkisiz
+
+
+def _viterbi_decode(emissions: torch.Tensor, mask: torch.Tensor, start_transitions: torch.Tensor,
+                    transitions: torch.Tensor, end_transitions: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    pytorch-crf'in Viterbi decode'u (batch_first) ile birebir aynı sonuç; TorchScript'e derlenir
+    ve geri izleme her örnek için ayrı değil, tüm batch için tek döngüde yapılır.
+    Döner: (B, S) etiketler ve her örneğin son gerçek token index'i.
+    """
+    seq_length = emissions.size(1)
+    score = start_transitions + emissions[:, 0]
+    history: List[torch.Tensor] = []
+    for i in range(1, seq_length):
+        next_score = score.unsqueeze(2) + transitions + emissions[:, i].unsqueeze(1)
+        next_score, indices = next_score.max(dim=1)
+        score = torch.where(mask[:, i].unsqueeze(1), next_score, score)
+        history.append(indices)
+    score = score + end_transitions
+
+    seq_ends = mask.long().sum(dim=1) - 1
+    best_last = score.max(dim=1)[1]
+    tags = torch.zeros(mask.shape, dtype=torch.long, device=mask.device)
+    cur = best_last
+    for i in range(seq_length - 1, -1, -1):
+        cur = torch.where(seq_ends == i, best_last, cur)
+        tags[:, i] = cur
+        if i > 0:
+            prev = history[i - 1].gather(1, cur.unsqueeze(1)).squeeze(1)
+            cur = torch.where(seq_ends >= i, prev, cur)
+    return tags, seq_ends
+
+
+try:
+    _viterbi_decode_scripted = torch.jit.script(_viterbi_decode)
+except Exception as e:  # TorchScript yoksa/derlenemezse pytorch-crf'in kendi decode'u kullanılır
+    logger.warning(f"CRF Viterbi decoder could not be scripted, using pytorch-crf decode: {e}")
+    _viterbi_decode_scripted = None
+
+
+class ScriptedViterbiCRF(CRF):
+    """Parametreleri CRF ile aynı (checkpoint uyumlu); yalnızca decode TorchScript Viterbi ile çalışır."""
+
+    def decode(self, emissions: torch.Tensor, mask: torch.Tensor = None) -> List[List[int]]:
+        if _viterbi_decode_scripted is None or not self.batch_first:
+            return super().decode(emissions, mask=mask)
+        self._validate(emissions, mask=mask)
+        if mask is None:
+            mask = emissions.new_ones(emissions.shape[:2], dtype=torch.bool)
+        tags, seq_ends = _viterbi_decode_scripted(emissions, mask.bool(), self.start_transitions,
+                                                  self.transitions, self.end_transitions)
+        return _tags_to_lists(tags, seq_ends)
+
+
+def _tags_to_lists(tags: torch.Tensor, seq_ends: torch.Tensor) -> List[List[int]]:
+    """(B, S) Viterbi etiketlerini her örneğin gerçek token'larına kırpılmış listelere çevirir"""
+    return [row[:end + 1] for row, end in zip(tags.tolist(), seq_ends.tolist())]
+
+
+class InferenceHead(nn.Module):
+    """
+    Çıkarım için classifier + CRF Viterbi tek modülde (TorchScript'e derlenir). Dropout eval'de
+    etkisiz olduğundan atlanır; ağırlıklar modelle paylaşılır, kopyalanmaz.
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        self.linear = model.classifier
+        self.start_transitions = model.crf.start_transitions
+        self.transitions = model.crf.transitions
+        self.end_transitions = model.crf.end_transitions
+
+    def forward(self, last_hidden: torch.Tensor, mask: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        emissions = self.linear(last_hidden).float()
+        return _viterbi_decode(emissions, mask, self.start_transitions, self.transitions, self.end_transitions)
+
+
 # ----- CRF'li model sınıfı (train'de kullandığının birebir aynısı) -----
 class XLMRForTokenClassificationCRF(XLMRobertaPreTrainedModel):
     def __init__(self, config):
@@ -60,13 +215,13 @@ class XLMRForTokenClassificationCRF(XLMRobertaPreTrainedModel):
         self.roberta = XLMRobertaModel(config, add_pooling_layer=False)
         self.dropout = nn.Dropout(config.hidden_dropout_prob)
         self.classifier = nn.Linear(config.hidden_size, self.num_labels)
-        self.crf = CRF(self.num_labels, batch_first=True)
+        self.crf = ScriptedViterbiCRF(self.num_labels, batch_first=True)
         self.post_init()
 
     def forward(self, input_ids=None, attention_mask=None, labels=None, **kwargs):
         out = self.roberta(input_ids, attention_mask=attention_mask, **kwargs)
         seq = self.dropout(out.last_hidden_state)
-        emissions = self.classifier(seq)
+        emissions = self.classifier(seq).float()
         mask = attention_mask.bool() if attention_mask is not None else None
         if labels is not None:
             loss = -self.crf(emissions, labels, mask=mask, reduction="mean")
@@ -90,6 +245,13 @@ class NERProcessor:
         self.device = self._get_device()
         self.model_loaded = False
         self.space_var = False
+        self.ort_session = None
+        self._model_device = torch.device(self.device)
+        self._cuda_buffers = {}
+        # Paylaşılan CUDA tamponları: bir batch'in kopyasından .tolist()'ine kadar tek thread
+        self._infer_lock = threading.Lock()
+        self._id2label_list = []
+        self._build_bio_tables()
 
         # (UI için)
         self.entity_types = {
@@ -109,6 +271,8 @@ class NERProcessor:
             "'dır","'dir","'dur","'dür",
             "'dan","'den","'tan","'ten"
         }
+        # En uzun ek önce denensin diye bir kez sıralanır
+        self._SUFFIXES_SORTED = tuple(sorted(self.SUFFIXES, key=len, reverse=True))
         # Ek genişletmeyi uygulayacağımız türler
         self._SUFFIX_TYPES = {"LOCATION", "ORGANIZATION", "PERSON", "LEGAL_REF","PHONE_EMAIL","DATE_TIME","MONEY"}
 
@@ -125,22 +289,151 @@ class NERProcessor:
             return max(0, min(o, orig_len))
         return map_one(start), map_one(end-1)+1  # end exclusive
 
-    def _infer_once(self, text: str) -> list[dict]:
-        # CRF’li mevcut inference akışındaki core kısmını kullanan tek seferlik tahmin.
-        enc = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=320,
-                            return_offsets_mapping=True)
-        offsets = enc.pop("offset_mapping")[0].tolist()
-        # Device'ı güvenli şekilde al
+    def _infer_once(self, text: str) -> List[Entity]:
+        return self._infer_batch([text])[0]
+
+    def _infer_batch(self, texts: List[str]) -> List[List[Entity]]:
+        # CRF’li mevcut inference akışındaki core kısmını kullanan toplu tahmin.
+        # NER_MAX_LENGTH'i aşan metin örtüşen pencerelere bölünür; tüm metinlerin
+        # pencereleri NER_BATCH_SIZE'lık gruplar halinde modele verilir. Offset'ler
+        # orijinal metne göre olduğundan çakışan tekrarları _deduplicate_entities temizler.
+        enc = self.tokenizer(texts, return_tensors="pt", truncation=True, max_length=NER_MAX_LENGTH,
+                            stride=NER_WINDOW_STRIDE, return_overflowing_tokens=True,
+                            padding=True, return_offsets_mapping=True)
+        offsets = enc.pop("offset_mapping").tolist()
+        window_texts = enc.pop("overflow_to_sample_mapping").tolist()  # pencere -> metin index'i
+        dev = self._model_device
+        ents = [[] for _ in texts]
+        for i in range(0, len(offsets), NER_BATCH_SIZE):
+            with self._infer_lock, torch.inference_mode():
+                if dev.type == "cuda":
+                    batch = self._bucketed_cuda_batch(enc["input_ids"][i:i + NER_BATCH_SIZE],
+                                                      enc["attention_mask"][i:i + NER_BATCH_SIZE])
+                else:
+                    batch = {k: v[i:i + NER_BATCH_SIZE].to(dev) for k, v in enc.items()}
+                if self.ort_session is not None:
+                    emissions = self.ort_session.run(["emissions"], {
+                        "input_ids": batch["input_ids"].numpy(),
+                        "attention_mask": batch["attention_mask"].numpy(),
+                    })[0]
+                    preds = self.model.crf.decode(torch.from_numpy(emissions),
+                                                  mask=batch["attention_mask"].bool())
+                else:
+                    hidden = self.model.roberta(**batch).last_hidden_state
+                    preds = _tags_to_lists(*self._inference_head(hidden, batch["attention_mask"].bool()))
+            # CRF decode maskeyi dikkate alır: her pencere için yalnızca gerçek token tahminleri döner
+            for pred_ids, window_offsets, t in zip(preds, offsets[i:i + NER_BATCH_SIZE],
+                                                   window_texts[i:i + NER_BATCH_SIZE]):
+                ents[t].extend(self._decode_bio_from_subtokens(texts[t], pred_ids, window_offsets))  # senin mevcut fonksiyonun
+        return ents
+
+
+    def _bucketed_cuda_batch(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> Dict[str, torch.Tensor]:
+        """
+        Pencereleri en yakın NER_LENGTH_BUCKETS uzunluğuna pad'leyip kovaya ait, önceden ayrılmış
+        pinned host + GPU tamponlarına kopyalar (istek başına cudaMalloc yok, kopya asenkron).
+        Tamponlar bir sonraki batch'te yeniden yazılır; CRF decode'un .tolist()'i o ana kadar senkronlar.
+        Çağıran _infer_lock'u .tolist()'e kadar tutmalıdır, yoksa eşzamanlı istekler tamponları ezer.
+        """
+        rows = input_ids.size(0)
+        length = int(attention_mask.sum(dim=1).max())
+        bucket = next(b for b in NER_LENGTH_BUCKETS if b >= length)
+        buffers = self._cuda_buffers.get(bucket)
+        if buffers is None:
+            shape = (NER_BATCH_SIZE, bucket)
+            buffers = self._cuda_buffers[bucket] = [
+                (torch.empty(shape, dtype=torch.long).pin_memory(),
+                 torch.empty(shape, dtype=torch.long, device=self._model_device))
+                for _ in ("input_ids", "attention_mask")
+            ]
+        batch = {}
+        width = min(bucket, input_ids.size(1))
+        for name, src, pad_value, (host, device_buf) in zip(
+                ("input_ids", "attention_mask"), (input_ids, attention_mask),
+                (self.tokenizer.pad_token_id, 0), buffers):
+            host = host[:rows]
+            host.fill_(pad_value)
+            host[:, :width].copy_(src[:, :width])
+            batch[name] = device_buf[:rows].copy_(host, non_blocking=True)
+        return batch
+
+    def _export_onnx(self) -> str:
+        """Encoder'ı ONNX'e export edip INT8'e kuantize eder; model dosyaları değişmedikçe önbellekten kullanır."""
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        onnx_dir = os.path.join(self.model_dir, NER_ONNX_DIR)
+        fp32_path = os.path.join(onnx_dir, "emissions.onnx")
+        int8_path = os.path.join(onnx_dir, "emissions.int8.onnx")
+        model_mtime = max(os.path.getmtime(os.path.join(self.model_dir, name))
+                          for name in os.listdir(self.model_dir)
+                          if os.path.isfile(os.path.join(self.model_dir, name)))
+        if os.path.exists(int8_path) and os.path.getmtime(int8_path) >= model_mtime:
+            return int8_path
+
+        logger.info("Exporting NER encoder to ONNX (INT8)...")
+        os.makedirs(onnx_dir, exist_ok=True)
+        dummy = self.tokenizer("Ankara", return_tensors="pt")
+        dynamic = {0: "batch", 1: "sequence"}
+        torch.onnx.export(
+            _EmissionsModule(self.model), (dummy["input_ids"], dummy["attention_mask"]), fp32_path,
+            input_names=["input_ids", "attention_mask"], output_names=["emissions"],
+            dynamic_axes={"input_ids": dynamic, "attention_mask": dynamic, "emissions": dynamic},
+            opset_version=17,
+        )
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+        return int8_path
+
+    def _load_onnx_session(self):
+        """CPU'da INT8 ONNX Runtime oturumu; olmazsa PyTorch encoder'a düşer"""
+        self.ort_session = None
+        if not NER_ONNX or ort is None or self.device != "cpu":
+            return
+        try:
+            self.ort_session = ort.InferenceSession(self._export_onnx(), providers=["CPUExecutionProvider"])
+            logger.info("NER encoder running on ONNX Runtime (INT8)")
+        except Exception as e:
+            logger.warning(f"ONNX Runtime NER encoder unavailable, using PyTorch: {e}")
+
+    def _compile_encoder(self):
+        """Encoder'ı torch.compile ile derler ve ısıtır; derleme başarısızsa eager modele döner"""
+        if not NER_COMPILE or self.ort_session is not None or not hasattr(torch, "compile"):
+            return
+        eager = self.model.roberta
         try:
+            # reduce-overhead CUDA graph'ları statik çıktı tamponlarını her replay'de yeniden yazar;
+            # encoder + head çağrıları bu yüzden _infer_lock altında sıralı çalışır
+            self.model.roberta = torch.compile(eager, mode="reduce-overhead", dynamic=True)
             dev = next(self.model.parameters()).device
-        except StopIteration:
-            dev = torch.device(self.device)
-        enc = {k: v.to(dev) for k,v in enc.items()}
-        with torch.no_grad():
-            out = self.model(**enc)
-            pred_ids = out["predictions"][0]
-        return self._decode_bio_from_subtokens(text, pred_ids, offsets)  # senin mevcut fonksiyonun
+            warmup = {
+                "input_ids": torch.full((1, NER_MAX_LENGTH), self.tokenizer.pad_token_id, device=dev),
+                "attention_mask": torch.ones((1, NER_MAX_LENGTH), dtype=torch.long, device=dev),
+            }
+            with self._infer_lock, torch.inference_mode():
+                self.model(**warmup)
+            logger.info("NER encoder compiled with torch.compile")
+        except Exception as e:
+            self.model.roberta = eager
+            logger.warning(f"torch.compile unavailable for NER encoder, using eager mode: {e}")
+
+    def _build_inference_head(self):
+        head = InferenceHead(self.model).eval()
+        try:
+            return torch.jit.script(head)
+        except Exception as e:
+            logger.warning(f"NER inference head could not be scripted, running it eagerly: {e}")
+            return head
 
+    def _encoder_dtype(self):
+        """GPU'da fp16; CPU'da donanım destekliyorsa (AVX512-BF16/AMX) bf16, yoksa fp32"""
+        if self.device in ("cuda", "mps"):
+            return torch.float16
+        try:
+            if torch.ops.mkldnn._is_mkldnn_bf16_supported():
+                return torch.bfloat16
+        except (AttributeError, RuntimeError):
+            pass
+        return torch.float32
 
     def _get_device(self):
         if torch.cuda.is_available():
@@ -169,20 +462,40 @@ class NERProcessor:
             label2id = maps["label2id"]
 
             # Tokenizer & Config (local dosyalardan yükle)
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir, local_files_only=True)
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir, local_files_only=True, use_fast=True)
+            # offset_mapping ve pencereleme yalnızca Rust (fast) tokenizer'da var
+            if not self.tokenizer.is_fast:
+                raise ValueError(f"NER tokenizer for {self.model_dir} is not a fast tokenizer (tokenizer.json missing?)")
             config = AutoConfig.from_pretrained(
                 self.model_dir, local_files_only=True,
                 id2label=id2label, label2id=label2id
             )
 
+            # Fused scaled_dot_product_attention kernels (native in transformers, no optimum needed)
             self.model = XLMRForTokenClassificationCRF.from_pretrained(
-                self.model_dir, config=config, local_files_only=True
+                self.model_dir, config=config, local_files_only=True,
+                attn_implementation="sdpa"
             )
             dev = torch.device(self.device)
             self.model.to(dev).eval()
+            self._load_onnx_session()
+            if self.ort_session is None:
+                # Emission'lar forward'da float32'ye döner; CRF her zaman float32 çalışır
+                dtype = self._encoder_dtype()
+                self.model.roberta.to(dtype)
+                self.model.classifier.to(dtype)
+            self._compile_encoder()
+            self._inference_head = self._build_inference_head()
 
             self.id2label = id2label
             self.label2id = label2id
+            # Sıcak yollar için: modelin device'ı ve id -> etiket listesi bir kez hesaplanır
+            try:
+                self._model_device = next(self.model.parameters()).device
+            except StopIteration:
+                self._model_device = dev
+            self._id2label_list = [id2label.get(i, "O") for i in range(max(id2label) + 1)]
+            self._build_bio_tables()
             self.model_loaded = True
             logger.info("NER model loaded successfully")
             return True
@@ -191,23 +504,7 @@ class NERProcessor:
             logger.error(f"Failed to load NER model: {e}", exc_info=True)
             self.model_loaded = False
             return False
-    def _trim_all_whitespace_punct(self, entities, text):
-        out = []
-        n = len(text)
-        for e in entities:
-            s, ed = max(0, e['start']), min(n, e['end'])
-            # solda boşluk/noktalama kırp
-            while s < ed and (text[s].isspace() or text[s] in TR_PUNCT):
-                s += 1
-            # sağda boşluk/noktalama kırp
-            while ed > s and (text[ed-1].isspace() or text[ed-1] in TR_PUNCT):
-                ed -= 1
-            if ed > s:
-                e = {**e, 'start': s, 'end': ed, 'text': text[s:ed]}
-                out.append(e)
-        return out
-
-    def _trim_apostrophe_suffixes(self, entities, text):
+    def _trim_apostrophe_suffixes(self, entities: List[Entity], text: str) -> List[Entity]:
         SUF = {
             "da","de","ta","te","ya","ye",
             "nın","nin","nun","nün",
@@ -217,268 +514,276 @@ class NERProcessor:
         TYPES = {"LOCATION","ORGANIZATION","PERSON","LEGAL_REF"}  # istersen daraltabilirsin
         out = []
         for ent in entities:
-            if ent["type"] not in TYPES:
+            if ent.type not in TYPES:
                 out.append(ent); continue
-            s, e = ent["start"], ent["end"]
+            s, e = ent.start, ent.end
             frag = text[s:e]
             # apostrof + ek varsa kes
-            m = re.search(r"^(.*)\'([A-Za-zçğıöşüÇĞİÖŞÜ]+)$", frag)
+            m = _APOSTROPHE_TRIM_RE.search(frag)
             if m:
                 stem, suf = m.group(1), m.group(2).lower()
                 if suf in SUF:
                     new_end = s + len(stem)  # apostrof öncesine kadar
                     if new_end > s:
-                        ent = {**ent, "end": new_end, "text": text[s:new_end]}
+                        ent.end, ent.text = new_end, text[s:new_end]
             out.append(ent)
         return out
 
 
 
     def analyze_entities(self, text: str) -> Dict[str, Union[bool, List[Dict], str]]:
+        return self.analyze_entities_batch([text])[0]
+
+    def analyze_entities_batch(self, texts: List[str]) -> List[Dict[str, Union[bool, List[Dict], str]]]:
+        """Birden çok metni (ve varyantlarını) tek seferde modele verir; sonuçlar texts sırasıyla döner."""
         if not self.model_loaded and not self.load_model():
-            return {'success': False, 'error': 'NER model not available', 'entities': [], 'entity_count': 0}
+            return [{'success': False, 'error': 'NER model not available', 'entities': [], 'entity_count': 0}
+                    for _ in texts]
 
-        try:
-            if not text or not text.strip():
-                return {'success': True, 'entities': [], 'entity_count': 0, 'error': None}
-
-            orig = text
-
-            # --- Varyant A: boşluksuz (senin eğitim formatın) ---
-            a_text, a_t2o = _identity_variant(orig)
-            a_ents = self._infer_once(a_text)
-            # a_ents zaten a_text üzerinde; orijinale hizala:
-            a_ents_mapped = []
-            for e in a_ents:
-                s2, e2 = self._map_span_back(e['start'], e['end'], a_t2o, len(orig))
-                if e2 > s2:
-                    a_ents_mapped.append({**e, 'start': s2, 'end': e2, 'text': orig[s2:e2]})
+        results = [{'success': True, 'entities': [], 'entity_count': 0, 'error': None} for _ in texts]
+        todo = [i for i, text in enumerate(texts) if text and text.strip()]
 
-            entities = a_ents_mapped
-            # --- Varyant B: Stefan’a yakın (apostroftan önce boşluk) ---
-            if self.space_var:
-                b_text, b_t2o = _spacey_apostrophe_variant(orig)
-                b_ents = self._infer_once(b_text)
-                b_ents_mapped = []
-                for e in b_ents:
-                    s2, e2 = self._map_span_back(e['start'], e['end'], b_t2o, len(orig))
-                    if e2 > s2:
-                        b_ents_mapped.append({**e, 'start': s2, 'end': e2, 'text': orig[s2:e2]})
+        # --- Varyant A: boşluksuz (senin eğitim formatın) ---
+        # --- Varyant B: Stefan’a yakın (apostroftan önce boşluk) ---
+        variant_fns = [_identity_variant] + ([_spacey_apostrophe_variant] if self.space_var else [])
+        variants = [(i, *fn(texts[i])) for i in todo for fn in variant_fns]
 
-            # --- Birleştir + post-process ---
-            
+        try:
+            variant_ents = self._infer_batch([v_text for _, v_text, _ in variants]) if variants else []
+        except Exception as e:
+            logger.error(f"NER analysis failed: {e}", exc_info=True)
+            for i in todo:
+                results[i] = {'success': False, 'error': str(e), 'entities': [], 'entity_count': 0}
+            return results
+
+        mapped = {i: [] for i in todo}
+        for (i, _, t2o), ents in zip(variants, variant_ents):
+            orig = texts[i]
+            # varyant metni üzerindeki span'ları orijinale hizala:
+            for e in ents:
+                s2, e2 = self._map_span_back(e.start, e.end, t2o, len(orig))
+                if e2 > s2:
+                    e.start, e.end, e.text = s2, e2, orig[s2:e2]
+                    mapped[i].append(e)
 
-            # Apostrof ek genişletme, legal merge vs. (senin mevcut akışın)
-            entities = self._trim_all_whitespace_punct(entities, orig)
-            entities = self._expand_apostrophe_suffixes(entities, orig)
-            entities = self._merge_legal_refs(entities, orig)
-            entities = self._promote_legal_acronyms_for_law_context(entities, orig)
+        for i in todo:
+            try:
+                results[i] = self._postprocess_entities(mapped[i], texts[i])
+            except Exception as e:
+                logger.error(f"NER analysis failed: {e}", exc_info=True)
+                results[i] = {'success': False, 'error': str(e), 'entities': [], 'entity_count': 0}
+        return results
 
-            # Pattern bazlı ekler
-            entities.extend(self._extract_pattern_entities(orig))
+    def _postprocess_entities(self, entities: List[Entity], orig: str) -> Dict[str, Union[bool, List[Dict], str]]:
+        # --- Birleştir + post-process ---
+        # Apostrof ek genişletme, legal merge vs. (senin mevcut akışın)
+        entities = self._postprocess_model_entities(entities, orig)
 
-            # Çakışma çözümü / tekilleştirme
-            entities = self._deduplicate_entities(entities)
-            entities.sort(key=lambda x: x.get('start', 0), reverse=False)
+        # Pattern bazlı ekler
+        entities.extend(self._extract_pattern_entities(orig))
 
-            return {'success': True, 'entities': entities, 'entity_count': len(entities), 'error': None}
+        # Çakışma çözümü / tekilleştirme
+        entities = self._deduplicate_entities(entities)
 
-        except Exception as e:
-            logger.error(f"NER analysis failed: {e}", exc_info=True)
-            return {'success': False, 'error': str(e), 'entities': [], 'entity_count': 0}
+        return {'success': True, 'entities': [e.to_dict() for e in entities],
+                'entity_count': len(entities), 'error': None}
 
 
     # ---------------- helpers ----------------
     def _preprocess_text(self, text: str) -> str:
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         # eğik apostrofları düzleştir
         text = text.replace("’", "'").replace("‘", "'").replace("ʼ", "'")
         # ÖNEMLİ: apostrofu silme -> char class içine ' ekledik
-        text = re.sub(r'[^\w\s\.,!?;:()\-\"\'@+%_]+', '', text)
+        text = _DISALLOWED_CHARS_RE.sub('', text)
         return text.strip()
 
 
     
-    def _decode_bio_from_subtokens(self, text: str, pred_ids: List[int], offsets: List[List[int]]) -> List[Dict]:
-        """CRF çıktı etiketlerini (BIO) subtoken offset’lerinden char span’lara çevirir."""
-        ents: List[Dict] = []
-        cur_type = None
-        cur_start = None
-
-        for i, lab_id in enumerate(pred_ids):
-            start, end = offsets[i]
-            if end <= start:  # özel token veya boş
-                continue
-            label = self.id2label.get(lab_id, "O")
-
+    def _build_bio_tables(self):
+        """
+        Etiket id'si -> BIO türü (0=O, 1=B, 2=I) ve varlık tipi index'i tabloları.
+        Sondaki ek satır, listede olmayan id'ler için "O"dur.
+        """
+        kinds, types = [], []
+        self._bio_type_names = []
+        for label in self._id2label_list + ["O"]:
             if label == "O":
-                if cur_type is not None:
-                    ents.append(self._make_ent(text, cur_type, cur_start, prev_end=end))
-                    cur_type, cur_start = None, None
+                kinds.append(0); types.append(-1)
                 continue
-
-            # label -> (B-FOO / I-FOO)
-            if "-" in label:
-                bi, typ = label.split("-", 1)
+            # label -> (B-FOO / I-FOO); tiresiz etiket B sayılır
+            bi, typ = label.split("-", 1) if "-" in label else ("B", label)
+            if typ not in self._bio_type_names:
+                self._bio_type_names.append(typ)
+            kinds.append(1 if bi == "B" else 2)
+            types.append(self._bio_type_names.index(typ))
+        self._bio_kind = np.array(kinds, dtype=np.int8)
+        self._bio_type = np.array(types, dtype=np.int32)
+
+    def _decode_bio_from_subtokens(self, text: str, pred_ids: List[int], offsets: List[List[int]]) -> List[Entity]:
+        """
+        CRF çıktı etiketlerini (BIO) subtoken offset’lerinden char span’lara çevirir.
+        Token döngüsü yerine NumPy ile: varlık başlangıçları ve her birini kapatan ilk
+        olay (O token'ı ya da yeni başlangıç) dizi işlemleriyle bulunur.
+        """
+        n = len(pred_ids)
+        if n == 0:
+            return []
+        offs = np.asarray(offsets[:n], dtype=np.int64).reshape(n, 2)
+        valid = np.flatnonzero(offs[:, 1] > offs[:, 0])  # özel token / boş offset'ler atlanır
+        if valid.size == 0:
+            return []
+        ids = np.minimum(np.asarray(pred_ids)[valid], len(self._bio_kind) - 1)
+        kind = self._bio_kind[ids]
+        typ = self._bio_type[ids]
+
+        # Açık varlık var mı: son I olmayan token B ise (O'dan sonra gelen I yok sayılır)
+        pos = np.arange(valid.size)
+        last_non_i = np.maximum.accumulate(np.where(kind != 2, pos, -1))
+        active = (kind != 0) & (last_non_i >= 0) & (kind[np.maximum(last_non_i, 0)] == 1)
+        prev_active = np.concatenate(([False], active[:-1]))
+        prev_typ = np.concatenate(([-1], typ[:-1]))
+        # B her zaman, I ise açık varlığın tipi değiştiğinde yeni varlık başlatır
+        starts = (kind == 1) | ((kind == 2) & prev_active & (typ != prev_typ))
+        closing = starts | (kind == 0)
+
+        events = np.flatnonzero(closing)
+        start_pos = np.flatnonzero(starts)
+        next_events = np.searchsorted(events, start_pos, side="right")
+
+        ents: List[Entity] = []
+        for k, e_idx in zip(start_pos.tolist(), next_events.tolist()):
+            if e_idx < len(events):
+                j = events[e_idx]
+                # O token'ında o token'ın sonu, yeni başlangıçta bir önceki token'ın sonu
+                end_row = valid[j] if kind[j] == 0 else valid[j] - 1
             else:
-                bi, typ = "B", label
-
-            if bi == "B" or (cur_type is not None and typ != cur_type):
-                if cur_type is not None:
-                    ents.append(self._make_ent(text, cur_type, cur_start, prev_end=offsets[i-1][1]))
-                cur_type = typ
-                cur_start = start
-            else:
-                # I- tipi devam; sadece genişlet
-                pass
-
-        if cur_type is not None and cur_start is not None:
-            ents.append(self._make_ent(text, cur_type, cur_start, prev_end=offsets[len(pred_ids)-1][1]))
-
+                end_row = n - 1
+            ents.append(self._make_ent(text, self._bio_type_names[typ[k]], int(offs[valid[k], 0]),
+                                       prev_end=int(offs[end_row, 1])))
         return ents
 
-    def _make_ent(self, full_text: str, typ: str, s: int, prev_end: int) -> Dict:
+    def _make_ent(self, full_text: str, typ: str, s: int, prev_end: int) -> Entity:
         s = max(0, s)
         e = max(s, prev_end)
-        frag = full_text[s:e]
-        return {
-            'text': frag,
-            'type': typ,
-            'start': s,
-            'end': e,
-            'source': 'model'
-        }
+        return Entity(full_text[s:e], typ, s, e)
 
-    # ---------- POST-PROCESS: Apostrof ek genişletme ----------
-    def _expand_apostrophe_suffixes(self, entities: List[Dict], text: str) -> List[Dict]:
-        out = []
+    # ---------- POST-PROCESS (tek geçiş) ----------
+    # Boşluk/noktalama kırpma, apostrof ek genişletme, LEGAL_REF birleştirme ve hukuk
+    # kısaltmalarını LEGAL_REF'e terfi; varlıklar yerinde güncellenir.
+    def _postprocess_model_entities(self, entities: List[Entity], text: str) -> List[Entity]:
+        out: List[Entity] = []
+        n = len(text)
+        chain = False       # out[-1] birleştirmeye açık bir LEGAL_REF zinciri mi
+        chain_confidence = None  # zincirin ilk varlığının confidence'ı
         for ent in entities:
-            if ent["type"] not in self._SUFFIX_TYPES:
-                out.append(ent); continue
-            e = ent["end"]
-            # En uzun eki önce dene
-            for suf in sorted(self.SUFFIXES, key=len, reverse=True):
-                if text[e:e+len(suf)] == suf:
-                    e += len(suf)
-                    break
-            if e != ent["end"]:
-                ent = {**ent, "end": e, "text": text[ent["start"]:e]}
-            out.append(ent)
-        return out
-
-    # ---------- POST-PROCESS: LEGAL_REF birleştirme ----------
-    def _merge_legal_refs(self, entities: List[Dict], text: str) -> List[Dict]:
-        if not entities: return entities
-        merged = []
-        i = 0
-        while i < len(entities):
-            cur = entities[i]
-            if cur["type"] == "LEGAL_REF":
-                j = i + 1
-                end = cur["end"]
+            s, ed = max(0, ent.start), min(n, ent.end)
+            # solda boşluk/noktalama kırp
+            while s < ed and (text[s].isspace() or text[s] in TR_PUNCT):
+                s += 1
+            # sağda boşluk/noktalama kırp
+            while ed > s and (text[ed-1].isspace() or text[ed-1] in TR_PUNCT):
+                ed -= 1
+            if ed <= s:
+                continue
+            # apostrof son eki: en uzun eki önce dene
+            if ent.type in self._SUFFIX_TYPES:
+                suf = next((suf for suf in self._SUFFIXES_SORTED if text.startswith(suf, ed)), None)
+                if suf is not None:
+                    ed += len(suf)
+            if s != ent.start or ed != ent.end:
+                ent.start, ent.end, ent.text = s, ed, text[s:ed]
+
+            if ent.type == "LEGAL_REF":
                 # yakındaki ardışık LEGAL_REF'leri tek span'a çek
-                while j < len(entities) and entities[j]["type"] == "LEGAL_REF" and entities[j]["start"] <= end + 2:
-                    end = max(end, entities[j]["end"])
-                    j += 1
-                if j > i + 1:
-                    merged.append({
-                        "text": text[cur["start"]:end],
-                        "type": "LEGAL_REF",
-                        "confidence": min(cur["confidence"], entities[j-1]["confidence"]),
-                        "start": cur["start"],
-                        "end": end,
-                        "source": "model"
-                    })
-                    i = j
-                    continue
-            merged.append(cur)
-            i += 1
-        return merged
-
-    # ---------- POST-PROCESS: Hukuk kısaltmalarını LEGAL_REF'e terfi ----------
-    def _promote_legal_acronyms_for_law_context(self, entities: List[Dict], text: str) -> List[Dict]:
-        if not entities: return entities
-        out = []
-        for idx, ent in enumerate(entities):
-            if ent["type"] in {"ORGANIZATION","MISC"}:
-                token = ent["text"].strip().upper()
-                if token in self.LAW_ACRONYMS:
-                    # Çevre bağlamına bak: yakınında "sayılı" veya "madde" geçiyor mu?
-                    left = max(0, ent["start"] - 20)
-                    right = min(len(text), ent["end"] + 20)
-                    ctx = text[left:right].lower()
-                    if ("sayılı" in ctx) or ("madde" in ctx) or ("maddesi" in ctx) or ("md." in ctx):
-                        ent = {**ent, "type": "LEGAL_REF"}
+                head = out[-1] if chain else None
+                if head is not None and ent.start <= head.end + 2:
+                    head.end = max(head.end, ent.end)
+                    head.text = text[head.start:head.end]
+                    head.source = "model"
+                    head.confidence = (min(chain_confidence, ent.confidence)
+                                       if chain_confidence is not None and ent.confidence is not None else None)
+                else:
+                    chain, chain_confidence = True, ent.confidence
+                    out.append(ent)
+                continue
+            chain = False
+
+            # Hukuk kısaltması: yakınında "sayılı" veya "madde" geçiyorsa LEGAL_REF'e terfi
+            if ent.type in {"ORGANIZATION","MISC"} and ent.text.strip().upper() in self.LAW_ACRONYMS:
+                left = max(0, ent.start - 20)
+                right = min(len(text), ent.end + 20)
+                if _LAW_CONTEXT_RE.search(text, left, right):
+                    ent.type = "LEGAL_REF"
             out.append(ent)
         return out
 
     # ---------- Pattern tabanlı yakalamalar ----------
-    def _extract_pattern_entities(self, text: str) -> List[Dict]:
-        entities: List[Dict] = []
+    def _extract_pattern_entities(self, text: str) -> List[Entity]:
+        entities: List[Entity] = []
+
+        has_digit = _DIGIT_RE.search(text) is not None
 
         # Tarih
-        date_patterns = [
-            r'\b\d{1,2}[./]\d{1,2}[./]\d{4}\b',
-            r'\b\d{4}[./]\d{1,2}[./]\d{1,2}\b',
-            r'\b\d{1,2}\s+(Ocak|Şubat|Mart|Nisan|Mayıs|Haziran|Temmuz|Ağustos|Eylül|Ekim|Kasım|Aralık)\s+\d{4}\b'
-        ]
-        for p in date_patterns:
-            for m in re.finditer(p, text, re.IGNORECASE):
-                entities.append({'text': m.group(), 'type': 'DATE_TIME',
-                                 'start': m.start(), 'end': m.end(), 'source': 'pattern'})
+        if has_digit:
+            for date_re in _DATE_RES:
+                for m in date_re.finditer(text):
+                    entities.append(Entity(m.group(), 'DATE_TIME', m.start(), m.end(), 'pattern'))
 
         # Para
-        money_patterns = [
-            r'\b\d{1,3}(?:[.\s]\d{3})(?:[.,]\d+)?\s(?:TL|lira|EUR|USD|₺|\$|€)\b',
-            r'\b(?:TL|lira|EUR|USD|₺|\$|€)\s*\d+(?:[.,]\d+)?\b'
-        ]
-        for p in money_patterns:
-            for m in re.finditer(p, text, re.IGNORECASE):
-                entities.append({'text': m.group(), 'type': 'MONEY',
-                                 'start': m.start(), 'end': m.end(), 'source': 'pattern'})
+        if has_digit and _MONEY_HINT_RE.search(text):
+            for money_re in _MONEY_RES:
+                for m in money_re.finditer(text):
+                    entities.append(Entity(m.group(), 'MONEY', m.start(), m.end(), 'pattern'))
 
         # E-posta (model kaçırsa bile @ varsa ekle)
         if '@' in text:
-            email_pat = re.compile(
-                r'''(?<![\w\.\-\+])
-                    [A-Za-z0-9._%+\-]+
-                    @
-                    [A-Za-z0-9.\-]+
-                    \.[A-Za-z]{2,}(?:\.[A-Za-z]{2,})*
-                ''', re.VERBOSE
-            )
-            for m in email_pat.finditer(text):
-                entities.append({'text': m.group(), 'type': 'PHONE_EMAIL',
-                                 'start': m.start(), 'end': m.end(), 'source': 'pattern'})
+            for m in _EMAIL_RE.finditer(text):
+                entities.append(Entity(m.group(), 'PHONE_EMAIL', m.start(), m.end(), 'pattern'))
 
         # Telefon
-        phone_pat = r'\b0\d{3}\s?\d{3}\s?\d{2}\s?\d{2}\b'
-        for m in re.finditer(phone_pat, text):
-            entities.append({'text': m.group(), 'type': 'PHONE_EMAIL',
-                             'start': m.start(), 'end': m.end(), 'source': 'pattern'})
+        if '0' in text:
+            for m in _PHONE_RE.finditer(text):
+                entities.append(Entity(m.group(), 'PHONE_EMAIL', m.start(), m.end(), 'pattern'))
 
         return entities
 
-    def _deduplicate_entities(self, entities: List[Dict]) -> List[Dict]:
+    def _deduplicate_entities(self, entities: List[Entity]) -> List[Entity]:
         if not entities: return entities
         # Başlangıca göre sırala; daha sonra çakışanlarda en uzun ve yüksek confident’i seç
-        entities.sort(key=lambda x: (x['start'], -(x['end']-x['start'])))
-        out: List[Dict] = []
+        entities.sort(key=lambda x: (x.start, -(x.end-x.start)))
+        # Tek geçiş: aynı metinler sözlükten bulunur; çakışma için yalnızca sonu henüz geçilmemiş
+        # (start'lar artan sırada geldiğinden hâlâ çakışabilecek) tutulan varlıklara bakılır
+        out: List[Entity] = []
+        indices_by_text: Dict[str, List[int]] = {}
+        open_idx: List[int] = []
+        reordered = False
         for ent in entities:
-            if not ent.get("text"): 
+            if not ent.text: 
                 continue
-            drop = False
-            for i, ex in enumerate(out):
-                overlap = not (ent['end'] <= ex['start'] or ex['end'] <= ent['start'])
-                same_text = ent['text'].strip().lower() == ex['text'].strip().lower()
-                if overlap or same_text:
-                    # öncelik: daha uzun span
-                    if (ent['end']-ent['start'] > ex['end']-ex['start']):
-                        out[i] = ent
-                    drop = True
-                    break
-            if not drop:
+            norm = ent.text.strip().lower()
+            open_idx = [j for j in open_idx if out[j].end > ent.start]
+            candidates = open_idx + indices_by_text.get(norm, [])
+            if not candidates:
+                indices_by_text.setdefault(norm, []).append(len(out))
+                open_idx.append(len(out))
                 out.append(ent)
+                continue
+            i = min(candidates)
+            ex = out[i]
+            # öncelik: daha uzun span
+            if (ent.end-ent.start > ex.end-ex.start):
+                indices_by_text[ex.text.strip().lower()].remove(i)
+                indices_by_text.setdefault(norm, []).append(i)
+                out[i] = ent
+                reordered = reordered or (i > 0 and out[i-1].start > ent.start) or \
+                    (i + 1 < len(out) and ent.start > out[i+1].start)
+                if i not in open_idx:
+                    open_idx.append(i)
+        # Eklemeler başlangıç sırasında; yalnızca aynı metin değişimi bir varlığı
+        # önceki bir index'e taşıdıysa yeniden sıralamak gerekir
+        if reordered:
+            out.sort(key=lambda x: x.start)
         return out
 
     def get_entity_summary(self, entities: List[Dict]) -> Dict[str, int]:
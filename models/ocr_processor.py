@@ -1,16 +1,81 @@
 # models/ocr_processor.py - PyMuPDF + Qwen2-VL Implementation (RAM Optimized)
 import fitz  # PyMuPDF
 from PIL import Image
-import io
 import logging
 import os
 import gc
-from typing import Union, Dict
+import contextlib
+import time
+import threading
+import psutil
+from typing import Union, Dict, List
 import torch
-from transformers import Qwen2_5_VLForConditionalGeneration, AutoTokenizer, AutoProcessor
+from transformers import Qwen2_5_VLForConditionalGeneration, AutoTokenizer, AutoProcessor, BitsAndBytesConfig
+from transformers.utils import is_flash_attn_2_available
+
+try:
+    import bitsandbytes
+except ImportError:
+    bitsandbytes = None
+
+try:
+    from vllm import LLM, SamplingParams
+except ImportError:
+    LLM = None
 
 logger = logging.getLogger(__name__)
 
+# Scanned pages sent to the VLM per generate() call on GPU, one per OCR_BATCH_VRAM_PER_PAGE
+# GB of VRAM within [OCR_BATCH_MIN, OCR_BATCH_MAX] (CPU keeps 1 to limit RAM)
+OCR_BATCH_MIN = 3
+OCR_BATCH_MAX = 8
+OCR_BATCH_VRAM_PER_PAGE = 6
+OCR_PROMPT = "Bu görüntüdeki tüm metni oku ve Türkçe olarak çıkar. Metni olduğu gibi, herhangi bir açıklama olmadan ver."
+# Transient failures (GPU OOM, timeouts, rate limits) are retried with exponential backoff
+OCR_RETRY_ATTEMPTS = 3
+OCR_RETRY_MIN_DELAY = 1  # seconds, doubled after each failed attempt
+OCR_RETRY_MAX_DELAY = 30
+TRANSIENT_ERROR_MARKERS = ('out of memory', 'rate limit', 'quota', 'too many requests', 'timed out')
+# Image pages whose text layer has fewer characters than this are OCR'd (mixed PDFs only send those);
+# if the model is unavailable a PDF with at least PDF_MIN_TEXT characters still returns its text
+OCR_PAGE_MIN_TEXT = 50
+PDF_MIN_TEXT = 100
+# Plain-text extraction with hyphenated line breaks rejoined
+PDF_TEXT_FLAGS = fitz.TEXTFLAGS_TEXT | fitz.TEXT_DEHYPHENATE
+# Images are downscaled to this many pixels at most (the cost of a 1024x1024 image), keeping the
+# aspect ratio: Qwen2.5-VL reads any shape natively, one token per 28x28 patch, so tall pages keep
+# their detail without tiling. Sides are snapped to the patch grid so the processor does not resample
+OCR_MAX_PIXELS = 1024 * 1024
+OCR_PATCH_SIZE = 28
+# Scanned PDF pages render at this zoom (108 dpi), lower for large pages so they fit OCR_MAX_PIXELS
+OCR_RENDER_ZOOM = 1.5
+# Between images the CUDA cache is only emptied once reserved memory passes this fraction
+CUDA_CACHE_RELEASE_THRESHOLD = 0.9
+# On CUDA the language model is loaded as 4-bit NF4 when bitsandbytes is installed (the vision
+# encoder stays in bf16/fp16), which brings the 3B model from ~7 GB to ~3 GB of VRAM
+OCR_4BIT = os.environ.get('OCR_4BIT', '1') == '1' and bitsandbytes is not None
+# Full-precision models on CUDA decode with a static KV cache, which makes generate() compile the
+# decode step into CUDA graphs (bitsandbytes weights cannot be compiled)
+OCR_COMPILE = os.environ.get('OCR_COMPILE', '1') == '1'
+# Opt-in vLLM engine on CUDA (paged KV cache, all pages of a batch scheduled together); it
+# reserves OCR_VLLM_GPU_MEMORY of the GPU up front, which the other models then cannot use
+OCR_VLLM = os.environ.get('OCR_VLLM', '0') == '1' and LLM is not None
+OCR_VLLM_GPU_MEMORY = float(os.environ.get('OCR_VLLM_GPU_MEMORY', '0.5'))
+OCR_VLLM_BATCH = 32
+OCR_VLLM_MAX_MODEL_LEN = 4096
+OCR_MAX_NEW_TOKENS = 512
+# Smallest GPU (GB) used instead of the CPU, for full-precision and 4-bit weights
+OCR_MIN_GPU_MEMORY = 8
+OCR_MIN_GPU_MEMORY_4BIT = 4
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """Whether an OCR failure is worth retrying (classified by type and message)"""
+    if isinstance(error, TimeoutError):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in TRANSIENT_ERROR_MARKERS)
+
 class OCRProcessor:
     """
     RAM-optimized OCR utility using PyMuPDF + Qwen2-VL
@@ -23,7 +88,14 @@ class OCRProcessor:
         self.processor = None
         self.tokenizer = None
         self.device = self._get_device()
+        self.ocr_batch_size = self._gpu_batch_size() if self.device == "cuda" else 1
+        self.cache_implementation = None  # "static" once a compilable model is loaded on CUDA
+        self.use_vllm = False
         self.model_loaded = False
+        self._load_lock = threading.Lock()
+        # The static KV cache and its CUDA graphs belong to the model, so concurrent
+        # generate() calls would reset each other's cache mid-decode
+        self._generate_lock = threading.Lock()
         self._lazy_load_enabled = True  # Enable lazy loading by default
         
     def _get_device(self):
@@ -32,7 +104,7 @@ class OCRProcessor:
             # Check available GPU memory
             try:
                 gpu_memory = torch.cuda.get_device_properties(0).total_memory / 1024**3  # GB
-                if gpu_memory < 8:  # Less than 8GB GPU memory
+                if gpu_memory < (OCR_MIN_GPU_MEMORY_4BIT if OCR_4BIT else OCR_MIN_GPU_MEMORY):
                     logger.info(f"GPU memory limited ({gpu_memory:.1f}GB), using CPU for better memory management")
                     return "cpu"
                 return "cuda"
@@ -43,17 +115,40 @@ class OCRProcessor:
         else:
             return "cpu"
     
+    def _gpu_batch_size(self):
+        """Pages per batched generate() call, scaled with the GPU's memory"""
+        gpu_memory = torch.cuda.get_device_properties(0).total_memory / 1024**3  # GB
+        return max(OCR_BATCH_MIN, min(OCR_BATCH_MAX, int(gpu_memory // OCR_BATCH_VRAM_PER_PAGE)))
+    
     def _clear_memory(self):
-        """Clear GPU/CPU memory and garbage collect"""
+        """Clear GPU/CPU memory and garbage collect (after failures and on unload)"""
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
         gc.collect()
     
+    def _release_intermediates(self):
+        """
+        Cheap cleanup between images: the weights stay loaded and the freed
+        activations are reused by the caching allocator on the next image, so
+        the cache is only emptied under memory pressure (no full gc pass)
+        """
+        if self.device != "cuda":
+            return
+        total_memory = torch.cuda.get_device_properties(0).total_memory
+        if torch.cuda.memory_reserved() / total_memory > CUDA_CACHE_RELEASE_THRESHOLD:
+            torch.cuda.empty_cache()
+    
     def load_model(self, force_reload=False):
         """Load Qwen2.5-VL-3B-Instruct model with memory optimization"""
         if self.model_loaded and not force_reload:
             return True
-            
+        with self._load_lock:
+            # A background preload or another request may have loaded it while this one waited
+            if self.model_loaded and not force_reload:
+                return True
+            return self._load_model()
+    
+    def _load_model(self):
         try:
             logger.info("Loading Qwen2-VL model for OCR from local path...")
 
@@ -66,27 +161,57 @@ class OCRProcessor:
                 self.model_loaded = False
                 return False
 
+            if self.device == "cuda" and OCR_VLLM:
+                return self._load_vllm(model_dir)
+
             # Memory optimization: Use lower precision and device mapping
-            torch_dtype = torch.float16 if self.device == "cuda" else torch.float32
+            # (bf16 where supported: fp16 overflows in Qwen2-VL's vision layers and yields NaN/garbage text)
+            if self.device == "cuda":
+                torch_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+            else:
+                torch_dtype = torch.float32
+            # FlashAttention-2 when the flash-attn package is installed, PyTorch SDPA otherwise
+            attn_implementation = (
+                "flash_attention_2" if self.device == "cuda" and is_flash_attn_2_available() else "sdpa"
+            )
+            quantization_config = None
+            if self.device == "cuda" and OCR_4BIT:
+                # Zero-calibration NF4 for the LLM backbone; the ViT and lm_head keep torch_dtype
+                quantization_config = BitsAndBytesConfig(
+                    load_in_4bit=True,
+                    bnb_4bit_quant_type="nf4",
+                    bnb_4bit_compute_dtype=torch_dtype,
+                    bnb_4bit_use_double_quant=True,
+                    llm_int8_skip_modules=["visual", "lm_head"],
+                )
             
             # Load model with memory optimization
             self.model = Qwen2_5_VLForConditionalGeneration.from_pretrained(
                 model_dir,
                 torch_dtype=torch_dtype,
+                attn_implementation=attn_implementation,
+                quantization_config=quantization_config,
                 device_map="auto" if self.device == "cuda" else None,
                 local_files_only=True,
                 low_cpu_mem_usage=True,  # Reduce CPU memory usage during loading
                 offload_folder="temp_offload" if self.device == "cpu" else None  # Offload to disk if CPU
             )
 
-            self.processor = AutoProcessor.from_pretrained(model_dir, local_files_only=True)
+            # Fast (torchvision) image processor: pages of equal size are resized, normalized and
+            # patchified as one stacked tensor on self.device, and only uint8 pixels are uploaded
+            self.processor = AutoProcessor.from_pretrained(model_dir, local_files_only=True, use_fast=True)
             self.tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True)
 
             if self.device != "cuda":
                 self.model.to(self.device)
+            
+            compile_decode = (self.device == "cuda" and OCR_COMPILE and quantization_config is None
+                              and hasattr(torch, "compile"))
+            self.cache_implementation = "static" if compile_decode else None
 
             self.model_loaded = True
-            logger.info("Qwen2-VL local model loaded successfully with memory optimization")
+            logger.info("Qwen2-VL local model loaded successfully with memory optimization"
+                        + (" (4-bit NF4 language model)" if quantization_config is not None else ""))
             return True
 
         except Exception as e:
@@ -94,174 +219,265 @@ class OCRProcessor:
             self.model_loaded = False
             return False
     
+    def _load_vllm(self, model_dir):
+        """Load the model into a vLLM engine (the HF processor is still used for the chat template)"""
+        self.model = LLM(
+            model=model_dir,
+            dtype="bfloat16" if torch.cuda.is_bf16_supported() else "float16",
+            gpu_memory_utilization=OCR_VLLM_GPU_MEMORY,
+            max_model_len=OCR_VLLM_MAX_MODEL_LEN,
+            limit_mm_per_prompt={"image": 1},
+        )
+        self.sampling_params = SamplingParams(max_tokens=OCR_MAX_NEW_TOKENS, temperature=0)
+        self.processor = AutoProcessor.from_pretrained(model_dir, local_files_only=True)
+        self.tokenizer = self.processor.tokenizer
+        self.use_vllm = True
+        # The engine schedules pages itself, so hand it larger batches
+        self.ocr_batch_size = OCR_VLLM_BATCH
+        self.model_loaded = True
+        logger.info("Qwen2-VL local model loaded into vLLM")
+        return True
+    
+    def _generate_vllm(self, images: List[Image.Image]) -> List[str]:
+        """Run already prepared images through the vLLM engine in one call"""
+        requests = [{"prompt": self._ocr_prompt(image), "multi_modal_data": {"image": image}} for image in images]
+        outputs = self.model.generate(requests, self.sampling_params, use_tqdm=False)
+        return [output.outputs[0].text.strip() for output in outputs]
+    
+    def _prepare_image(self, image: Image.Image) -> Image.Image:
+        """Convert to RGB and downscale large images to reduce memory usage"""
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        
+        width, height = image.size
+        if width * height > OCR_MAX_PIXELS:
+            ratio = (OCR_MAX_PIXELS / (width * height)) ** 0.5
+            new_size = tuple(max(OCR_PATCH_SIZE, int(dim * ratio) // OCR_PATCH_SIZE * OCR_PATCH_SIZE)
+                             for dim in image.size)
+            logger.info(f"Resized image from {image.size} to {new_size} for memory optimization")
+            image = image.resize(new_size, Image.Resampling.LANCZOS)
+        return image
+    
+    def _ocr_prompt(self, image: Image.Image) -> str:
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "image", "image": image},
+                    {"type": "text", "text": OCR_PROMPT}
+                ]
+            }
+        ]
+        return self.processor.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+    
+    def _with_retry(self, func, *args):
+        """Call func, retrying transient failures with exponential backoff; other errors are raised at once"""
+        for attempt in range(1, OCR_RETRY_ATTEMPTS + 1):
+            try:
+                return func(*args)
+            except Exception as e:
+                if attempt == OCR_RETRY_ATTEMPTS or not _is_transient_error(e):
+                    raise
+                delay = min(OCR_RETRY_MIN_DELAY * 2 ** (attempt - 1), OCR_RETRY_MAX_DELAY)
+                logger.warning(f"OCR attempt {attempt} failed ({str(e)}), retrying in {delay}s")
+                # Give back cached GPU memory before the next try (recovers from OOM)
+                self._clear_memory()
+                time.sleep(delay)
+    
+    def _generate_text(self, image: Image.Image) -> str:
+        """Run Qwen2-VL on one image (raises on failure)"""
+        image = self._prepare_image(image)
+        if self.use_vllm:
+            return self._generate_vllm([image])[0]
+        text = self._ocr_prompt(image)
+        inputs = self.processor(text=[text], images=[image], return_tensors="pt", device=self.device).to(self.device)
+        
+        # Memory optimization: Use smaller max_new_tokens and enable memory efficient attention
+        with torch.no_grad():  # Disable gradient computation
+            generated_ids = self._generate(inputs)
+        
+        cleaned_response = self._decode_new_tokens(inputs, generated_ids)[0]
+        
+        # Clear inputs from memory
+        del inputs, generated_ids
+        self._release_intermediates()
+        
+        return cleaned_response
+    
+    def _generate(self, inputs):
+        """Greedy generate(); serialized while the static cache is in use"""
+        lock = self._generate_lock if self.cache_implementation == "static" else contextlib.nullcontext()
+        with lock:
+            return self.model.generate(
+                **inputs,
+                max_new_tokens=OCR_MAX_NEW_TOKENS,  # Reduced from 1024
+                do_sample=False,  # Deterministic generation
+                use_cache=True,
+                cache_implementation=self.cache_implementation,
+                pad_token_id=self.tokenizer.eos_token_id
+            )
+
     def _perform_ocr(self, image: Image.Image) -> str:
         """Perform OCR on PIL Image object using Qwen2-VL with memory optimization"""
         try:
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Resize large images to reduce memory usage
-            max_size = 1024
-            if max(image.size) > max_size:
-                ratio = max_size / max(image.size)
-                new_size = tuple(int(dim * ratio) for dim in image.size)
-                image = image.resize(new_size, Image.Resampling.LANCZOS)
-                logger.info(f"Resized image from {image.size} to {new_size} for memory optimization")
-            
-            messages = [
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "image", "image": image},
-                        {"type": "text", "text": "Bu görüntüdeki tüm metni oku ve Türkçe olarak çıkar. Metni olduğu gibi, herhangi bir açıklama olmadan ver."}
-                    ]
-                }
-            ]
-            
-            text = self.processor.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
-            inputs = self.processor(text=[text], images=[image], return_tensors="pt").to(self.device)
+            return self._with_retry(self._generate_text, image)
+        except Exception as e:
+            logger.error(f"Qwen2-VL OCR failed: {str(e)}", exc_info=True)
+            return f"OCR Error: {str(e)}"
+
+    def _perform_ocr_batch(self, images: List[Image.Image]) -> List[str]:
+        """OCR several images in one generate() call; falls back to one image at a time on failure"""
+        if len(images) == 1:
+            return [self._perform_ocr(images[0])]
+        try:
+            images = [self._prepare_image(image) for image in images]
+            if self.use_vllm:
+                return self._generate_vllm(images)
+            texts = [self._ocr_prompt(image) for image in images]
             
-            # Memory optimization: Use smaller max_new_tokens and enable memory efficient attention
-            with torch.no_grad():  # Disable gradient computation
-                generated_ids = self.model.generate(
-                    **inputs, 
-                    max_new_tokens=512,  # Reduced from 1024
-                    do_sample=False,  # Deterministic generation
-                    use_cache=True,
-                    pad_token_id=self.tokenizer.eos_token_id
-                )
+            # Decoder-only generation needs left padding so every prompt ends at the same position
+            self.processor.tokenizer.padding_side = "left"
+            inputs = self.processor(text=texts, images=images, padding=True, return_tensors="pt",
+                                    device=self.device).to(self.device)
             
-            response = self.processor.batch_decode(generated_ids, skip_special_tokens=True)
-            cleaned_response = self._extract_assistant_content(response[0])
+            with torch.no_grad():
+                generated_ids = self._generate(inputs)
             
-            # Clear inputs from memory
+            responses = self._decode_new_tokens(inputs, generated_ids)
             del inputs, generated_ids
-            self._clear_memory()
+            self._release_intermediates()
             
-            return cleaned_response
+            return responses
             
         except Exception as e:
-            logger.error(f"Qwen2-VL OCR failed: {str(e)}", exc_info=True)
-            return f"OCR Error: {str(e)}"
+            logger.warning(f"Batched OCR of {len(images)} images failed ({str(e)}), retrying one by one")
+            self._clear_memory()
+            return [self._perform_ocr(image) for image in images]
 
-    def _extract_assistant_content(self, response: str) -> str:
-        """Extract only the assistant's generated content and hide system/user prompts."""
-        if not response:
-            return ""
-        text = response.strip()
-        lower = text.lower()
-        # Prefer content after the last 'assistant' marker if present
-        if 'assistant' in lower:
-            idx = lower.rfind('assistant')
-            tail = text[idx:]
-            lines = tail.splitlines()
-            if len(lines) > 1:
-                content = "\n".join(lines[1:]).strip()
-                if content:
-                    return content
-        # Fallback: remove any leading role headers or generic system descriptions
-        skip_headers = {"system", "user", "assistant"}
-        filtered_lines = []
-        for line in text.splitlines():
-            l = line.strip()
-            if l.lower() in skip_headers:
-                continue
-            if l.startswith("You are a helpful assistant"):
-                continue
-            filtered_lines.append(line)
-        return "\n".join(filtered_lines).strip()
+    def _decode_new_tokens(self, inputs, generated_ids) -> List[str]:
+        """
+        Detokenize only what the model generated: the prompt (chat template plus
+        hundreds of image pad tokens) is sliced off by token count instead of
+        being decoded and then stripped from the text
+        """
+        new_tokens = generated_ids[:, inputs["input_ids"].shape[1]:]
+        return [response.strip() for response in self.processor.batch_decode(new_tokens, skip_special_tokens=True)]
 
     def extract_text_from_pdf(self, pdf_path: str) -> Dict[str, Union[str, bool, int]]:
+        return self.extract_texts_from_pdfs([pdf_path])[0]
+    
+    def extract_texts_from_pdfs(self, pdf_paths: List[str]) -> List[Dict[str, Union[str, bool, int]]]:
+        """
+        Extract text from several PDFs at once (one result dict per path, same order).
+        Pages with a text layer are read directly; the pages without one, from all
+        PDFs, are pooled and sent through the VLM together so GPU batches stay full.
+        """
+        results = [None] * len(pdf_paths)
+        docs = []
+        scanned = []  # (result index, doc, per-page text, page numbers to OCR)
+        
         try:
-            if not os.path.exists(pdf_path):
-                return {'success': False, 'error': 'PDF file not found', 'text': '', 'method': 'none', 'page_count': 0}
-            
-            doc = fitz.open(pdf_path)
-            page_count = len(doc)
-            extracted_text = ""
-            method_used = "text_extraction"
-            
-            # Try text extraction first
-            for page in doc:
-                extracted_text += page.get_text() + "\n"
-            
-            # If text extraction yields little content, use OCR
-            if len(extracted_text.strip()) < 100:
-                logger.info(f"PDF appears to be scanned, using Qwen2-VL OCR for {pdf_path}")
-                if not self.model_loaded:
-                    if not self.load_model():
-                        doc.close()
-                        return {'success': False, 'error': 'Qwen2-VL model not available', 'text': '', 'method': 'none', 'page_count': page_count}
+            for index, pdf_path in enumerate(pdf_paths):
+                try:
+                    doc = fitz.open(pdf_path)
+                    docs.append(doc)
+                    page_count = len(doc)
+                    
+                    # Try text extraction first
+                    native_texts = [page.get_text("text", flags=PDF_TEXT_FLAGS) for page in doc]
+                    extracted_text = "".join(text + "\n" for text in native_texts)
+                except FileNotFoundError:
+                    results[index] = {'success': False, 'error': 'PDF file not found', 'text': '', 'method': 'none', 'page_count': 0}
+                    continue
+                except Exception as e:
+                    logger.error(f"Error processing PDF {pdf_path}: {str(e)}")
+                    results[index] = {'success': False, 'error': str(e), 'text': '', 'method': 'none', 'page_count': 0}
+                    continue
                 
-                # Process pages in batches to manage memory
-                extracted_text = self._ocr_pdf_pages_optimized(doc)
-                method_used = "qwen2_vl_ocr"
-            
-            doc.close()
-            return {'success': True, 'text': extracted_text.strip(), 'method': method_used, 'page_count': page_count, 'error': None}
+                results[index] = {'success': True, 'text': extracted_text.strip(), 'method': 'text_extraction', 'page_count': page_count, 'error': None}
+                
+                # Pages with (almost) no text layer but an embedded image are scanned: only those go
+                # to OCR (blank separator pages in text PDFs do not load the model)
+                ocr_pages = [page_num for page_num, text in enumerate(native_texts)
+                             if len(text.strip()) < OCR_PAGE_MIN_TEXT and doc[page_num].get_images()]
+                if ocr_pages:
+                    logger.info(f"{len(ocr_pages)}/{page_count} pages appear to be scanned, using Qwen2-VL OCR for {pdf_path}")
+                    scanned.append((index, doc, native_texts, ocr_pages))
             
-        except Exception as e:
-            logger.error(f"Error processing PDF {pdf_path}: {str(e)}")
-            return {'success': False, 'error': str(e), 'text': '', 'method': 'none', 'page_count': 0}
+            if scanned:
+                if not self.model_loaded and not self.load_model():
+                    for index, doc, _, _ in scanned:
+                        if len(results[index]['text']) < PDF_MIN_TEXT:
+                            results[index] = {'success': False, 'error': 'Qwen2-VL model not available', 'text': '', 'method': 'none', 'page_count': len(doc)}
+                else:
+                    page_texts = self._ocr_pdf_pages([(index, doc, page_num) for index, doc, _, ocr_pages in scanned for page_num in ocr_pages])
+                    for index, doc, native_texts, _ in scanned:
+                        text = "".join(f"\n--- Page {page_num + 1} ---\n{page_texts.get((index, page_num), native_texts[page_num].strip())}\n"
+                                       for page_num in range(len(doc)))
+                        results[index].update({'text': text.strip(), 'method': 'qwen2_vl_ocr'})
+        finally:
+            for doc in docs:
+                doc.close()
+        
+        return results
     
-    def _ocr_pdf_pages_optimized(self, doc) -> str:
-        """OCR PDF pages with memory optimization"""
-        all_text = ""
-        batch_size = 3  # Process 3 pages at a time to manage memory
+    def _ocr_pdf_pages(self, pages) -> Dict[tuple, str]:
+        """OCR (result index, doc, page_num) pages in batches; returns {(result index, page_num): text}"""
+        # Similar page sizes batch with less padding
+        pages = sorted(pages, key=lambda p: p[1][p[2]].rect.width * p[1][p[2]].rect.height)
+        page_texts = {}
         
-        for i in range(0, len(doc), batch_size):
-            batch_end = min(i + batch_size, len(doc))
-            batch_text = ""
-            
-            for page_num in range(i, batch_end):
-                page = doc[page_num]
+        for i in range(0, len(pages), self.ocr_batch_size):
+            batch = []
+            images = []
+            for index, doc, page_num in pages[i:i + self.ocr_batch_size]:
                 try:
-                    # Optimize image resolution for memory
-                    mat = fitz.Matrix(1.5, 1.5)  # Reduced from 2x2 to 1.5x1.5
-                    pix = page.get_pixmap(matrix=mat)
-                    image = Image.open(io.BytesIO(pix.tobytes("png"))).convert("RGB")
-                    
-                    page_text = self._perform_ocr(image)
-                    batch_text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
-                    
-                    # Clear page-specific memory
-                    del pix, image
-                    
+                    # Render straight at the size the model gets instead of downscaling a bigger pixmap
+                    page = doc[page_num]
+                    zoom = min(OCR_RENDER_ZOOM, (OCR_MAX_PIXELS / (page.rect.width * page.rect.height)) ** 0.5)
+                    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB, alpha=False)
+                    # Raw RGB samples straight into PIL (no PNG encode/decode round trip)
+                    images.append(Image.frombytes("RGB", (pix.width, pix.height), pix.samples))
+                    batch.append((index, page_num))
+                    del pix
                 except Exception as e:
                     logger.error(f"Error processing page {page_num + 1}: {str(e)}")
-                    batch_text += f"\n--- Page {page_num + 1} ---\nError: {str(e)}\n"
-            
-            all_text += batch_text
+                    page_texts[(index, page_num)] = f"Error: {str(e)}"
             
-            # Clear batch memory and force garbage collection
-            del batch_text
-            self._clear_memory()
+            if images:
+                for key, text in zip(batch, self._perform_ocr_batch(images)):
+                    page_texts[key] = text
             
-            # Small delay to allow memory cleanup
-            import time
-            time.sleep(0.1)
+            # Drop the page images before rendering the next batch
+            del images
+            self._release_intermediates()
         
-        return all_text
+        return page_texts
     
     def extract_text_from_image(self, image_path: str) -> Dict[str, Union[str, bool]]:
+        _, ext = os.path.splitext(image_path.lower())
+        if ext not in self.supported_image_formats:
+            return {'success': False, 'error': f'Unsupported image format: {ext}', 'text': ''}
+        return self._extract_text_from_image(image_path)
+    
+    def _extract_text_from_image(self, image_path: str) -> Dict[str, Union[str, bool]]:
+        """OCR an image whose extension is already validated (a missing file is detected by opening it)"""
         try:
-            if not os.path.exists(image_path):
+            try:
+                with Image.open(image_path) as image_file:
+                    image = image_file.convert("RGB")
+            except FileNotFoundError:
                 return {'success': False, 'error': 'Image file not found', 'text': ''}
             
-            _, ext = os.path.splitext(image_path.lower())
-            if ext not in self.supported_image_formats:
-                return {'success': False, 'error': f'Unsupported image format: {ext}', 'text': ''}
-            
             if not self.model_loaded:
                 if not self.load_model():
                     return {'success': False, 'error': 'Qwen2-VL model not available', 'text': ''}
             
-            image = Image.open(image_path).convert("RGB")
             extracted_text = self._perform_ocr(image)
             
             # Clear image from memory
             del image
-            self._clear_memory()
+            self._release_intermediates()
             
             return {'success': True, 'text': extracted_text, 'error': None}
             
@@ -270,6 +486,7 @@ class OCRProcessor:
             return {'success': False, 'error': str(e), 'text': ''}
 
     def get_text_from_file(self, file_path: str) -> Dict[str, Union[str, bool, int]]:
+        # Existence is checked once here; the extractors only notice a missing file when opening it
         if not os.path.exists(file_path):
             return {'success': False, 'error': 'File not found', 'text': ''}
         
@@ -277,7 +494,7 @@ class OCRProcessor:
         if ext == '.pdf':
             return self.extract_text_from_pdf(file_path)
         elif ext in self.supported_image_formats:
-            result = self.extract_text_from_image(file_path)
+            result = self._extract_text_from_image(file_path)
             if result.get('success'):
                 result.update({'method': 'qwen2_vl_ocr', 'page_count': 1})
             return result
@@ -309,7 +526,6 @@ class OCRProcessor:
             memory_info['gpu_reserved'] = f"{torch.cuda.memory_reserved() / 1024**3:.2f} GB"
             memory_info['gpu_free'] = f"{torch.cuda.memory_reserved() / 1024**3 - torch.cuda.memory_allocated() / 1024**3:.2f} GB"
         
-        import psutil
         process = psutil.Process()
         memory_info['ram_used'] = f"{process.memory_info().rss / 1024**3:.2f} GB"
         memory_info['ram_percent'] = f"{process.memory_percent():.1f}%"
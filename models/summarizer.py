@@ -1,6 +1,16 @@
-def summarize_text(llama_model, text, max_tokens=200):
-    """Summarize text using LLaMA"""
-    
+# Texts longer than the context are summarized in windows of this many tokens, then the
+# window summaries are summarized together (map-reduce). The instruction comes before the
+# text, so llama.cpp reuses its prefill from the previous call for every window.
+SUMMARY_CHUNK_TOKENS = 1500
+# Context kept free for the prompt template around the text
+SUMMARY_PROMPT_RESERVE = 128
+# Generation stops at the first sentence end once the summary is this long (characters)
+SUMMARY_TARGET_CHARS = 600
+SENTENCE_ENDINGS = ('.', '!', '?')
+
+
+def _summarize_once(llama_model, text, max_tokens):
+    """One summarization call; the text must fit in the context"""
     prompt = f"""<|start_header_id|>system<|end_header_id|>
 
     Sen Türkçe metinleri özetleyen bir asistansın. Verilen metni kısa ve öz bir şekilde özetle.
@@ -14,19 +24,44 @@ def summarize_text(llama_model, text, max_tokens=200):
     <|eot_id|><|start_header_id|>assistant<|end_header_id|>
 
     """
-        
+    # Greedy decoding (deterministic, like the OCR model's do_sample=False), streamed so that
+    # generation can end at a sentence boundary instead of running to max_tokens
+    summary = ""
+    for chunk in llama_model(
+        prompt,
+        max_tokens=max_tokens,
+        temperature=0.0,
+        stop=["<|eot_id|>"],
+        echo=False,
+        stream=True
+    ):
+        summary += chunk['choices'][0]['text']
+        if len(summary) >= SUMMARY_TARGET_CHARS and summary.rstrip().endswith(SENTENCE_ENDINGS):
+            break
+    return summary.strip()
+
+
+def _summarize_long(llama_model, text, max_tokens):
+    """Summarize text of any length, splitting it at token boundaries when it does not fit"""
+    max_input_tokens = llama_model.n_ctx() - max_tokens - SUMMARY_PROMPT_RESERVE
+    tokens = llama_model.tokenize(text.encode('utf-8'), add_bos=False)
+    if len(tokens) <= max_input_tokens:
+        return _summarize_once(llama_model, text, max_tokens)
+
+    window = min(SUMMARY_CHUNK_TOKENS, max_input_tokens)
+    summaries = []
+    for i in range(0, len(tokens), window):
+        # A character split across two windows loses its partial bytes
+        chunk = llama_model.detokenize(tokens[i:i + window]).decode('utf-8', errors='ignore')
+        summaries.append(_summarize_once(llama_model, chunk, max_tokens))
+    return _summarize_long(llama_model, "\n\n".join(summaries), max_tokens)
+
+
+def summarize_text(llama_model, text, max_tokens=200):
+    """Summarize text using LLaMA"""
     try:
-        response = llama_model(
-            prompt,
-            max_tokens=max_tokens,
-            temperature=0.7,
-            top_p=0.9,
-            stop=["<|eot_id|>"],
-            echo=False
-        )
-        
-        summary = response['choices'][0]['text'].strip()
-        
+        summary = _summarize_long(llama_model, text, max_tokens)
+
         return {
             'success': True,
             'summary': summary,
@@ -37,4 +72,4 @@ def summarize_text(llama_model, text, max_tokens=200):
         return {
             'success': False,
             'error': str(e)
-        }
\ No newline at end of file
+        }
@@ -153,4 +153,34 @@ function setButtonLoading(button, isLoading, loadingText = 'İşleniyor...') {
             button.innerHTML = button.dataset.originalText;
         }
     }
-} 
\ No newline at end of file
+} 
+
+// Long OCR requests run as background jobs: ask for one, then poll until it finishes.
+// Resolves with the same JSON the endpoint returns when called synchronously.
+const JOB_POLL_INTERVAL = 1500;
+
+function fetchJob(url, options = {}) {
+    const headers = Object.assign({}, options.headers, { 'Prefer': 'respond-async' });
+    return fetch(url, Object.assign({}, options, { headers }))
+        .then(response => response.json().then(data => {
+            if (response.status === 202 && data.job_id) {
+                return pollJob(data.job_id);
+            }
+            return data;
+        }));
+}
+
+function pollJob(jobId) {
+    return new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL))
+        .then(() => fetch(`/jobs/${jobId}`))
+        .then(response => response.json())
+        .then(job => {
+            if (job.status === 'done') {
+                return job.result;
+            }
+            if (job.status === 'failed' || !job.status) {
+                return { success: false, error: job.error || 'İşlem başarısız oldu' };
+            }
+            return pollJob(jobId);
+        });
+}